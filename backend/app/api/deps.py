@@ -5,5 +5,23 @@ from fastapi import Request, Depends
 from app.core.security import verify_api_key
 from app.config.settings import get_settings
 from app.services.llm.ollama_client import get_ollama_service
+from app.services.llm.ollama_warmup import get_ollama_warmup_manager
+from app.services.health_monitor import get_health_monitor
+from app.services.data.patient_service import get_patient_service
+from app.services.data.profile_store import get_profile_store
+from app.services.llm.summary_cache import get_summary_cache
+from app.utils.metrics import get_metrics_registry
+from app.utils.server_timing import get_server_timing
 
-__all__ = ["verify_api_key", "get_settings", "get_ollama_service"]
+__all__ = [
+    "verify_api_key",
+    "get_settings",
+    "get_ollama_service",
+    "get_ollama_warmup_manager",
+    "get_patient_service",
+    "get_profile_store",
+    "get_summary_cache",
+    "get_health_monitor",
+    "get_metrics_registry",
+    "get_server_timing"
+]
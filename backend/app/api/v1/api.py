@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import health, patients, services
+from app.api.v1.endpoints import health, metrics, patients, services
 
 
 api_router = APIRouter()
 api_router.include_router(health.router, prefix="/health", tags=["Health"])
 api_router.include_router(patients.router, prefix="/patients", tags=["Patients"])
 api_router.include_router(services.router, prefix="/services", tags=["Services"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
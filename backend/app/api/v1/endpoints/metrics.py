@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app.utils.metrics import CONTENT_TYPE_LATEST, MetricsRegistry
+from app.api.deps import verify_api_key, get_metrics_registry
+
+
+router = APIRouter()
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics(
+    auth_info: str = Depends(verify_api_key),
+    metrics_registry: MetricsRegistry = Depends(get_metrics_registry)
+):
+    """
+    Metrics of this worker in the Prometheus text format
+    Request latencies, summary cache hit ratios, PatientService timings and LLM throughput
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type=CONTENT_TYPE_LATEST)
@@ -1,31 +1,79 @@
+import json
 import time
 import traceback
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from app.config.logging_setup import get_logger
 from app.services.data.patient_service import PatientService
-from app.models.patient import PatientInfo, PatientList, ConditionInfo, ConditionList
-from app.api.deps import verify_api_key
+from app.models.patient import PatientInfo, PatientList, ConditionInfo, ConditionList, CohortQuery, CohortPage
+from app.api.deps import verify_api_key, get_patient_service
 from fastapi import APIRouter
 
 
 router = APIRouter()
 
+# Patients serialized per chunk of a streamed cohort
+COHORT_STREAM_BATCH_SIZE = 1000
 
-patient_service = PatientService()
 
 @router.get("/", response_model=List[PatientInfo])
-async def get_patient_list(limit:int = Query(50, ge=1, le=2287), auth_info: str = Depends(verify_api_key)):
+async def get_patient_list(
+    limit:int = Query(50, ge=1, le=2287),
+    auth_info: str = Depends(verify_api_key),
+    patient_service: PatientService = Depends(get_patient_service)
+):
     return patient_service.get_patient_list(limit=limit)
 
 @router.get("/conditions", response_model=List[ConditionInfo])
-async def get_condition_list(auth_info: str = Depends(verify_api_key)):
+async def get_condition_list(
+    auth_info: str = Depends(verify_api_key),
+    patient_service: PatientService = Depends(get_patient_service)
+):
     return patient_service.get_condition_list()
 
 @router.post("/by-conditions", response_model=PatientList)
 async def get_patients_by_condition_id(
     payload: ConditionList,
-    auth_info: str = Depends(verify_api_key)
+    auth_info: str = Depends(verify_api_key),
+    patient_service: PatientService = Depends(get_patient_service)
+):
+    return PatientList(patient_ids=patient_service.get_patients_by_condition_id(payload.condition_ids))
+
+@router.post("/cohort", response_model=CohortPage)
+async def get_cohort(
+    payload: CohortQuery,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    auth_info: str = Depends(verify_api_key),
+    patient_service: PatientService = Depends(get_patient_service)
 ):
-    return PatientList(patient_ids=patient_service.get_patients_by_condition_id(payload.condition_ids))
\ No newline at end of file
+    """
+    Patients matching a combination of required, alternative and excluded condition codes,
+    one page at a time with their name, age and gender
+    """
+    try:
+        return CohortPage(**patient_service.get_cohort(payload, limit=limit, cursor=cursor))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.post("/cohort/stream")
+async def stream_cohort(
+    payload: CohortQuery,
+    auth_info: str = Depends(verify_api_key),
+    patient_service: PatientService = Depends(get_patient_service)
+):
+    """
+    Every patient matching a cohort query as newline-delimited JSON, one PatientInfo per line.
+    The cohort size is sent upfront in the X-Total-Count header.
+    """
+    positions = patient_service.get_cohort_ordinals(payload)
+
+    # Patient fields are computed a batch at a time, so large cohorts are never held in memory at once
+    def ndjson_lines():
+        for start in range(0, len(positions), COHORT_STREAM_BATCH_SIZE):
+            patient_infos = patient_service.get_patient_infos(positions[start:start + COHORT_STREAM_BATCH_SIZE])
+            yield "".join(json.dumps(patient_info) + "\n" for patient_info in patient_infos)
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson", headers={"X-Total-Count": str(len(positions))})
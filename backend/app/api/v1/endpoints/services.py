@@ -1,42 +1,51 @@
+import json
 import time
 import traceback
 from datetime import datetime
-from cachetools import TTLCache
-from fastapi import APIRouter, Depends
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
 from app.config.logging_setup import get_logger
 from app.config.settings import get_settings
 from app.services.data.patient_service import PatientService
+from app.services.data.profile_store import ProfileStore
 from app.services.llm.pipelines.clinical_summary import ClinicalSummaryPipeline
-from app.models.services import PatientSummaryResponse, ComprehensivePatientProfile
+from app.services.llm.summary_cache import SummaryCache
+from app.services.llm.ollama_warmup import OllamaWarmupManager
+from app.models.services import PatientSummaryResponse, ComprehensivePatientProfile, SummaryPrompt
 from app.models.patient import PatientInfo, PatientList
 from app.services.data.summary_service import load_generated_summary
-from app.api.deps import verify_api_key
+from app.utils.single_flight import SingleFlight
+from app.utils.server_timing import ServerTiming, measure
+from app.api.deps import verify_api_key, get_patient_service, get_profile_store, get_summary_cache, get_ollama_warmup_manager, get_server_timing
 
 
 logger = get_logger(__name__)
 settings = get_settings()
 router = APIRouter()
 
-patient_service = PatientService()
-
 # Loads internal generated summaries
 generated_summary = load_generated_summary()
 
-# Auto-evicts after 1 hour or when >1000 entries
-summary_cache = TTLCache(maxsize=1000, ttl=3600)
-
-# Groq
-groq_summary_generator = ClinicalSummaryPipeline(
-    model=settings.GROQ_MODEL_REASONING,
-    ollama_url=settings.GROQ_API_URL
-)
+# Coalesces concurrent cache misses for the same prompt into one LLM call
+summary_flight = SingleFlight()
 
-# Ollama
+# Groq, failing over to Ollama
 summary_generator = ClinicalSummaryPipeline(
     model=settings.OLLAMA_MODEL,
     ollama_url=settings.OLLAMA_API_URL
 )
 
+def _report_server_timing(timing: Optional[ServerTiming], endpoint: str, patient_id: str, response: Optional[Response] = None) -> None:
+    """Log the request's timing breakdown and expose it as a Server-Timing header"""
+    if timing is None:
+        return
+
+    if response is not None:
+        response.headers["Server-Timing"] = timing.header_value()
+    logger.info(f"Server timing endpoint={endpoint} patient_id={patient_id} timings_ms={json.dumps(timing.as_dict())}")
+
+
 @router.get("/patients/generated-summary", response_model=PatientList)
 async def get_patients_with_generated_summary(
     auth_info: str = Depends(verify_api_key)
@@ -53,10 +62,21 @@ async def get_patients_with_generated_summary(
 @router.post("/patients/generated-summary/{patient_id}", response_model=ComprehensivePatientProfile)
 async def get_comprehensive_patient_profiles_with_generated_summary(
     patient_id: str,
-    auth_info: str = Depends(verify_api_key)
+    response: Response,
+    auth_info: str = Depends(verify_api_key),
+    patient_service: PatientService = Depends(get_patient_service),
+    profile_store: ProfileStore = Depends(get_profile_store),
+    timing: Optional[ServerTiming] = Depends(get_server_timing)
 ):
     try:
-        profile = patient_service.get_comprehensive_patient_profile(patient_id)
+        # Serve the materialized profile, falling back to computing it for patients not yet materialized
+        with measure(timing, "profile_store"):
+            profile = profile_store.get(patient_id)
+        if profile is None:
+            with measure(timing, "profile"):
+                profile = patient_service.get_comprehensive_patient_profile(patient_id, timing)
+
+        _report_server_timing(timing, "profile", patient_id, response)
         return ComprehensivePatientProfile(**profile)
 
     except Exception as e:
@@ -64,43 +84,164 @@ async def get_comprehensive_patient_profiles_with_generated_summary(
         logger.error(msg)
 
 
+async def _cache_summary(
+    summary_cache: SummaryCache,
+    summary_prompt: SummaryPrompt,
+    summary_result: Dict[str, Any],
+    response_data: PatientSummaryResponse
+) -> None:
+    """Store a summary, unless a fallback model wrote it, which would be served until the patient data changes"""
+    if not summary_generator.is_primary_result(summary_result):
+        logger.info(f"Fallback summary from {response_data.model_used} not cached for patient_id={summary_prompt.patient_id}")
+        return
+
+    await summary_cache.set(summary_prompt.cache_key, response_data)
+    logger.info(f"Cache stored for patient_id={summary_prompt.patient_id}")
+
+
+async def _get_cached_summary(summary_cache: SummaryCache, summary_prompt: SummaryPrompt) -> Optional[PatientSummaryResponse]:
+    """Look up a summary by prompt inputs, re-labelled for the requesting patient"""
+    cached = await summary_cache.get(summary_prompt.cache_key)
+    if cached is None:
+        return None
+
+    logger.info(f"Cache hit for patient_id={summary_prompt.patient_id}")
+    return cached.model_copy(update={"patient_id": summary_prompt.patient_id})
+
+
+async def _generate_and_cache_summary(
+    summary_cache: SummaryCache,
+    summary_prompt: SummaryPrompt,
+    timing: Optional[ServerTiming] = None
+) -> PatientSummaryResponse:
+    """Generate a summary with the routed pipeline and store it in the cache"""
+    start_time = time.time()
+    summary_result = await summary_generator.generate_summary(summary_prompt, timing)
+    sanitized_result = summary_result["llm"]["replies"][0]
+    elapsed = time.time() - start_time
+
+    response_data = PatientSummaryResponse(
+        patient_id=summary_prompt.patient_id,
+        summary=sanitized_result,
+        model_used=summary_result["llm"]["model"],
+        generated_at=datetime.now().isoformat(),
+        generation_elapsed_second=float(round(elapsed, 2))
+    )
+
+    await _cache_summary(summary_cache, summary_prompt, summary_result, response_data)
+    return response_data
+
+
 @router.post("/{patient_id}", response_model=PatientSummaryResponse)
 async def generate_patient_summary(
     patient_id: str,
-    auth_info: str = Depends(verify_api_key)
+    response: Response,
+    auth_info: str = Depends(verify_api_key),
+    summary_cache: SummaryCache = Depends(get_summary_cache),
+    ollama_warmup: OllamaWarmupManager = Depends(get_ollama_warmup_manager),
+    timing: Optional[ServerTiming] = Depends(get_server_timing)
 ):
     """Generate AI-powered clinical summary using Haystack pipeline"""
+    # Keep the fallback model loaded while summaries are being requested
+    ollama_warmup.record_activity()
+
     try:
         # # Check internal generated cache
         # if patient_id in generated_summary:
         #     logger.info(f"Generatd Summary hit for patient_id={patient_id}")
         #     return generated_summary[patient_id]
         
-        # Check cache
-        if patient_id in summary_cache:
-            logger.info(f"Cache hit for patient_id={patient_id}")
-            return summary_cache[patient_id]
+        # Check cache, keyed by the prompt inputs so changed patient data is never served stale
+        summary_prompt = await summary_generator.build_summary_prompt(patient_id, timing)
+        with measure(timing, "cache_lookup"):
+            cached = await _get_cached_summary(summary_cache, summary_prompt)
+        if cached is not None:
+            _report_server_timing(timing, "summary", patient_id, response)
+            return cached
+
+        # Generate summary, joining the generation already in flight for this prompt if any
+        if summary_flight.is_in_flight(summary_prompt.cache_key):
+            logger.info(f"Joining in-flight generation for patient_id={patient_id}")
+
+        with measure(timing, "generation"):
+            response_data = await summary_flight.do(
+                summary_prompt.cache_key,
+                lambda: _generate_and_cache_summary(summary_cache, summary_prompt, timing)
+            )
+
+        _report_server_timing(timing, "summary", patient_id, response)
+        return response_data
+
+    except Exception as e:
+        msg = f"An error occurred when generating patient summary: {e}.\n{traceback.format_exc()}"
+        logger.error(msg)
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/{patient_id}/stream")
+async def stream_patient_summary(
+    patient_id: str,
+    auth_info: str = Depends(verify_api_key),
+    summary_cache: SummaryCache = Depends(get_summary_cache),
+    ollama_warmup: OllamaWarmupManager = Depends(get_ollama_warmup_manager),
+    timing: Optional[ServerTiming] = Depends(get_server_timing)
+):
+    """
+    Stream AI-powered clinical summary as Server-Sent Events.
+
+    Emits a `token` event per generated chunk, then a `done` event carrying the full
+    PatientSummaryResponse, or an `error` event if generation fails. Headers are sent
+    before generation starts, so the timing breakdown is only logged.
+    """
+    ollama_warmup.record_activity()
 
-        # Generate summary
+    async def event_stream():
         start_time = time.time()
-        summary_result = await groq_summary_generator.generate_summary(patient_id)
-        sanitized_result = summary_result["llm"]["replies"][0]
+        chunks = []
+        summary_result = {}
+        try:
+            # Check cache
+            summary_prompt = await summary_generator.build_summary_prompt(patient_id, timing)
+            with measure(timing, "cache_lookup"):
+                cached = await _get_cached_summary(summary_cache, summary_prompt)
+            if cached is not None:
+                _report_server_timing(timing, "summary_stream", patient_id)
+                yield _sse_event("token", {"content": cached.summary})
+                yield _sse_event("done", cached.model_dump())
+                return
+
+            # Generate summary, forwarding chunks as they arrive
+            async for content in summary_generator.stream_summary(summary_prompt, summary_result, timing):
+                chunks.append(content)
+                yield _sse_event("token", {"content": content})
+
+        except Exception as e:
+            msg = f"An error occurred when streaming patient summary: {e}.\n{traceback.format_exc()}"
+            logger.error(msg)
+            yield _sse_event("error", {"detail": "Failed to generate patient summary"})
+            return
+
         elapsed = time.time() - start_time
 
         response_data = PatientSummaryResponse(
             patient_id=patient_id,
-            summary=sanitized_result,
-            model_used=settings.GROQ_MODEL_REASONING,
+            summary="".join(chunks),
+            model_used=summary_result["llm"]["model"],
             generated_at=datetime.now().isoformat(),
             generation_elapsed_second=float(round(elapsed, 2))
         )
 
-        # Store in cache
-        summary_cache[patient_id] = response_data
-        logger.info(f"Cache stored for patient_id={patient_id}")
-        
-        return response_data
+        await _cache_summary(summary_cache, summary_prompt, summary_result, response_data)
+        _report_server_timing(timing, "summary_stream", patient_id)
 
-    except Exception as e:
-        msg = f"An error occurred when generating patient summary: {e}.\n{traceback.format_exc()}"
-        logger.error(msg)
\ No newline at end of file
+        yield _sse_event("done", response_data.model_dump())
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Literal, Optional
 from functools import lru_cache
 from pydantic import computed_field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -37,6 +37,46 @@ class Settings(BaseSettings):
     OLLAMA_LOCALHOST: str
     OLLAMA_HOST: str
     OLLAMA_PORT: int
+    OLLAMA_GENERATION_READ_TIMEOUT_SECONDS: float = 120.0
+    OLLAMA_WARMUP_ENABLED: bool = True
+    OLLAMA_KEEP_ALIVE: str = "10m"
+    OLLAMA_KEEP_ALIVE_REFRESH_SECONDS: float = 240.0
+    OLLAMA_WARMUP_IDLE_SECONDS: float = 1800.0
+    OLLAMA_MODEL_CATALOG_MAX_AGE_SECONDS: float = 60.0
+
+    # Summary generation
+    SUMMARY_MAX_CONCURRENCY: int = 4
+    SUMMARY_CACHE_BACKEND: Literal["sqlite", "memory"] = "sqlite"
+    SUMMARY_CACHE_PATH: Optional[str] = None
+    SUMMARY_CACHE_MAX_ENTRIES: int = 10000
+    SUMMARY_CACHE_TOUCH_INTERVAL_SECONDS: float = 60.0
+    SUMMARY_PROMPT_TOKEN_BUDGETS: Dict[str, int] = {
+        "llama-3.3-70b-versatile": 6000,
+        "llama3.2:3b": 1500
+    }
+    SUMMARY_PROMPT_DEFAULT_TOKEN_BUDGET: int = 4000
+
+    # Circuit breakers
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_BREAKER_RECOVERY_SECONDS: float = 30.0
+
+    # Health monitoring
+    HEALTH_PROBE_INTERVAL_SECONDS: float = 15.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 5.0
+    HEALTH_LATENCY_WINDOW: int = 20
+    EVENT_LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+    SERVER_TIMING_ENABLED: bool = False
+
+    # Prompts
+    PROMPT_RELOAD_INTERVAL_SECONDS: float = 5.0
+
+    # LLM routing
+    LLM_ROUTER_HEDGING: bool = False
+    LLM_ROUTER_HEDGE_MIN_DELAY_SECONDS: float = 2.0
+    LLM_ROUTER_WINDOW: int = 50
+    LLM_ROUTER_MAX_ERROR_RATE: float = 0.5
+    LLM_ROUTER_SLOW_SECONDS: float = 30.0
+    LLM_ROUTER_PROBE_INTERVAL_SECONDS: float = 30.0
 
     @computed_field
     @property
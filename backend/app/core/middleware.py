@@ -0,0 +1,58 @@
+"""
+ASGI middleware recording per-route request metrics.
+"""
+
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.utils.metrics import Gauge, Histogram
+
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request until its response body is fully sent",
+    labelnames=("method", "route", "status_code")
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    labelnames=("method",)
+)
+
+
+class MetricsMiddleware:
+    """
+    Record the latency of every HTTP request, labelled by its route template.
+
+    Timing ends once the response body is fully sent, so streamed responses are measured
+    until their last event rather than until their headers. Requests that match no route
+    share the "unmatched" label to keep the number of series bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with http_requests_in_flight.track_inprogress(method=method):
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                http_request_duration_seconds.observe(
+                    time.perf_counter() - start_time,
+                    method=method,
+                    route=getattr(route, "path", "unmatched"),
+                    status_code=str(status_code)
+                )
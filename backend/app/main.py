@@ -4,18 +4,51 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.api.v1.api import api_router
+from app.core.middleware import MetricsMiddleware
 from app.models.health import PublicResponse
 from app.config.settings import get_settings
 from app.config.logging_setup import get_logger
+from app.services.data.patient_service import get_patient_service
+from app.services.llm.ollama_client import cleanup_ollama_service
+from app.services.llm.ollama_warmup import get_ollama_warmup_manager, cleanup_ollama_warmup_manager
+from app.services.health_monitor import get_health_monitor, cleanup_health_monitor
+from app.utils.event_loop_monitor import get_event_loop_monitor, cleanup_event_loop_monitor
 
 
 logger = get_logger(__name__)
 
 settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load shared resources once on startup and release them on shutdown"""
+    # Load and index the patient dataset once for the whole process
+    get_patient_service()
+    logger.info("Patient data store loaded")
+
+    # Preload the local fallback model in the background so startup does not wait on it
+    if settings.OLLAMA_WARMUP_ENABLED:
+        get_ollama_warmup_manager().start()
+
+    # Probe dependencies in the background so health endpoints answer from memory
+    get_health_monitor().start()
+
+    # Sample how long requests block the event loop, exported as a metric
+    get_event_loop_monitor().start()
+
+    yield
+
+    await cleanup_event_loop_monitor()
+    await cleanup_health_monitor()
+    await cleanup_ollama_warmup_manager()
+    await cleanup_ollama_service()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description=settings.PROJECT_DESC,
-    # lifespan=lifespan,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
 )
 
@@ -27,6 +60,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/", tags=["Public"], response_model=PublicResponse)
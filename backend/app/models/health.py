@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
@@ -49,6 +49,20 @@ class OllamaHealthResponse(BaseModel):
     )    
 
 
+class DependencyHealth(BaseModel):
+    """Last background probe result of an external dependency, with its rolling latency."""
+
+    name: str = Field(..., description="Dependency name")
+    status: Literal["healthy", "unhealthy", "unknown"] = Field("unknown", description="Result of the last probe")
+    last_checked: Optional[datetime] = Field(None, description="Time of the last probe")
+    latency_ms: Optional[float] = Field(None, description="Latency of the last probe")
+    latency_p50_ms: Optional[float] = Field(None, description="Median latency over recent probes")
+    latency_p95_ms: Optional[float] = Field(None, description="95th percentile latency over recent probes")
+    consecutive_failures: int = Field(0, description="Failed probes since the last success")
+    error_message: Optional[str] = Field(None, description="Error of the last probe, if it failed")
+    details: Dict[str, Any] = Field(default_factory=dict, description="Dependency specific details of the last successful probe")
+
+
 class PublicResponse(BaseModel):
     """Response model for public endpoint."""
 
@@ -10,6 +10,23 @@ class OllamaModelInfo(BaseModel):
     modified_at: datetime
 
 
+class OllamaRunningModel(BaseModel):
+    name: str
+    size_vram: Optional[int] = None
+    expires_at: Optional[datetime] = None
+
+
+class OllamaModelLoadState(BaseModel):
+    """Whether the warm-up manager has the model loaded in Ollama's memory"""
+    model: str
+    is_loaded: bool = False
+    load_duration_ms: Optional[float] = None
+    last_refreshed: Optional[datetime] = None
+    last_activity: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    error_message: Optional[str] = None
+
+
 class OllamaHealthStatus(BaseModel):
     is_healthy: bool
     response_time_ms: Optional[float] = None
@@ -17,6 +34,20 @@ class OllamaHealthStatus(BaseModel):
     error_message: Optional[str] = None
     last_checked: datetime
     total_models: int = 0
+    model_load_state: Optional[OllamaModelLoadState] = None
+
+
+class OllamaStreamChunk(BaseModel):
+    """Incremental piece of a streamed completion, the final chunk has done=True and generation stats"""
+    model: str
+    content: str
+    done: bool = False
+    done_reason: Optional[str] = None
+    time_to_first_token_ms: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    prompt_eval_count: Optional[int] = None
+    eval_count: Optional[int] = None
+    total_duration_ms: Optional[float] = None
 
 
 class DetailedHealthResponse(BaseModel):
@@ -1,6 +1,7 @@
 import pandas as pd
-from typing import List
-from pydantic import BaseModel, ConfigDict
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, model_validator
 
 
 class PatientInfo(BaseModel):
@@ -47,6 +48,66 @@ class ConditionList(BaseModel):
     )
 
 
+class CohortQuery(BaseModel):
+    """
+    Patients with every code of all_codes, at least one of any_codes and none of none_codes.
+
+    active_only, start_date and end_date restrict which conditions count for every code: only
+    those without a stop date, and only episodes overlapping the date window.
+    """
+    all_codes: List[int] = []
+    any_codes: List[int] = []
+    none_codes: List[int] = []
+    active_only: bool = False
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @model_validator(mode="after")
+    def check_query(self) -> "CohortQuery":
+        if not (self.all_codes or self.any_codes or self.none_codes):
+            raise ValueError("At least one of all_codes, any_codes or none_codes is required")
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValueError("start_date must not be after end_date")
+        return self
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "all_codes": [44054006],
+                "any_codes": [59621000, 38341003],
+                "none_codes": [431855005],
+                "active_only": True,
+                "start_date": "2020-01-01",
+                "end_date": None
+            }
+        }
+    )
+
+
+class CohortPage(BaseModel):
+    """One page of a cohort; pass next_cursor back as the cursor to get the next page"""
+    count: int
+    patients: List[PatientInfo]
+    next_cursor: Optional[str] = None
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "count": 1342,
+                "patients": [
+                    {
+                        "id": "bdb70c06-5516-04de-1a09-c605efea0569",
+                        "name": "Mickey Armstrong",
+                        "age": 61,
+                        "gender": "F"
+                    }
+                ],
+                "next_cursor": "MTI3"
+            }
+        }
+    )
+
+
 class ConditionInfo(BaseModel):
     code: int
     description: str
@@ -75,4 +136,18 @@ class PatientServiceLoadedData(BaseModel):
     patients: pd.DataFrame
     payers: pd.DataFrame
     procedures: pd.DataFrame
-    providers: pd.DataFrame
\ No newline at end of file
+    providers: pd.DataFrame
+
+class PatientSlice(BaseModel):
+    """Rows of every patient-keyed table for a single patient, extracted once per request"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    patient_id: str
+    demographics: pd.Series
+    allergies: pd.DataFrame
+    conditions: pd.DataFrame
+    encounters: pd.DataFrame
+    immunizations: pd.DataFrame
+    medications: pd.DataFrame
+    observations: pd.DataFrame
+    procedures: pd.DataFrame
@@ -205,4 +205,11 @@ class PatientSummaryResponse(BaseModel):
                 "generation_elapsed_second": 7
             }
         }
-    )
\ No newline at end of file
+    )
+
+class SummaryPrompt(BaseModel):
+    """Summary prompt inputs for one patient, with the cache key of its completion"""
+    patient_id: str
+    inputs: Dict[str, Any]
+    profile_inputs: Dict[str, Any]
+    cache_key: str
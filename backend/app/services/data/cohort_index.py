@@ -0,0 +1,175 @@
+import base64
+import binascii
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+
+# Stop value of conditions that are still active, sorting after every real date
+_OPEN_STOP = np.iinfo(np.int64).max
+
+
+def encode_cursor(ordinal: int) -> str:
+    """Opaque pagination cursor pointing after the patient with this ordinal"""
+    return base64.urlsafe_b64encode(str(ordinal).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Ordinal of the last patient of the previous page"""
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def _to_nanoseconds(dates: pd.Series) -> np.ndarray:
+    """Datetime column as int64 nanoseconds, tz-aware values in UTC and NaT as the int64 minimum"""
+    dates = pd.to_datetime(dates, errors='coerce')
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert(None)
+    return dates.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+class CodeRows:
+    """Conditions of one code sorted by start date, for answering date window queries"""
+
+    def __init__(self, ordinals: np.ndarray, starts: np.ndarray, stops: np.ndarray):
+        self.ordinals = ordinals
+        self.starts = starts
+        self.stops = stops
+
+
+class CohortIndex:
+    """
+    Inverted index from condition code to the bitmap of patients who have it.
+
+    Patients are numbered by their row in the patients table, and every bitmap is a packed
+    uint8 array with one bit per patient, so cohort queries combine precomputed bitmaps with
+    bitwise AND, OR and NOT in time proportional to the number of patients / 8, independent
+    of the size of the conditions table. Each code keeps a bitmap of every patient who ever
+    had it and one of patients for whom it is still active, i.e. has no stop date.
+
+    Date window queries match condition episodes overlapping the window, and are answered
+    from the code's rows sorted by start date, in time proportional to that code's rows.
+    """
+
+    def __init__(self, patient_ids: pd.Series, conditions: pd.DataFrame):
+        self.patient_ids = patient_ids.to_numpy()
+        self.n_patients = len(self.patient_ids)
+        self.n_bytes = (self.n_patients + 7) // 8
+
+        # Bits past the last patient stay zero, so NOT never adds patients that do not exist
+        self._all = np.packbits(np.ones(self.n_patients, dtype=bool))
+        self._ever: Dict[int, np.ndarray] = {}
+        self._active: Dict[int, np.ndarray] = {}
+        self._rows: Dict[int, CodeRows] = {}
+        self._build(conditions)
+
+    def _build(self, conditions: pd.DataFrame) -> None:
+        # Condition rows of patients missing from the patients table cannot be numbered
+        ordinals = pd.Index(self.patient_ids).get_indexer(conditions['PATIENT'])
+        known = ordinals >= 0
+        ordinals = ordinals[known].astype(np.int32)
+        codes = conditions['CODE'].to_numpy()[known]
+        starts = _to_nanoseconds(conditions['START'])[known]
+        stops = _to_nanoseconds(conditions['STOP'])[known]
+        stops = np.where(stops == np.iinfo(np.int64).min, _OPEN_STOP, stops)
+
+        # Group rows by code, each group sorted by start date
+        order = np.lexsort((starts, codes))
+        codes, ordinals, starts, stops = codes[order], ordinals[order], starts[order], stops[order]
+        boundaries = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        group_starts = np.concatenate(([0], boundaries))
+        group_stops = np.concatenate((boundaries, [len(codes)]))
+
+        for group_start, group_stop in zip(group_starts.tolist(), group_stops.tolist()):
+            if group_start == group_stop:
+                continue
+            code = int(codes[group_start])
+            rows = CodeRows(ordinals[group_start:group_stop], starts[group_start:group_stop], stops[group_start:group_stop])
+            self._rows[code] = rows
+            self._ever[code] = self._to_bitmap(rows.ordinals)
+            self._active[code] = self._to_bitmap(rows.ordinals[rows.stops == _OPEN_STOP])
+
+    def _to_bitmap(self, ordinals: np.ndarray) -> np.ndarray:
+        members = np.zeros(self.n_patients, dtype=bool)
+        members[ordinals] = True
+        return np.packbits(members)
+
+    def _empty(self) -> np.ndarray:
+        return np.zeros(self.n_bytes, dtype=np.uint8)
+
+    def _code_bitmap(self, code: int, active_only: bool, start: Optional[date], end: Optional[date]) -> np.ndarray:
+        """Patients with a condition of this code matching the filters"""
+        if code not in self._rows:
+            return self._empty()
+        if start is None and end is None:
+            return self._active[code] if active_only else self._ever[code]
+
+        rows = self._rows[code]
+        # Episodes starting on or before the last day of the window...
+        stop_index = len(rows.starts)
+        if end is not None:
+            end_ns = pd.Timestamp(end + timedelta(days=1)).value
+            stop_index = int(np.searchsorted(rows.starts, end_ns, side='left'))
+        stops = rows.stops[:stop_index]
+
+        # ...and still ongoing on or after its first day
+        matches = np.ones(stop_index, dtype=bool)
+        if start is not None:
+            matches &= stops >= pd.Timestamp(start).value
+        if active_only:
+            matches &= stops == _OPEN_STOP
+        return self._to_bitmap(rows.ordinals[:stop_index][matches])
+
+    def query(
+        self,
+        all_codes: Iterable[int] = (),
+        any_codes: Iterable[int] = (),
+        none_codes: Iterable[int] = (),
+        active_only: bool = False,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> np.ndarray:
+        """
+        Bitmap of patients with every code of all_codes, at least one of any_codes and none of
+        none_codes. Empty lists do not restrict the cohort.
+
+        Args:
+            active_only: Only count conditions without a stop date
+            start: Only count conditions ongoing on or after this date
+            end: Only count conditions that started on or before this date
+        """
+        bitmap = self._all.copy()
+        for code in set(all_codes):
+            bitmap &= self._code_bitmap(code, active_only, start, end)
+
+        any_codes = set(any_codes)
+        if any_codes:
+            any_bitmap = self._empty()
+            for code in any_codes:
+                any_bitmap |= self._code_bitmap(code, active_only, start, end)
+            bitmap &= any_bitmap
+
+        for code in set(none_codes):
+            bitmap &= ~self._code_bitmap(code, active_only, start, end)
+        return bitmap
+
+    def count(self, bitmap: np.ndarray) -> int:
+        """Number of patients in a bitmap"""
+        return int(np.bitwise_count(bitmap).sum())
+
+    def ordinals(self, bitmap: np.ndarray) -> np.ndarray:
+        """Patient ordinals in a bitmap, in patients table order"""
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.n_patients))
+
+    def page(self, bitmap: np.ndarray, after: int = -1, limit: Optional[int] = None) -> np.ndarray:
+        """Ordinals in a bitmap greater than after, at most limit of them"""
+        ordinals = self.ordinals(bitmap)
+        start = int(np.searchsorted(ordinals, after, side='right'))
+        return ordinals[start:start + limit if limit is not None else None]
+
+    def get_patient_ids(self, bitmap: np.ndarray) -> List[str]:
+        """Patient ids in a bitmap, in patients table order"""
+        return self.patient_ids[self.ordinals(bitmap)].tolist()
@@ -1,20 +1,51 @@
+import threading
 import traceback
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any
-from app.models.patient import PatientServiceLoadedData
+from typing import Dict, List, Any, Optional, Tuple
+from app.models.patient import CohortQuery, PatientServiceLoadedData, PatientSlice
 from app.config.logging_setup import get_logger
+from app.services.data.cohort_index import CohortIndex, decode_cursor, encode_cursor
 from app.utils.file_locator import ROOT_DIR
+from app.utils.dataframe import format_dates, column_or_default, to_records
+from app.utils.metrics import Histogram, timed
+from app.utils.server_timing import ServerTiming, measure
 
 
 logger = get_logger(__name__)
 
+# Tables keyed by the PATIENT column that are looked up per patient
+PATIENT_TABLES = [
+    'allergies',
+    'conditions',
+    'encounters',
+    'immunizations',
+    'medications',
+    'observations',
+    'procedures'
+]
+
+patient_service_duration_seconds = Histogram(
+    "patient_service_duration_seconds",
+    "Time spent in PatientService lookups",
+    labelnames=("method",)
+)
+
 
 class PatientService:
-    def __init__(self):
-        self.DATA_DIR = ROOT_DIR / "data" / "processed"
-        self.data = self._load_data()
+    def __init__(self, data_dir: Optional[Path] = None, data: Optional[PatientServiceLoadedData] = None):
+        """
+        Args:
+            data_dir: Directory of the processed Parquet tables, defaults to data/processed
+            data: Tables to serve instead of loading them from data_dir, e.g. synthetic benchmark data
+        """
+        self.DATA_DIR = data_dir or ROOT_DIR / "data" / "processed"
+        self.data = data if data is not None else self._load_data()
         self._convert_dates()
+        self._build_patient_index()
+        self.cohort_index = CohortIndex(self.data.patients['Id'], self.data.conditions)
         
     def _load_data(self) -> PatientServiceLoadedData:
         try:
@@ -45,42 +76,128 @@ class PatientService:
                     if col in df.columns:
                         df[col] = pd.to_datetime(df[col], errors='coerce')
 
+    def _build_patient_index(self):
+        """
+        Sort patient-keyed tables by PATIENT and record the row range of each patient,
+        so that per-patient lookups slice contiguous rows instead of scanning the full table.
+        """
+        self._patient_index: Dict[str, Dict[str, Tuple[int, int]]] = {}
+
+        for df_name in PATIENT_TABLES:
+            df = getattr(self.data, df_name).sort_values('PATIENT', kind='stable').reset_index(drop=True)
+            setattr(self.data, df_name, df)
+
+            if df.empty:
+                self._patient_index[df_name] = {}
+                continue
+
+            # Row offsets where the PATIENT value changes mark the start of each patient's block
+            patients = df['PATIENT'].to_numpy()
+            boundaries = np.flatnonzero(patients[1:] != patients[:-1]) + 1
+            starts = np.concatenate(([0], boundaries))
+            stops = np.concatenate((boundaries, [len(df)]))
+
+            self._patient_index[df_name] = dict(zip(patients[starts], zip(starts.tolist(), stops.tolist())))
+
+        # Patients table is keyed by Id, one row per patient
+        self._patient_positions: Dict[str, int] = {
+            patient_id: position for position, patient_id in enumerate(self.data.patients['Id'])
+        }
+
+    def _get_patient_rows(self, df_name: str, patient_id: str) -> pd.DataFrame:
+        """Get all rows of a patient-keyed table for one patient"""
+        df = getattr(self.data, df_name)
+        start, stop = self._patient_index[df_name].get(patient_id, (0, 0))
+        return df.iloc[start:stop]
+
+    def _get_patient_slice(self, patient_id: str) -> Optional[PatientSlice]:
+        """Extract every patient-keyed table's rows for one patient in a single pass"""
+        position = self._patient_positions.get(patient_id)
+        if position is None:
+            return None
+
+        return PatientSlice(
+            patient_id=patient_id,
+            demographics=self.data.patients.iloc[position],
+            **{df_name: self._get_patient_rows(df_name, patient_id) for df_name in PATIENT_TABLES}
+        )
+
+    @timed(patient_service_duration_seconds)
     def get_patients_by_condition_id(self, condition_ids: List[int]):
         """
         Returns a list of patient IDs who have ALL the condition codes specified in condition_ids.
         """
-        # Filter only rows where CODE is in condition_ids
-        filtered = self.data.conditions[self.data.conditions["CODE"].isin(condition_ids)]
+        if not condition_ids:
+            return []
 
-        # Group by PATIENT and get unique condition codes per patient
-        patient_ids = filtered.groupby("PATIENT")["CODE"].nunique()
+        return self.cohort_index.get_patient_ids(self.cohort_index.query(all_codes=condition_ids))
 
-        # Keep only patients who have all N condition_ids
-        matching_patients = patient_ids[patient_ids >= len(set(condition_ids))].index.tolist()
+    def _query_cohort(self, query: CohortQuery) -> np.ndarray:
+        return self.cohort_index.query(
+            all_codes=query.all_codes,
+            any_codes=query.any_codes,
+            none_codes=query.none_codes,
+            active_only=query.active_only,
+            start=query.start_date,
+            end=query.end_date
+        )
+
+    @timed(patient_service_duration_seconds)
+    def get_cohort(self, query: CohortQuery, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get one page of the patients matching a cohort query, in patients table order
+
+        Args:
+            limit: Maximum number of patients on the page
+            cursor: next_cursor of the previous page, None for the first page
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = decode_cursor(cursor) if cursor else -1
+        bitmap = self._query_cohort(query)
+        ordinals = self.cohort_index.page(bitmap, after=after, limit=limit + 1)
 
-        return matching_patients
+        # Fetching one patient past the page tells whether another page follows
+        page = ordinals[:limit]
+        return {
+            "count": self.cohort_index.count(bitmap),
+            "patients": self.get_patient_infos(page),
+            "next_cursor": encode_cursor(int(page[-1])) if len(ordinals) > limit else None
+        }
+
+    def get_cohort_ordinals(self, query: CohortQuery) -> np.ndarray:
+        """Get the patients table positions of every patient matching a cohort query"""
+        return self.cohort_index.ordinals(self._query_cohort(query))
+
+    def get_patient_infos(self, positions: np.ndarray) -> List[Dict[str, Any]]:
+        """Get id, name, age and gender of the patients at these patients table positions"""
+        return self._to_patient_infos(self.data.patients.iloc[positions])
     
+    @timed(patient_service_duration_seconds)
     def get_condition_list(self) -> List[Dict[str, str]]:
         """Get list of unique conditions"""
         df = self.data.conditions[["CODE","DESCRIPTION"]].copy(deep=True).drop_duplicates(subset=["CODE", "DESCRIPTION"], keep="first")
         df.columns = df.columns.str.lower()
         return df.to_dict(orient="records")
     
+    @timed(patient_service_duration_seconds)
     def get_patient_list(self, limit: int = 50) -> List[Dict[str, str]]:
         """Get list of patients for dropdown"""
         
         # Filter for living patients with recent activity
         living_patients = self.data.patients[self.data.patients['DEATHDATE'].isna()].head(limit)
         
-        return [
-            {
-                "id": row['Id'],
-                "name": f"{row['FIRST']} {row['LAST']}",
-                "age": self._calculate_age(row['BIRTHDATE']),
-                "gender": row['GENDER']
-            }
-            for _, row in living_patients.iterrows()
-        ]
+        return self._to_patient_infos(living_patients)
+
+    def _to_patient_infos(self, patients: pd.DataFrame) -> List[Dict[str, Any]]:
+        """PatientInfo fields of rows of the patients table, computed column-wise"""
+        return to_records({
+            "id": patients['Id'],
+            "name": patients['FIRST'].astype(str) + " " + patients['LAST'].astype(str),
+            "age": self._calculate_ages(patients['BIRTHDATE']),
+            "gender": patients['GENDER']
+        })
     
     def _calculate_age(self, birthdate: pd.Timestamp) -> int:
         """Calculate age from birthdate"""
@@ -88,26 +205,57 @@ class PatientService:
             return 0
         today = datetime.now()
         return today.year - birthdate.year - ((today.month, today.day) < (birthdate.month, birthdate.day))
+
+    def _calculate_ages(self, birthdates: pd.Series) -> pd.Series:
+        """Calculate ages from a column of birthdates, 0 where the birthdate is missing"""
+        today = datetime.now()
+        birthday_pending = (birthdates.dt.month > today.month) | (
+            (birthdates.dt.month == today.month) & (birthdates.dt.day > today.day)
+        )
+        ages = today.year - birthdates.dt.year - birthday_pending.astype(int)
+        return ages.fillna(0).astype(int)
     
-    def get_comprehensive_patient_profile(self, patient_id: str) -> Dict[str, Any]:
-        """Get complete patient profile for clinical summary"""
+    @timed(patient_service_duration_seconds)
+    def get_comprehensive_patient_profile(self, patient_id: str, timing: Optional[ServerTiming] = None) -> Dict[str, Any]:
+        """
+        Get complete patient profile for clinical summary
+
+        Args:
+            patient_id: Patient to build the profile of
+            timing: Records the duration of every profile section when given
+        """
         
-        # Basic demographics
-        patient_info = self._get_patient_demographics(patient_id)
-        if not patient_info:
+        with measure(timing, "slice"):
+            patient = self._get_patient_slice(patient_id)
+        if patient is None:
             return {}
+
+        # Basic demographics
+        with measure(timing, "demographics"):
+            patient_info = self._get_patient_demographics(patient)
         
         # Medical data
-        conditions = self._get_patient_conditions(patient_id)
-        medications = self._get_current_medications(patient_id)
-        recent_observations = self._get_recent_observations(patient_id)
-        allergies = self._get_patient_allergies(patient_id)
-        recent_encounters = self._get_recent_encounters(patient_id)
-        procedures = self._get_recent_procedures(patient_id)
-        immunizations = self._get_immunizations(patient_id)
+        with measure(timing, "conditions"):
+            conditions = self._get_patient_conditions(patient)
+        with measure(timing, "medications"):
+            medications = self._get_current_medications(patient)
+        with measure(timing, "observations"):
+            recent_observations = self._get_recent_observations(patient)
+        with measure(timing, "allergies"):
+            allergies = self._get_patient_allergies(patient)
+        with measure(timing, "encounters"):
+            recent_encounters = self._get_recent_encounters(patient)
+        with measure(timing, "procedures"):
+            procedures = self._get_recent_procedures(patient)
+        with measure(timing, "immunizations"):
+            immunizations = self._get_immunizations(patient)
         
         # Chart data for visualizations
-        chart_data = self._generate_chart_data(patient_id)
+        with measure(timing, "chart"):
+            chart_data = self._generate_chart_data(patient, timing)
+
+        with measure(timing, "summary_stats"):
+            summary_stats = self._get_summary_stats(patient)
         
         return {
             "patient_info": patient_info,
@@ -119,18 +267,14 @@ class PatientService:
             "procedures": procedures,
             "immunizations": immunizations,
             "chart_data": chart_data,
-            "summary_stats": self._get_summary_stats(patient_id)
+            "summary_stats": summary_stats
         }
     
-    def _get_patient_demographics(self, patient_id: str) -> Dict[str, Any]:
+    def _get_patient_demographics(self, patient: PatientSlice) -> Dict[str, Any]:
         """Get patient demographics"""
-        patient = self.data.patients[self.data.patients['Id'] == patient_id]
-        if patient.empty:
-            return {}
-        
-        row = patient.iloc[0]
+        row = patient.demographics
         return {
-            "id": patient_id,
+            "id": patient.patient_id,
             "name": f"{row['FIRST']} {row['LAST']}",
             "age": self._calculate_age(row['BIRTHDATE']),
             "gender": row['GENDER'],
@@ -143,9 +287,9 @@ class PatientService:
             "income": int(row.get('INCOME', 0))
         }
     
-    def _get_patient_conditions(self, patient_id: str) -> List[Dict[str, Any]]:
+    def _get_patient_conditions(self, patient: PatientSlice) -> List[Dict[str, Any]]:
         """Get patient conditions with timeline"""
-        conditions = self.data.conditions[self.data.conditions['PATIENT'] == patient_id]
+        conditions = patient.conditions
         
         # Focus on active conditions (no stop date or recent)
         now = conditions['STOP'].max()
@@ -154,20 +298,19 @@ class PatientService:
             (conditions['STOP'] > (now - timedelta(days=365)))
         ].sort_values('START', ascending=False)
         
-        return [
-            {
-                "description": row['DESCRIPTION'],
-                "start_date": row['START'].strftime('%Y-%m-%d') if pd.notna(row['START']) else None,
-                "stop_date": row['STOP'].strftime('%Y-%m-%d') if pd.notna(row['STOP']) else None,
-                "is_active": pd.isna(row['STOP']),
-                "code": row['CODE']
-            }
-            for _, row in active_conditions.head(10).iterrows()
-        ]
+        active_conditions = active_conditions.head(10)
+        
+        return to_records({
+            "description": active_conditions['DESCRIPTION'],
+            "start_date": format_dates(active_conditions['START']),
+            "stop_date": format_dates(active_conditions['STOP']),
+            "is_active": active_conditions['STOP'].isna(),
+            "code": active_conditions['CODE']
+        })
     
-    def _get_current_medications(self, patient_id: str) -> List[Dict[str, Any]]:
+    def _get_current_medications(self, patient: PatientSlice) -> List[Dict[str, Any]]:
         """Get current and recent medications"""
-        medications = self.data.medications[self.data.medications['PATIENT'] == patient_id]
+        medications = patient.medications
         
         # Focus on active medications
         now = medications['STOP'].max()
@@ -176,130 +319,118 @@ class PatientService:
             (medications['STOP'] > (now - timedelta(days=90)))
         ].sort_values('START', ascending=False)
         
-        return [
-            {
-                "description": row['DESCRIPTION'],
-                "start_date": row['START'].strftime('%Y-%m-%d') if pd.notna(row['START']) else None,
-                "stop_date": row['STOP'].strftime('%Y-%m-%d') if pd.notna(row['STOP']) else None,
-                "is_active": pd.isna(row['STOP']),
-                "cost": row.get('TOTALCOST', 0),
-                "reason": row.get('REASONDESCRIPTION', 'Unknown')
-            }
-            for _, row in active_meds.head(15).iterrows()
-        ]
+        active_meds = active_meds.head(15)
+        
+        return to_records({
+            "description": active_meds['DESCRIPTION'],
+            "start_date": format_dates(active_meds['START']),
+            "stop_date": format_dates(active_meds['STOP']),
+            "is_active": active_meds['STOP'].isna(),
+            "cost": column_or_default(active_meds, 'TOTALCOST', 0),
+            "reason": column_or_default(active_meds, 'REASONDESCRIPTION', 'Unknown')
+        })
     
-    def _get_recent_observations(self, patient_id: str) -> List[Dict[str, Any]]:
+    def _get_recent_observations(self, patient: PatientSlice) -> List[Dict[str, Any]]:
         """Get recent lab results and vital signs"""
         try:
-            observations = self.data.observations[self.data.observations['PATIENT'] == patient_id]
+            observations = patient.observations
             
             # Get observations from last 6 months
             cutoff_date = observations['DATE'].max() - timedelta(days=180)
             recent_obs = observations[observations['DATE'] > cutoff_date]
             
             # Group by description and get latest values
-            latest_obs = recent_obs.sort_values('DATE').groupby('DESCRIPTION').tail(1)
+            latest_obs = recent_obs.sort_values('DATE').groupby('DESCRIPTION').tail(1).head(20)
             
-            return [
-                {
-                    "description": row['DESCRIPTION'],
-                    "value": row['VALUE'],
-                    "units": row['UNITS'],
-                    "date": row['DATE'].strftime('%Y-%m-%d') if pd.notna(row['DATE']) else None,
-                    "category": row['CATEGORY'],
-                    "type": row['TYPE']
-                }
-                for _, row in latest_obs.head(20).iterrows()
-            ]
+            return to_records({
+                "description": latest_obs['DESCRIPTION'],
+                "value": latest_obs['VALUE'],
+                "units": latest_obs['UNITS'],
+                "date": format_dates(latest_obs['DATE']),
+                "category": latest_obs['CATEGORY'],
+                "type": latest_obs['TYPE']
+            })
         except Exception as e:
             msg = f"An error occurred when getting recent observations: {e}.\n{traceback.format_exc()}"
             print(msg)
     
-    def _get_patient_allergies(self, patient_id: str) -> List[Dict[str, Any]]:
+    def _get_patient_allergies(self, patient: PatientSlice) -> List[Dict[str, Any]]:
         """Get patient allergies"""
-        allergies = self.data.allergies[self.data.allergies['PATIENT'] == patient_id]
+        allergies = patient.allergies
         
         # Focus on active allergies
         active_allergies = allergies[allergies['STOP'].isna()]
         
-        return [
-            {
-                "description": row['DESCRIPTION'],
-                "type": row['TYPE'],
-                "category": row['CATEGORY'],
-                "reaction": row.get('DESCRIPTION1', 'Unknown reaction'),
-                "severity": row.get('SEVERITY1', 'Unknown')
-            }
-            for _, row in active_allergies.iterrows()
-        ]
+        return to_records({
+            "description": active_allergies['DESCRIPTION'],
+            "type": active_allergies['TYPE'],
+            "category": active_allergies['CATEGORY'],
+            "reaction": column_or_default(active_allergies, 'DESCRIPTION1', 'Unknown reaction'),
+            "severity": column_or_default(active_allergies, 'SEVERITY1', 'Unknown')
+        })
     
-    def _get_recent_encounters(self, patient_id: str) -> List[Dict[str, Any]]:
+    def _get_recent_encounters(self, patient: PatientSlice) -> List[Dict[str, Any]]:
         """Get recent healthcare encounters"""
-        encounters = self.data.encounters[self.data.encounters['PATIENT'] == patient_id]
+        encounters = patient.encounters
         
         # Get encounters from last year
         cutoff_date = encounters['START'].max() - timedelta(days=365)
         recent_encounters = encounters[encounters['START'] > cutoff_date]
-        recent_encounters = recent_encounters.sort_values('START', ascending=False)
-        
-        return [
-            {
-                "date": row['START'].strftime('%Y-%m-%d %H:%M') if pd.notna(row['START']) else None,
-                "class": row['ENCOUNTERCLASS'],
-                "description": row['DESCRIPTION'],
-                "cost": row.get('TOTAL_CLAIM_COST', 0),
-                "reason": row.get('REASONDESCRIPTION', 'Routine care')
-            }
-            for _, row in recent_encounters.head(10).iterrows()
-        ]
+        recent_encounters = recent_encounters.sort_values('START', ascending=False).head(10)
+        
+        return to_records({
+            "date": format_dates(recent_encounters['START'], '%Y-%m-%d %H:%M'),
+            "class": recent_encounters['ENCOUNTERCLASS'],
+            "description": recent_encounters['DESCRIPTION'],
+            "cost": column_or_default(recent_encounters, 'TOTAL_CLAIM_COST', 0),
+            "reason": column_or_default(recent_encounters, 'REASONDESCRIPTION', 'Routine care')
+        })
     
-    def _get_recent_procedures(self, patient_id: str) -> List[Dict[str, Any]]:
+    def _get_recent_procedures(self, patient: PatientSlice) -> List[Dict[str, Any]]:
         """Get recent procedures"""
-        procedures = self.data.procedures[self.data.procedures['PATIENT'] == patient_id]
+        procedures = patient.procedures
         
         # Get procedures from last year
         cutoff_date = procedures['START'].max() - timedelta(days=365)
         recent_procedures = procedures[procedures['START'] > cutoff_date]
-        recent_procedures = recent_procedures.sort_values('START', ascending=False)
-        
-        return [
-            {
-                "date": row['START'].strftime('%Y-%m-%d') if pd.notna(row['START']) else None,
-                "description": row['DESCRIPTION'],
-                "cost": row.get('BASE_COST', 0),
-                "reason": row.get('REASONDESCRIPTION', 'Unknown')
-            }
-            for _, row in recent_procedures.head(10).iterrows()
-        ]
+        recent_procedures = recent_procedures.sort_values('START', ascending=False).head(10)
+        
+        return to_records({
+            "date": format_dates(recent_procedures['START']),
+            "description": recent_procedures['DESCRIPTION'],
+            "cost": column_or_default(recent_procedures, 'BASE_COST', 0),
+            "reason": column_or_default(recent_procedures, 'REASONDESCRIPTION', 'Unknown')
+        })
     
-    def _get_immunizations(self, patient_id: str) -> List[Dict[str, Any]]:
+    def _get_immunizations(self, patient: PatientSlice) -> List[Dict[str, Any]]:
         """Get immunization history"""
-        immunizations = self.data.immunizations[self.data.immunizations['PATIENT'] == patient_id]
-        recent_immunizations = immunizations.sort_values('DATE', ascending=False)
-        
-        return [
-            {
-                "date": row['DATE'].strftime('%Y-%m-%d') if pd.notna(row['DATE']) else None,
-                "description": row['DESCRIPTION'],
-                "cost": row.get('BASE_COST', 0)
-            }
-            for _, row in recent_immunizations.head(10).iterrows()
-        ]
+        immunizations = patient.immunizations
+        recent_immunizations = immunizations.sort_values('DATE', ascending=False).head(10)
+        
+        return to_records({
+            "date": format_dates(recent_immunizations['DATE']),
+            "description": recent_immunizations['DESCRIPTION'],
+            "cost": column_or_default(recent_immunizations, 'BASE_COST', 0)
+        })
     
-    def _generate_chart_data(self, patient_id: str) -> Dict[str, Any]:
+    def _generate_chart_data(self, patient: PatientSlice, timing: Optional[ServerTiming] = None) -> Dict[str, Any]:
         """Generate chart data for Recharts visualization"""
         
         # 1. Vital signs trends (line chart)
-        vital_trends = self._get_vital_trends(patient_id)
+        with measure(timing, "chart.vital_trends"):
+            vital_trends = self._get_vital_trends(patient)
         
         # 2. Conditions timeline (bar chart)
-        conditions_timeline = self._get_conditions_timeline(patient_id)
+        with measure(timing, "chart.conditions_timeline"):
+            conditions_timeline = self._get_conditions_timeline(patient)
         
         # 3. Healthcare costs (pie chart)
-        cost_breakdown = self._get_cost_breakdown(patient_id)
+        with measure(timing, "chart.cost_breakdown"):
+            cost_breakdown = self._get_cost_breakdown(patient)
         
         # 4. Medication adherence (line chart)
-        medication_timeline = self._get_medication_timeline(patient_id)
+        with measure(timing, "chart.medication_timeline"):
+            medication_timeline = self._get_medication_timeline(patient)
         
         return {
             "vital_trends": vital_trends,
@@ -308,9 +439,9 @@ class PatientService:
             "medication_timeline": medication_timeline
         }
     
-    def _get_vital_trends(self, patient_id: str) -> List[Dict[str, Any]]:
+    def _get_vital_trends(self, patient: PatientSlice) -> List[Dict[str, Any]]:
         """Get vital signs trends for line chart"""
-        observations = self.data.observations[self.data.observations['PATIENT'] == patient_id]
+        observations = patient.observations
         
         # Focus on key vitals from last year
         vital_codes = ['8480-6', '8462-4', '8310-5', '9279-1']  # BP systolic, diastolic, temp, resp rate
@@ -330,54 +461,52 @@ class PatientService:
         # Convert VALUE column to float
         recent_vitals['VALUE'] = pd.to_numeric(recent_vitals['VALUE'], errors='coerce')
 
-        # Group by month and get averages
+        # Group by month and get averages, one column per vital sign
         recent_vitals.loc[:, 'month'] = recent_vitals['DATE'].dt.to_period('M')
-        monthly_vitals = recent_vitals.groupby(['month', 'DESCRIPTION'])['VALUE'].mean().reset_index()
+        monthly_vitals = (
+            recent_vitals.groupby(['month', 'DESCRIPTION'])['VALUE'].mean()
+            .unstack('DESCRIPTION')
+            .sort_index()
+        )
         
-        # Convert to Recharts format
-        chart_data = []
-        for month_period in monthly_vitals['month'].unique():
-            month_data = {"month": str(month_period)}
-            month_vitals = monthly_vitals[monthly_vitals['month'] == month_period]
-            
-            for _, row in month_vitals.iterrows():
-                month_data[row['DESCRIPTION']] = round(float(row['VALUE']), 1)
-            
-            chart_data.append(month_data)
-        
-        return sorted(chart_data, key=lambda x: x['month'])
+        # Convert to Recharts format, skipping vitals not measured in a given month
+        return [
+            {
+                "month": str(month_period),
+                **{description: round(float(value), 1) for description, value in vitals.items() if pd.notna(value)}
+            }
+            for month_period, vitals in monthly_vitals.to_dict(orient="index").items()
+        ]
     
-    def _get_conditions_timeline(self, patient_id: str) -> List[Dict[str, Any]]:
+    def _get_conditions_timeline(self, patient: PatientSlice) -> List[Dict[str, Any]]:
         """Get conditions count by year for bar chart"""
-        conditions = self.data.conditions[self.data.conditions['PATIENT'] == patient_id]
+        conditions = patient.conditions
         
         # Get conditions by year
-        conditions = conditions.copy(deep=True)
-        conditions.loc[:, 'year'] = conditions['START'].dt.year
-        yearly_counts = conditions.groupby('year').size().reset_index(name='count')
+        yearly_counts = conditions['START'].dt.year.value_counts().sort_index().tail(5)
         
         return [
-            {"year": int(row['year']), "conditions": int(row['count'])}
-            for _, row in yearly_counts.tail(5).iterrows()
+            {"year": int(year), "conditions": int(count)}
+            for year, count in yearly_counts.items()
         ]
     
-    def _get_cost_breakdown(self, patient_id: str) -> List[Dict[str, Any]]:
+    def _get_cost_breakdown(self, patient: PatientSlice) -> List[Dict[str, Any]]:
         """Get healthcare cost breakdown for pie chart"""
         
         # Encounter costs
-        encounters = self.data.encounters[self.data.encounters['PATIENT'] == patient_id]
+        encounters = patient.encounters
         encounter_cost = encounters['TOTAL_CLAIM_COST'].sum()
         
         # Procedure costs
-        procedures = self.data.procedures[self.data.procedures['PATIENT'] == patient_id]
+        procedures = patient.procedures
         procedure_cost = procedures['BASE_COST'].sum()
         
         # Medication costs
-        medications = self.data.medications[self.data.medications['PATIENT'] == patient_id]
+        medications = patient.medications
         medication_cost = medications['TOTALCOST'].sum()
         
         # Immunization costs
-        immunizations = self.data.immunizations[self.data.immunizations['PATIENT'] == patient_id]
+        immunizations = patient.immunizations
         immunization_cost = immunizations['BASE_COST'].sum()
         
         return [
@@ -387,35 +516,34 @@ class PatientService:
             {"name": "Immunizations", "value": float(immunization_cost), "fill": "#ff7c7c"}
         ]
     
-    def _get_medication_timeline(self, patient_id: str) -> List[Dict[str, Any]]:
+    def _get_medication_timeline(self, patient: PatientSlice) -> List[Dict[str, Any]]:
         """Get medication count over time"""
-        medications = self.data.medications[self.data.medications['PATIENT'] == patient_id]
+        medications = patient.medications
         
         # Get active medications by month for last year
         cutoff_date = medications['START'].max() - timedelta(days=365)
         recent_meds = medications[medications['START'] > cutoff_date]
         
-        recent_meds['month'] = recent_meds['START'].dt.to_period('M')
-        monthly_meds = recent_meds.groupby('month').size().reset_index(name='count')
+        monthly_meds = recent_meds['START'].dt.to_period('M').value_counts().sort_index()
         
         return [
-            {"month": str(row['month']), "medications": int(row['count'])}
-            for _, row in monthly_meds.iterrows()
+            {"month": str(month), "medications": int(count)}
+            for month, count in monthly_meds.items()
         ]
     
-    def _get_summary_stats(self, patient_id: str) -> Dict[str, Any]:
+    def _get_summary_stats(self, patient: PatientSlice) -> Dict[str, Any]:
         """Get summary statistics for patient"""
         
         # Count active conditions
-        conditions = self.data.conditions[self.data.conditions['PATIENT'] == patient_id]
+        conditions = patient.conditions
         active_conditions = conditions[conditions['STOP'].isna()]
         
         # Count active medications
-        medications = self.data.medications[self.data.medications['PATIENT'] == patient_id]
+        medications = patient.medications
         active_medications = medications[medications['STOP'].isna()]
         
         # Total healthcare expenses
-        encounters = self.data.encounters[self.data.encounters['PATIENT'] == patient_id]
+        encounters = patient.encounters
         total_costs = encounters['TOTAL_CLAIM_COST'].sum()
         
         # Recent encounter count
@@ -429,3 +557,17 @@ class PatientService:
             "encounters_last_year": len(recent_encounters),
             "last_encounter_date": encounters['START'].max().strftime('%Y-%m-%d') if not encounters.empty else None
         }
+
+
+# Singleton instance
+_patient_service: Optional[PatientService] = None
+_patient_service_lock = threading.Lock()
+
+def get_patient_service() -> PatientService:
+    """Dependency injection for Patient service, loading the dataset once per process"""
+    global _patient_service
+    if _patient_service is None:
+        with _patient_service_lock:
+            if _patient_service is None:
+                _patient_service = PatientService()
+    return _patient_service
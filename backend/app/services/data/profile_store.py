@@ -0,0 +1,172 @@
+import json
+import sqlite3
+import threading
+import traceback
+import zlib
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+from app.models.patient import PatientServiceLoadedData
+from app.config.logging_setup import get_logger
+from app.utils.file_locator import ROOT_DIR
+from app.services.data.patient_service import PATIENT_TABLES
+
+
+logger = get_logger(__name__)
+
+PROFILE_STORE_PATH = ROOT_DIR / "data" / "profiles" / "patient_profiles.sqlite"
+
+# Bump whenever the profile layout changes so every stored profile is rebuilt
+PROFILE_STORE_VERSION = 1
+
+
+def compute_patient_fingerprints(data: PatientServiceLoadedData) -> Dict[str, str]:
+    """
+    Fingerprint each patient's source rows across all patient-keyed tables.
+
+    Row hashes are summed per patient, so the fingerprint does not depend on row order
+    and only changes when that patient's rows are added, removed or edited.
+    """
+    patients = data.patients
+    table_hashes = {
+        "patients": pd.Series(
+            pd.util.hash_pandas_object(patients, index=False).to_numpy(),
+            index=patients['Id']
+        )
+    }
+    for df_name in PATIENT_TABLES:
+        df = getattr(data, df_name)
+        row_hashes = pd.util.hash_pandas_object(df, index=False)
+        table_hashes[df_name] = row_hashes.groupby(df['PATIENT'].to_numpy()).sum()
+
+    return combine_table_hashes(patients['Id'], table_hashes)
+
+
+def combine_table_hashes(patient_ids: pd.Series, table_hashes: Dict[str, pd.Series]) -> Dict[str, str]:
+    """
+    Fingerprint each patient from their uint64 row hash sum in every table.
+
+    Patients without rows in a table count as a sum of 0. Each table is filled on its own so
+    sums stay uint64, since a float64 column would round away their low bits.
+    """
+    combined = pd.DataFrame({
+        df_name: hashes.reindex(patient_ids, fill_value=0).astype('uint64')
+        for df_name, hashes in table_hashes.items()
+    })
+    combined['version'] = PROFILE_STORE_VERSION
+
+    fingerprints = pd.util.hash_pandas_object(combined, index=True)
+    return {patient_id: f"{value:016x}" for patient_id, value in fingerprints.items()}
+
+
+class ProfileStore:
+    """
+    On-disk store of precomputed patient profiles keyed by patient id.
+
+    Profiles are written by scripts/materialize_profiles.py, which must be re-run whenever
+    the processed Parquet data changes.
+    """
+
+    def __init__(self, path: Path = PROFILE_STORE_PATH):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _connect_for_write(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        # WAL lets API workers keep reading while the materialization job writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS profiles (
+                patient_id TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                profile BLOB NOT NULL,
+                materialized_at TEXT NOT NULL
+            )
+            """
+        )
+        return conn
+
+    @staticmethod
+    def _encode(profile: Dict[str, Any]) -> bytes:
+        return zlib.compress(json.dumps(profile, default=str).encode("utf-8"))
+
+    @staticmethod
+    def _decode(blob: bytes) -> Dict[str, Any]:
+        return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+    def get(self, patient_id: str) -> Optional[Dict[str, Any]]:
+        """Get a materialized profile, or None if the patient has not been materialized"""
+        if not self.path.exists():
+            return None
+
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT profile FROM profiles WHERE patient_id = ?", (patient_id,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"An error occurred while reading profile store: {e}.\n{traceback.format_exc()}")
+            return None
+
+        if row is None:
+            return None
+
+        profile = self._decode(row[0])
+        self._refresh_age(profile)
+        return profile
+
+    def get_fingerprints(self) -> Dict[str, str]:
+        """Get the fingerprint of every materialized profile"""
+        if not self.path.exists():
+            return {}
+
+        with closing(self._connect_for_write()) as conn, conn:
+            return dict(conn.execute("SELECT patient_id, fingerprint FROM profiles"))
+
+    def put_many(self, rows: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Insert or replace (patient_id, fingerprint, profile) rows in one transaction"""
+        materialized_at = datetime.now().isoformat()
+        with closing(self._connect_for_write()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO profiles (patient_id, fingerprint, profile, materialized_at) VALUES (?, ?, ?, ?)",
+                [
+                    (patient_id, fingerprint, self._encode(profile), materialized_at)
+                    for patient_id, fingerprint, profile in rows
+                ]
+            )
+
+    def delete_many(self, patient_ids: List[str]) -> None:
+        """Remove profiles of patients no longer in the dataset"""
+        with closing(self._connect_for_write()) as conn, conn:
+            conn.executemany("DELETE FROM profiles WHERE patient_id = ?", [(i,) for i in patient_ids])
+
+    @staticmethod
+    def _refresh_age(profile: Dict[str, Any]) -> None:
+        """Ages are relative to today, so recompute them from the stored birthdate on read"""
+        patient_info = profile.get("patient_info") or {}
+        if not patient_info.get("birthdate"):
+            return
+
+        birthdate = datetime.strptime(patient_info["birthdate"], "%Y-%m-%d")
+        today = datetime.now()
+        patient_info["age"] = today.year - birthdate.year - ((today.month, today.day) < (birthdate.month, birthdate.day))
+
+
+# Singleton instance
+_profile_store: Optional[ProfileStore] = None
+_profile_store_lock = threading.Lock()
+
+def get_profile_store() -> ProfileStore:
+    """Dependency injection for the materialized profile store"""
+    global _profile_store
+    if _profile_store is None:
+        with _profile_store_lock:
+            if _profile_store is None:
+                _profile_store = ProfileStore()
+    return _profile_store
@@ -0,0 +1,174 @@
+import asyncio
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+import httpx
+from app.models.health import DependencyHealth
+from app.services.data.patient_service import get_patient_service
+from app.services.llm.ollama_client import OllamaConnectionError
+from app.services.llm.ollama_warmup import get_ollama_warmup_manager
+from app.config.logging_setup import get_logger
+from app.config.settings import get_settings
+
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+Probe = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class HealthMonitor:
+    """
+    Probes registered dependencies in the background and keeps their latest health in memory.
+
+    Every `interval` seconds all probes run concurrently, each cut off after `timeout` seconds.
+    A probe returns details of the dependency on success and raises on failure. Health
+    endpoints read the stored results, so they never wait on a slow upstream.
+    """
+
+    def __init__(self, interval: float = 15.0, timeout: float = 5.0, window: int = 20):
+        self.interval = interval
+        self.timeout = timeout
+        self._probes: Dict[str, Probe] = {}
+        self._health: Dict[str, DependencyHealth] = {}
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._window = window
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, probe: Probe) -> None:
+        self._probes[name] = probe
+        self._health[name] = DependencyHealth(name=name)
+        self._latencies[name] = deque(maxlen=self._window)
+
+    def get_health(self, name: str) -> DependencyHealth:
+        return self._health[name]
+
+    def get_all(self) -> Dict[str, DependencyHealth]:
+        return dict(self._health)
+
+    def _latency_quantile(self, name: str, q: float) -> Optional[float]:
+        latencies = sorted(self._latencies[name])
+        if not latencies:
+            return None
+        return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)], 2)
+
+    async def probe(self, name: str) -> DependencyHealth:
+        """Run one probe within the deadline and store its result"""
+        previous = self._health[name]
+        start_time = time.monotonic()
+        try:
+            details = await asyncio.wait_for(self._probes[name](), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            error_message = f"Probe exceeded {self.timeout:.1f}s deadline"
+        except Exception as e:
+            error_message = str(e) or type(e).__name__
+        else:
+            latency_ms = (time.monotonic() - start_time) * 1000
+            self._latencies[name].append(latency_ms)
+            self._health[name] = DependencyHealth(
+                name=name,
+                status="healthy",
+                last_checked=datetime.now(),
+                latency_ms=round(latency_ms, 2),
+                latency_p50_ms=self._latency_quantile(name, 0.5),
+                latency_p95_ms=self._latency_quantile(name, 0.95),
+                details=details
+            )
+            return self._health[name]
+
+        if previous.status != "unhealthy":
+            logger.warning(f"Health probe for {name} failed: {error_message}")
+        self._health[name] = previous.model_copy(update={
+            "status": "unhealthy",
+            "last_checked": datetime.now(),
+            "latency_ms": None,
+            "consecutive_failures": previous.consecutive_failures + 1,
+            "error_message": error_message
+        })
+        return self._health[name]
+
+    async def probe_all(self) -> None:
+        await asyncio.gather(*(self.probe(name) for name in self._probes))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"An error occurred while probing dependencies: {e}.\n{traceback.format_exc()}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start probing in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop probing"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def probe_ollama() -> Dict[str, Any]:
+    # The Ollama server used by summaries, so probes also refresh the model catalog its warm-up reads
+    ollama_service = get_ollama_warmup_manager().ollama_service
+    health_status = await ollama_service.health_check(use_cache=False)
+    if not health_status.is_healthy:
+        raise OllamaConnectionError(health_status.error_message)
+
+    return {
+        "available_models": health_status.available_models,
+        "total_models": health_status.total_models
+    }
+
+
+async def probe_groq() -> Dict[str, Any]:
+    async with httpx.AsyncClient() as client:
+        response = await client.get(
+            f"{settings.GROQ_API_URL.rstrip('/')}/models",
+            headers={"Authorization": f"Bearer {settings.GROQ_API_KEY}"}
+        )
+        response.raise_for_status()
+
+    model_ids: List[str] = [model["id"] for model in response.json().get("data", [])]
+    return {
+        "model": settings.GROQ_MODEL_REASONING,
+        "model_available": settings.GROQ_MODEL_REASONING in model_ids
+    }
+
+
+async def probe_patient_data() -> Dict[str, Any]:
+    patient_service = get_patient_service()
+    return {"patients": len(patient_service.data.patients)}
+
+
+# Singleton instance
+_health_monitor: Optional[HealthMonitor] = None
+
+def get_health_monitor() -> HealthMonitor:
+    """Dependency injection for the background health monitor"""
+    global _health_monitor
+    if _health_monitor is None:
+        _health_monitor = HealthMonitor(
+            interval=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+            timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+            window=settings.HEALTH_LATENCY_WINDOW
+        )
+        _health_monitor.register("ollama", probe_ollama)
+        _health_monitor.register("groq", probe_groq)
+        _health_monitor.register("patient_data", probe_patient_data)
+    return _health_monitor
+
+async def cleanup_health_monitor():
+    """Stop the background health monitor"""
+    global _health_monitor
+    if _health_monitor:
+        await _health_monitor.stop()
+        _health_monitor = None
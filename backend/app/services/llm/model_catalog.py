@@ -0,0 +1,116 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from app.models.ollama import OllamaModelInfo
+from app.config.logging_setup import get_logger
+from app.config.settings import get_settings
+
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class ModelCatalog:
+    """
+    Models installed on one Ollama server, as last listed by its /api/tags endpoint.
+
+    Each refresh hands over the raw listing. Its name and digest pairs are fingerprinted first,
+    so an unchanged listing only bumps the refresh time, and on a change only models whose digest
+    changed are parsed again. Entries older than `max_age` seconds are stale and get refetched.
+    """
+
+    def __init__(self, base_url: str, max_age: float = 60.0):
+        self.base_url = base_url
+        self.max_age = timedelta(seconds=max_age)
+        self.fingerprint: Optional[str] = None
+        self.last_refreshed: Optional[datetime] = None
+        self._models: Dict[str, OllamaModelInfo] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(models_data: List[Dict[str, Any]]) -> str:
+        entries = sorted(f"{model_data.get('name')}@{model_data.get('digest')}" for model_data in models_data)
+        return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _parse_model(model_data: Dict[str, Any]) -> Optional[OllamaModelInfo]:
+        try:
+            return OllamaModelInfo(
+                name=model_data["name"],
+                size=model_data["size"],
+                digest=model_data["digest"],
+                modified_at=datetime.fromisoformat(
+                    model_data["modified_at"].replace("Z", "+00:00")
+                )
+            )
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Failed to parse model data {model_data}: {e}")
+            return None
+
+    def update(self, models_data: List[Dict[str, Any]]) -> bool:
+        """
+        Replace the catalog with a fresh /api/tags listing
+
+        Args:
+            models_data: Entries of the "models" list returned by /api/tags
+
+        Returns:
+            True if the installed models changed since the last refresh
+        """
+        fingerprint = self._fingerprint(models_data)
+        with self._lock:
+            self.last_refreshed = datetime.now()
+            if fingerprint == self.fingerprint:
+                return False
+
+            models = {}
+            for model_data in models_data:
+                current = self._models.get(model_data.get("name"))
+                if current is not None and current.digest == model_data.get("digest"):
+                    models[current.name] = current
+                    continue
+
+                model = self._parse_model(model_data)
+                if model is not None:
+                    models[model.name] = model
+
+            added = models.keys() - self._models.keys()
+            removed = self._models.keys() - models.keys()
+            if self.fingerprint is not None:
+                logger.info(f"Ollama models changed on {self.base_url}: added {sorted(added)}, removed {sorted(removed)}")
+
+            self._models = models
+            self.fingerprint = fingerprint
+            return True
+
+    @property
+    def is_populated(self) -> bool:
+        return self.last_refreshed is not None
+
+    def is_stale(self) -> bool:
+        return self.last_refreshed is None or datetime.now() - self.last_refreshed > self.max_age
+
+    def get_models(self) -> List[OllamaModelInfo]:
+        with self._lock:
+            return list(self._models.values())
+
+    def get_model(self, model_name: str) -> Optional[OllamaModelInfo]:
+        with self._lock:
+            return self._models.get(model_name)
+
+    def has_model(self, model_name: str) -> bool:
+        return self.get_model(model_name) is not None
+
+
+# Catalogs shared by every client of the same Ollama server
+_model_catalogs: Dict[str, ModelCatalog] = {}
+_model_catalogs_lock = threading.Lock()
+
+def get_model_catalog(base_url: str) -> ModelCatalog:
+    """Get the model catalog of an Ollama server, creating it on first use"""
+    base_url = base_url.rstrip("/")
+    with _model_catalogs_lock:
+        if base_url not in _model_catalogs:
+            _model_catalogs[base_url] = ModelCatalog(base_url, max_age=settings.OLLAMA_MODEL_CATALOG_MAX_AGE_SECONDS)
+        return _model_catalogs[base_url]
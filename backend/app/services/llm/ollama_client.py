@@ -1,33 +1,110 @@
 import httpx
 import asyncio
-from typing import Dict, List, Optional, Any
+import contextlib
+import functools
+import json
+from typing import AsyncIterator, Dict, List, Optional, Any
 from datetime import datetime, timedelta
 
-from app.models.ollama import OllamaModelInfo, OllamaHealthStatus
+from app.models.ollama import OllamaModelInfo, OllamaHealthStatus, OllamaStreamChunk, OllamaRunningModel
 from app.config.logging_setup import get_logger
 from app.config.settings import get_settings
+from app.services.llm.model_catalog import ModelCatalog, get_model_catalog
+from app.services.llm.router import llm_requests_in_flight, llm_time_to_first_token_seconds, llm_tokens_per_second
+from app.utils.circuit_breaker import CircuitBreaker, get_circuit_breaker
 
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+# Metadata calls are expected to answer quickly
+DEFAULT_TIMEOUT = httpx.Timeout(connect=5.0, read=10.0, write=5.0, pool=5.0)
+
+# Generation may wait on a model load and prompt prefill before the first byte, and between
+# streamed chunks the read timeout applies per chunk rather than to the whole response
+GENERATION_TIMEOUT = httpx.Timeout(connect=5.0, read=settings.OLLAMA_GENERATION_READ_TIMEOUT_SECONDS, write=5.0, pool=5.0)
+
 
 class OllamaConnectionError(Exception):
-    """Custom exception for Ollama connection issues"""
-    pass
+    """Custom exception for Ollama connection issues, with the HTTP status of error responses"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def is_server_failure(self) -> bool:
+        """Whether the server failed, rather than answering a bad request such as an unknown model"""
+        return self.status_code is None or self.status_code >= 500
+
+
+def _record_outcome(circuit_breaker: CircuitBreaker, succeeded: Optional[bool]) -> None:
+    """Feed a call outcome to the breaker, where None is a call that ended without one, e.g. cancelled"""
+    if succeeded is None:
+        circuit_breaker.release()
+    elif succeeded:
+        circuit_breaker.record_success()
+    else:
+        circuit_breaker.record_failure()
+
+
+def _circuit_guarded(method):
+    """
+    Fail fast while the server's circuit is open, and feed call outcomes to the breaker.
+
+    Only transport errors and 5xx responses count as failures, since a 4xx means the server is up.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        self._check_circuit()
+        succeeded = None
+        try:
+            result = await method(self, *args, **kwargs)
+            succeeded = True
+            return result
+        except OllamaConnectionError as e:
+            succeeded = not e.is_server_failure
+            raise
+        finally:
+            # Cancelled calls still free their half-open trial slot
+            _record_outcome(self.circuit_breaker, succeeded)
+    return wrapper
+
+
+def _circuit_guarded_stream(method):
+    """_circuit_guarded for async generator methods, where a stream closed early by its caller has no outcome"""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        self._check_circuit()
+        succeeded = None
+        try:
+            # Closing the inner stream with this one ends its request as soon as the caller stops reading
+            async with contextlib.aclosing(method(self, *args, **kwargs)) as items:
+                async for item in items:
+                    yield item
+            succeeded = True
+        except OllamaConnectionError as e:
+            succeeded = not e.is_server_failure
+            raise
+        finally:
+            _record_outcome(self.circuit_breaker, succeeded)
+    return wrapper
 
 
 class OllamaService:
     def __init__(self, base_url: str = settings.OLLAMA_API_URL_LOCAL):
         self.base_url = base_url.rstrip("/")
         self.client: Optional[httpx.AsyncClient] = None
+        # Shared with every other client of the same server, including the summary pipeline
+        self.circuit_breaker = get_circuit_breaker(f"ollama@{self.base_url}")
+        self.model_catalog = get_model_catalog(self.base_url)
         self._last_health_check: Optional[OllamaHealthStatus] = None
         self._health_check_cache_duration = timedelta(minutes=5)
         
     async def __aenter__(self):
         """Async context manager entry"""
         self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(connect=5.0, read=10.0, write=5.0, pool=5.0),
+            timeout=DEFAULT_TIMEOUT,
             limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
         )
         return self
@@ -37,21 +114,29 @@ class OllamaService:
         if self.client:
             await self.client.aclose()
             
+    def _check_circuit(self):
+        """
+        Raises:
+            OllamaConnectionError: If the circuit is open, without waiting on connect or read timeouts
+        """
+        if not self.circuit_breaker.allow_request():
+            raise OllamaConnectionError(
+                f"Ollama server marked unavailable, retry in {self.circuit_breaker.retry_after():.1f}s"
+            )
+            
     async def _ensure_client(self):
         """Ensure client is initialized"""
         if not self.client:
             self.client = httpx.AsyncClient(
-                timeout=httpx.Timeout(connect=5.0, read=10.0, write=5.0, pool=5.0),
+                timeout=DEFAULT_TIMEOUT,
                 limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
             )
     
-    async def get_models(self) -> List[OllamaModelInfo]:
+    @_circuit_guarded
+    async def _fetch_model_tags(self) -> List[Dict[str, Any]]:
         """
-        Fetch all available models from Ollama server
-        
-        Returns:
-            List of OllamaModelInfo objects
-            
+        Fetch the raw model listing of the Ollama server
+
         Raises:
             OllamaConnectionError: If unable to connect or fetch models
         """
@@ -63,37 +148,47 @@ class OllamaService:
             end_time = asyncio.get_event_loop().time()
             
             response.raise_for_status()
-            data = response.json()
-            
-            models = []
-            for model_data in data.get("models", []):
-                try:
-                    model = OllamaModelInfo(
-                        name=model_data["name"],
-                        size=model_data["size"],
-                        digest=model_data["digest"],
-                        modified_at=datetime.fromisoformat(
-                            model_data["modified_at"].replace("Z", "+00:00")
-                        )
-                    )
-                    models.append(model)
-                except (KeyError, ValueError) as e:
-                    logger.warning(f"Failed to parse model data {model_data}: {e}")
-                    continue
-                    
-            logger.info(f"Successfully fetched {len(models)} models from Ollama in {(end_time - start_time)*1000:.2f}ms")
-            return models
+            models_data = response.json().get("models", [])
+            logger.info(f"Successfully fetched {len(models_data)} models from Ollama in {(end_time - start_time)*1000:.2f}ms")
+            return models_data
             
         except httpx.TimeoutException:
             raise OllamaConnectionError("Timeout while connecting to Ollama server")
         except httpx.ConnectError:
             raise OllamaConnectionError("Unable to connect to Ollama server")
         except httpx.HTTPStatusError as e:
-            raise OllamaConnectionError(f"HTTP error from Ollama server: {e.response.status_code}")
+            raise OllamaConnectionError(f"HTTP error from Ollama server: {e.response.status_code}", status_code=e.response.status_code)
         except Exception as e:
             logger.error(f"Unexpected error fetching models: {e}")
             raise OllamaConnectionError(f"Unexpected error: {str(e)}")
     
+    async def refresh_model_catalog(self) -> ModelCatalog:
+        """
+        Refetch the model catalog from the Ollama server
+
+        Raises:
+            OllamaConnectionError: If unable to connect or fetch models
+        """
+        self.model_catalog.update(await self._fetch_model_tags())
+        return self.model_catalog
+    
+    async def get_models(self, use_cache: bool = True) -> List[OllamaModelInfo]:
+        """
+        Fetch all available models from Ollama server
+        
+        Args:
+            use_cache: Whether to answer from the model catalog while it is fresh
+            
+        Returns:
+            List of OllamaModelInfo objects
+            
+        Raises:
+            OllamaConnectionError: If unable to connect or fetch models
+        """
+        if not use_cache or self.model_catalog.is_stale():
+            await self.refresh_model_catalog()
+        return self.model_catalog.get_models()
+    
     async def health_check(self, use_cache: bool = True) -> OllamaHealthStatus:
         """
         Perform comprehensive health check of Ollama server
@@ -127,16 +222,16 @@ class OllamaService:
             response.raise_for_status()
             response_time_ms = (end_time - start_time) * 1000
             
-            data = response.json()
-            models = data.get("models", [])
-            model_names = [model["name"] for model in models]
+            # Share the listing with model availability checks
+            self.model_catalog.update(response.json().get("models", []))
+            model_names = [model.name for model in self.model_catalog.get_models()]
             
             health_status.is_healthy = True
             health_status.response_time_ms = response_time_ms
             health_status.available_models = model_names
-            health_status.total_models = len(models)
+            health_status.total_models = len(model_names)
             
-            logger.info(f"Ollama health check passed: {len(models)} models available, response time: {response_time_ms:.2f}ms")
+            logger.info(f"Ollama health check passed: {len(model_names)} models available, response time: {response_time_ms:.2f}ms")
             
         except httpx.TimeoutException:
             health_status.error_message = "Connection timeout"
@@ -157,7 +252,7 @@ class OllamaService:
     
     async def is_model_available(self, model_name: str) -> bool:
         """
-        Check if a specific model is available
+        Check if a specific model is available, from the model catalog while it is fresh
         
         Args:
             model_name: Name of the model to check
@@ -166,11 +261,90 @@ class OllamaService:
             True if model is available, False otherwise
         """
         try:
-            models = await self.get_models()
-            return any(model.name == model_name for model in models)
+            await self.get_models()
         except OllamaConnectionError:
             return False
+        return self.model_catalog.has_model(model_name)
+    
+    @_circuit_guarded
+    async def get_running_models(self) -> List[OllamaRunningModel]:
+        """
+        Fetch the models currently loaded in Ollama's memory
+        
+        Returns:
+            List of OllamaRunningModel objects
+            
+        Raises:
+            OllamaConnectionError: If unable to connect or fetch running models
+        """
+        await self._ensure_client()
+        
+        try:
+            response = await self.client.get(f"{self.base_url}/api/ps")
+            response.raise_for_status()
+            data = response.json()
+            
+            return [
+                OllamaRunningModel(
+                    name=model_data["name"],
+                    size_vram=model_data.get("size_vram"),
+                    expires_at=model_data.get("expires_at")
+                )
+                for model_data in data.get("models", [])
+            ]
+            
+        except httpx.TimeoutException:
+            raise OllamaConnectionError("Timeout while connecting to Ollama server")
+        except httpx.ConnectError:
+            raise OllamaConnectionError("Unable to connect to Ollama server")
+        except httpx.HTTPStatusError as e:
+            raise OllamaConnectionError(f"HTTP error from Ollama server: {e.response.status_code}", status_code=e.response.status_code)
+        except Exception as e:
+            raise OllamaConnectionError(f"Unexpected error: {str(e)}")
+    
+    @_circuit_guarded
+    async def load_model(self, model: str, keep_alive: str) -> Dict[str, Any]:
+        """
+        Load a model into memory, or extend how long it stays loaded, without generating
+        
+        Args:
+            model: Model name to load
+            keep_alive: How long Ollama keeps the model loaded after this request, e.g. "10m"
+            
+        Returns:
+            Response from Ollama API
+            
+        Raises:
+            OllamaConnectionError: If unable to connect or load the model
+        """
+        await self._ensure_client()
+        
+        # A generate request without a prompt only loads the model
+        payload = {
+            "model": model,
+            "keep_alive": keep_alive,
+            "stream": False
+        }
+        
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=GENERATION_TIMEOUT
+            )
+            response.raise_for_status()
+            return response.json()
+            
+        except httpx.TimeoutException:
+            raise OllamaConnectionError("Timeout while loading model")
+        except httpx.ConnectError:
+            raise OllamaConnectionError("Unable to connect to Ollama server")
+        except httpx.HTTPStatusError as e:
+            raise OllamaConnectionError(f"HTTP error while loading model: {e.response.status_code}", status_code=e.response.status_code)
+        except Exception as e:
+            raise OllamaConnectionError(f"Unexpected error while loading model: {str(e)}")
     
+    @_circuit_guarded
     async def generate_completion(self, model: str, prompt: str, **kwargs) -> Dict[str, Any]:
         """
         Generate completion using Ollama
@@ -198,7 +372,8 @@ class OllamaService:
         try:
             response = await self.client.post(
                 f"{self.base_url}/api/generate",
-                json=payload
+                json=payload,
+                timeout=GENERATION_TIMEOUT
             )
             response.raise_for_status()
             return response.json()
@@ -208,7 +383,97 @@ class OllamaService:
         except httpx.ConnectError:
             raise OllamaConnectionError("Unable to connect to Ollama server")
         except httpx.HTTPStatusError as e:
-            raise OllamaConnectionError(f"HTTP error during completion: {e.response.status_code}")
+            raise OllamaConnectionError(f"HTTP error during completion: {e.response.status_code}", status_code=e.response.status_code)
+        except Exception as e:
+            raise OllamaConnectionError(f"Unexpected error during completion: {str(e)}")
+
+    @_circuit_guarded_stream
+    async def stream_completion(self, model: str, prompt: str, **kwargs) -> AsyncIterator[OllamaStreamChunk]:
+        """
+        Generate completion using Ollama, yielding chunks as they are generated
+        
+        Args:
+            model: Model name to use
+            prompt: The prompt text
+            **kwargs: Additional parameters for the generation
+            
+        Yields:
+            OllamaStreamChunk per NDJSON line, the first one carrying content reports time to
+            first token and the final one (done=True) reports tokens per second
+            
+        Raises:
+            OllamaConnectionError: If unable to connect or generate completion
+        """
+        await self._ensure_client()
+        
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            **kwargs,
+            "stream": True
+        }
+        
+        start_time = asyncio.get_event_loop().time()
+        time_to_first_token_ms = None
+        
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=GENERATION_TIMEOUT
+            ) as response:
+                with llm_requests_in_flight.track_inprogress(backend="ollama"):
+                    response.raise_for_status()
+                
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                    
+                        data = json.loads(line)
+                        if "error" in data:
+                            raise OllamaConnectionError(f"Ollama error during completion: {data['error']}")
+                    
+                        chunk = OllamaStreamChunk(
+                            model=data.get("model", model),
+                            content=data.get("response", ""),
+                            done=data.get("done", False)
+                        )
+                    
+                        if time_to_first_token_ms is None and chunk.content:
+                            time_to_first_token_ms = (asyncio.get_event_loop().time() - start_time) * 1000
+                            chunk.time_to_first_token_ms = time_to_first_token_ms
+                    
+                        if chunk.done:
+                            # Durations are reported in nanoseconds
+                            eval_duration = data.get("eval_duration")
+                            chunk.done_reason = data.get("done_reason")
+                            chunk.time_to_first_token_ms = time_to_first_token_ms
+                            chunk.prompt_eval_count = data.get("prompt_eval_count")
+                            chunk.eval_count = data.get("eval_count")
+                            if data.get("total_duration"):
+                                chunk.total_duration_ms = data["total_duration"] / 1e6
+                            if chunk.eval_count and eval_duration:
+                                chunk.tokens_per_second = chunk.eval_count / (eval_duration / 1e9)
+                                llm_tokens_per_second.observe(chunk.tokens_per_second, backend="ollama")
+                            if time_to_first_token_ms is not None:
+                                llm_time_to_first_token_seconds.observe(time_to_first_token_ms / 1000, backend="ollama")
+                        
+                            logger.info(
+                                f"Ollama stream completed: model={chunk.model}, ttft={time_to_first_token_ms or 0:.2f}ms, "
+                                f"tokens={chunk.eval_count}, tokens_per_second={chunk.tokens_per_second or 0:.2f}"
+                            )
+                    
+                        yield chunk
+                    
+        except OllamaConnectionError:
+            raise
+        except httpx.TimeoutException:
+            raise OllamaConnectionError("Timeout during completion generation")
+        except httpx.ConnectError:
+            raise OllamaConnectionError("Unable to connect to Ollama server")
+        except httpx.HTTPStatusError as e:
+            raise OllamaConnectionError(f"HTTP error during completion: {e.response.status_code}", status_code=e.response.status_code)
         except Exception as e:
             raise OllamaConnectionError(f"Unexpected error during completion: {str(e)}")
 
@@ -0,0 +1,136 @@
+import asyncio
+import time
+import traceback
+from datetime import datetime
+from typing import Optional
+from app.models.ollama import OllamaModelLoadState
+from app.services.llm.ollama_client import OllamaService, OllamaConnectionError
+from app.config.logging_setup import get_logger
+from app.config.settings import get_settings
+
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class OllamaWarmupManager:
+    """
+    Keeps the summary fallback model loaded in Ollama so requests do not pay its load time.
+
+    The model is preloaded on start, then its keep-alive is refreshed every `refresh_interval`
+    seconds for as long as summaries were requested within the last `idle_timeout` seconds.
+    Once traffic stops, Ollama unloads the model when its keep-alive runs out.
+    """
+
+    def __init__(
+        self,
+        ollama_service: OllamaService,
+        model: str = settings.OLLAMA_MODEL,
+        keep_alive: str = settings.OLLAMA_KEEP_ALIVE,
+        refresh_interval: float = settings.OLLAMA_KEEP_ALIVE_REFRESH_SECONDS,
+        idle_timeout: float = settings.OLLAMA_WARMUP_IDLE_SECONDS
+    ):
+        self.ollama_service = ollama_service
+        self.model = model
+        self.keep_alive = keep_alive
+        self.refresh_interval = refresh_interval
+        self.idle_timeout = idle_timeout
+        self._state = OllamaModelLoadState(model=model)
+        self._last_activity = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    def record_activity(self) -> None:
+        """Mark that the model may be needed soon, keeping it loaded"""
+        self._last_activity = time.monotonic()
+        self._state.last_activity = datetime.now()
+
+    def get_state(self) -> OllamaModelLoadState:
+        return self._state.model_copy()
+
+    async def warm_up(self) -> OllamaModelLoadState:
+        """Load the model, or refresh its keep-alive, and record the resulting load state"""
+        # Loading a model that is not installed would only fail after a round trip to Ollama
+        if not await self.ollama_service.is_model_available(self.model):
+            self._state = self._state.model_copy(update={
+                "is_loaded": False,
+                "expires_at": None,
+                "error_message": f"Model {self.model} is not available on {self.ollama_service.base_url}"
+            })
+            logger.warning(f"Ollama model {self.model} warm-up skipped: model not available")
+            return self.get_state()
+
+        start_time = time.monotonic()
+        try:
+            await self.ollama_service.load_model(self.model, self.keep_alive)
+            load_duration_ms = (time.monotonic() - start_time) * 1000
+
+            running_models = await self.ollama_service.get_running_models()
+            running = next((model for model in running_models if model.name == self.model), None)
+
+            self._state = self._state.model_copy(update={
+                "is_loaded": running is not None,
+                "load_duration_ms": load_duration_ms,
+                "last_refreshed": datetime.now(),
+                "expires_at": running.expires_at if running else None,
+                "error_message": None
+            })
+            logger.info(f"Ollama model {self.model} warm, load took {load_duration_ms:.2f}ms")
+
+        except OllamaConnectionError as e:
+            self._state = self._state.model_copy(update={
+                "is_loaded": False,
+                "expires_at": None,
+                "error_message": str(e)
+            })
+            logger.warning(f"Ollama model {self.model} warm-up failed: {e}")
+
+        return self.get_state()
+
+    async def _run(self) -> None:
+        # Preload on start, then refresh the keep-alive for as long as there is traffic
+        while True:
+            try:
+                await self.warm_up()
+            except Exception as e:
+                logger.error(f"An error occurred while refreshing Ollama keep-alive: {e}.\n{traceback.format_exc()}")
+
+            await asyncio.sleep(self.refresh_interval)
+            while time.monotonic() - self._last_activity > self.idle_timeout:
+                # Let the keep-alive run out while idle, Ollama unloads the model by itself
+                self._state = self._state.model_copy(update={"is_loaded": False, "expires_at": None})
+                await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        """Start the background warm-up loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background warm-up loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Singleton instance
+_ollama_warmup_manager: Optional[OllamaWarmupManager] = None
+
+def get_ollama_warmup_manager() -> OllamaWarmupManager:
+    """Dependency injection for the Ollama warm-up manager, targeting the Ollama server used by summaries"""
+    global _ollama_warmup_manager
+    if _ollama_warmup_manager is None:
+        _ollama_warmup_manager = OllamaWarmupManager(OllamaService(base_url=settings.OLLAMA_API_URL))
+    return _ollama_warmup_manager
+
+async def cleanup_ollama_warmup_manager():
+    """Stop the warm-up loop and close its Ollama connections"""
+    global _ollama_warmup_manager
+    if _ollama_warmup_manager:
+        await _ollama_warmup_manager.stop()
+        if _ollama_warmup_manager.ollama_service.client:
+            await _ollama_warmup_manager.ollama_service.client.aclose()
+        _ollama_warmup_manager = None
@@ -1,27 +1,65 @@
+import asyncio
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Optional
 from haystack import Pipeline
 from haystack.utils import Secret
+from haystack.dataclasses import StreamingChunk
 from haystack.components.builders import PromptBuilder
 from haystack_integrations.components.generators.ollama import OllamaGenerator
 from haystack.components.generators import OpenAIGenerator
 from app.config.settings import get_settings
 from app.config.logging_setup import get_logger
 from prompts.clinical_summary import summary_template
-from app.services.data.patient_service import PatientService
+from app.services.data.patient_service import get_patient_service
+from app.services.llm.summary_cache import summary_cache_key
+from app.services.llm.prompt_compaction import compact_prompt_inputs, get_token_budget
+from app.services.llm.router import LLMBackend, LLMRouter
+from app.utils.circuit_breaker import get_circuit_breaker
+from app.utils.server_timing import ServerTiming, measure
+from app.models.services import SummaryPrompt
 
 
 logger = get_logger(__name__)
 
 settings = get_settings()
 
+# Marks the end of a streamed generation on the chunk queue
+_STREAM_END = object()
+
+# Pipelines block on the LLM round trip, so they run in a bounded pool shared by every
+# ClinicalSummaryPipeline instead of on the event loop
+_pipeline_executor = ThreadPoolExecutor(
+    max_workers=settings.SUMMARY_MAX_CONCURRENCY,
+    thread_name_prefix="summary-pipeline"
+)
+
+# Prompts are built before the cache lookup, so they get their own pool rather than queueing
+# cache hits behind LLM calls in progress
+_prompt_executor = ThreadPoolExecutor(
+    max_workers=settings.SUMMARY_MAX_CONCURRENCY,
+    thread_name_prefix="summary-prompt"
+)
+
 
 class ClinicalSummaryPipeline:
-    """Haystack pipeline for generating clinical summaries."""
+    """
+    Haystack pipeline for generating clinical summaries.
+
+    Generation is routed to Groq, failing over to (or hedging with) the Ollama `model` at `ollama_url`.
+    """
 
     def __init__(self, model: str = "llama3.2:3b", ollama_url: str = settings.OLLAMA_API_URL_LOCAL):
         self.pipeline = Pipeline()
         self.model = model
         self.ollama_url = ollama_url
+        self.llm_model = settings.GROQ_MODEL_REASONING
+        self.generation_kwargs = {
+            "temperature": 0.1,
+            "max_tokens": 4000,
+            "top_p": 0.9
+        }
         self._build_pipeline()
 
     def _build_pipeline(self):
@@ -30,12 +68,8 @@ class ClinicalSummaryPipeline:
         groq_llm = OpenAIGenerator(
             api_key=Secret.from_token(settings.GROQ_API_KEY),
             api_base_url=settings.GROQ_API_URL,
-            model="llama-3.3-70b-versatile",
-            generation_kwargs={
-                "temperature": 0.1,
-                "max_tokens": 4000,
-                "top_p": 0.9
-            }
+            model=self.llm_model,
+            generation_kwargs=self.generation_kwargs
         )
 
         ollama_llm = OllamaGenerator(
@@ -43,31 +77,156 @@ class ClinicalSummaryPipeline:
             url=self.ollama_url,
             generation_kwargs={
                 "temperature": 0.1
-            }
+            },
+            keep_alive=settings.OLLAMA_KEEP_ALIVE
+        )
+
+        self.router = LLMRouter(
+            backends=[
+                LLMBackend(
+                    "groq", self.llm_model, groq_llm,
+                    window=settings.LLM_ROUTER_WINDOW,
+                    circuit_breaker=get_circuit_breaker("groq")
+                ),
+                LLMBackend(
+                    "ollama", self.model, ollama_llm,
+                    window=settings.LLM_ROUTER_WINDOW,
+                    circuit_breaker=get_circuit_breaker(f"ollama@{self.ollama_url.rstrip('/')}")
+                )
+            ],
+            hedge=settings.LLM_ROUTER_HEDGING,
+            hedge_min_delay=settings.LLM_ROUTER_HEDGE_MIN_DELAY_SECONDS,
+            max_error_rate=settings.LLM_ROUTER_MAX_ERROR_RATE,
+            slow_threshold=settings.LLM_ROUTER_SLOW_SECONDS,
+            probe_interval=settings.LLM_ROUTER_PROBE_INTERVAL_SECONDS
         )
 
-        self.pipeline.add_component("prompt", PromptBuilder(template=summary_template))
-        self.pipeline.add_component("llm", groq_llm)
+        self.prompt_builder = PromptBuilder(template=summary_template)
+        self.pipeline.add_component("prompt", self.prompt_builder)
+        self.pipeline.add_component("llm", self.router)
         self.pipeline.connect("prompt", "llm")
 
-    async def generate_summary(self, patient_id: str):
-        """Generate clinical summary using the pipeline"""
+    def _get_prompt_inputs(self, patient_id: str, timing: Optional[ServerTiming] = None) -> Dict[str, Any]:
+        """Build the prompt template inputs from the patient's comprehensive profile"""
+        patient_service = get_patient_service()
+        with measure(timing, "profile"):
+            data = patient_service.get_comprehensive_patient_profile(patient_id, timing)
+
+        return {
+            "patient_info": data["patient_info"],
+            "conditions": data["conditions"],
+            "medications": data["medications"],
+            "observations": data["observations"],
+            "allergies": data["allergies"],
+            "encounters": data["encounters"],
+            "procedures": data["procedures"],
+            "summary_stats": data["summary_stats"]
+        }
+
+    def _build_summary_prompt(self, patient_id: str, timing: Optional[ServerTiming] = None) -> SummaryPrompt:
+        prompt_inputs = self._get_prompt_inputs(patient_id, timing)
+
+        # Compacted for the preferred model, fallback prompts are compacted when generating
+        with measure(timing, "prompt_compaction"):
+            inputs = compact_prompt_inputs(prompt_inputs, summary_template, get_token_budget(self.llm_model))
+
+        with measure(timing, "cache_key"):
+            cache_key = summary_cache_key(summary_template, inputs, self.llm_model, self.generation_kwargs)
+
+        return SummaryPrompt(patient_id=patient_id, inputs=inputs, profile_inputs=prompt_inputs, cache_key=cache_key)
+
+    async def build_summary_prompt(self, patient_id: str, timing: Optional[ServerTiming] = None) -> SummaryPrompt:
+        """Build the patient's prompt inputs and their cache key, off the event loop"""
+        loop = asyncio.get_running_loop()
+        with measure(timing, "prompt_build"):
+            return await loop.run_in_executor(_prompt_executor, self._build_summary_prompt, patient_id, timing)
+
+    def _fallback_prompts(self, summary_prompt: SummaryPrompt) -> Dict[str, str]:
+        """Prompts of the fallback backends, each compacted to its own model's token budget"""
+        prompts = {}
+        for backend in self.router.backends:
+            if backend.model == self.llm_model:
+                continue
+            inputs = compact_prompt_inputs(summary_prompt.profile_inputs, summary_template, get_token_budget(backend.model))
+            prompts[backend.model] = self.prompt_builder.run(**inputs)["prompt"]
+        return prompts
+
+    def _run_pipeline(self, summary_prompt: SummaryPrompt) -> Dict[str, Any]:
+        return self.pipeline.run({
+            "prompt": summary_prompt.inputs,
+            "llm": {"prompts": self._fallback_prompts(summary_prompt)}
+        })
+
+    async def run_summary(self, summary_prompt: SummaryPrompt, timing: Optional[ServerTiming] = None) -> Dict[str, Any]:
+        """
+        Generate clinical summary using the pipeline, off the event loop.
+
+        Raises:
+            Exception: Any error raised by the pipeline, e.g. openai.RateLimitError
+        """
+        loop = asyncio.get_running_loop()
+        with measure(timing, "llm"):
+            return await loop.run_in_executor(_pipeline_executor, self._run_pipeline, summary_prompt)
+
+    async def generate_summary(self, summary_prompt: SummaryPrompt, timing: Optional[ServerTiming] = None):
+        """Generate clinical summary using the pipeline, off the event loop"""
         try:
-            patient_service = PatientService()
-            data = patient_service.get_comprehensive_patient_profile(patient_id)
+            return await self.run_summary(summary_prompt, timing)
+        except Exception as e:
+            msg = f"An error occurred while generating summary: {e}.\n{traceback.format_exc()}"
+            logger.error(msg)
+
+    def is_primary_result(self, summary_result: Dict[str, Any]) -> bool:
+        """Whether a summary was generated by the preferred model rather than a fallback"""
+        return summary_result["llm"]["model"] == self.llm_model
+
+    async def stream_summary(
+        self,
+        summary_prompt: SummaryPrompt,
+        result: Optional[Dict[str, Any]] = None,
+        timing: Optional[ServerTiming] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate clinical summary, yielding text chunks as the LLM produces them.
+
+        The pipeline runs in a worker thread and forwards chunks through its streaming callback,
+        so tokens reach the caller while generation is still in progress.
+
+        Args:
+            summary_prompt: Prompt inputs built by build_summary_prompt
+            result: Updated with the pipeline output once the stream is drained
+            timing: Records time to the first chunk (llm.ttfb) and the whole generation (llm)
 
+        Raises:
+            Exception: Any error raised by the pipeline, after all received chunks are yielded
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def on_chunk(chunk: StreamingChunk):
+            loop.call_soon_threadsafe(queue.put_nowait, chunk.content)
+
+        def run_pipeline():
             return self.pipeline.run({
-                "prompt": {
-                    "patient_info": data["patient_info"],
-                    "conditions": data["conditions"],
-                    "medications": data["medications"],
-                    "observations": data["observations"],
-                    "allergies": data["allergies"],
-                    "encounters": data["encounters"],
-                    "procedures": data["procedures"],
-                    "summary_stats": data["summary_stats"]
-                }
+                "prompt": summary_prompt.inputs,
+                "llm": {"streaming_callback": on_chunk, "prompts": self._fallback_prompts(summary_prompt)}
             })
-        except Exception as e:
-            msg = f"An error occurred while generating summary: {e}.\n{traceback.format_exc()}"
-            logger.error(msg)
\ No newline at end of file
+
+        start_time = time.perf_counter()
+        first_chunk = True
+        generation = loop.run_in_executor(_pipeline_executor, run_pipeline)
+        generation.add_done_callback(lambda _: queue.put_nowait(_STREAM_END))
+
+        while (content := await queue.get()) is not _STREAM_END:
+            if content:
+                if first_chunk and timing is not None:
+                    timing.add("llm.ttfb", (time.perf_counter() - start_time) * 1000)
+                first_chunk = False
+                yield content
+
+        # Surface pipeline errors once the stream is drained
+        pipeline_result = await generation
+        if timing is not None:
+            timing.add("llm", (time.perf_counter() - start_time) * 1000)
+        if result is not None:
+            result.update(pipeline_result)
@@ -0,0 +1,106 @@
+import math
+from functools import lru_cache
+from typing import Any, Dict, List
+import jinja2
+from app.config.settings import get_settings
+from app.config.logging_setup import get_logger
+
+
+logger = get_logger(__name__)
+
+settings = get_settings()
+
+# Rough average for English clinical text on Llama tokenizers
+CHARS_PER_TOKEN = 4
+
+# Bullet and label overhead of one rendered list item, on top of its values
+ITEM_OVERHEAD_TOKENS = 3
+
+# Render and trim rounds before giving up on fitting the budget
+MAX_COMPACTION_PASSES = 3
+
+# Sections trimmed to fit the budget, least clinically important first, with the number of items
+# each keeps at least. Allergies are never trimmed since a dropped allergy is a safety risk.
+TRIM_ORDER = [
+    ("procedures", 0),
+    ("encounters", 1),
+    ("observations", 5),
+    ("medications", 5),
+    ("conditions", 5)
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text from its length"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def get_token_budget(model: str) -> int:
+    """Prompt input budget of model, from SUMMARY_PROMPT_TOKEN_BUDGETS"""
+    return settings.SUMMARY_PROMPT_TOKEN_BUDGETS.get(model, settings.SUMMARY_PROMPT_DEFAULT_TOKEN_BUDGET)
+
+
+@lru_cache(maxsize=8)
+def _compile(template: str) -> jinja2.Template:
+    return jinja2.Environment().from_string(template)
+
+
+def _estimate_item_tokens(item: Dict[str, Any]) -> int:
+    return estimate_tokens(" ".join(str(value) for value in item.values())) + ITEM_OVERHEAD_TOKENS
+
+
+def _item_date(item: Dict[str, Any]) -> str:
+    return str(item.get("date") or item.get("start_date") or "")
+
+
+def _drop_index(items: List[Dict[str, Any]]) -> int:
+    """Index of the item to drop first: the oldest inactive item, else the oldest item"""
+    inactive = [i for i, item in enumerate(items) if item.get("is_active") is False]
+    candidates = inactive or range(len(items))
+    return min(candidates, key=lambda i: _item_date(items[i]))
+
+
+def compact_prompt_inputs(inputs: Dict[str, Any], template: str, budget: int) -> Dict[str, Any]:
+    """
+    Trim list sections of the prompt inputs until the rendered prompt fits the token budget.
+
+    Sections are trimmed in TRIM_ORDER down to their minimum, dropping inactive then oldest
+    items first. Section totals in summary_stats are left as is, so the prompt still reports
+    how many items exist beyond those listed.
+
+    Args:
+        inputs: Prompt template inputs
+        template: Jinja template the inputs are rendered with
+        budget: Maximum estimated prompt tokens
+
+    Returns:
+        Inputs that fit the budget, or fit it as closely as the section minimums allow
+    """
+    tokens = estimate_tokens(_compile(template).render(**inputs))
+    if tokens <= budget:
+        return inputs
+
+    compacted = dict(inputs)
+    original_tokens = tokens
+    # Item estimates miss the template text around each item, so re-render and trim again
+    # until the whole prompt fits or every section is at its minimum
+    for _ in range(MAX_COMPACTION_PASSES):
+        for section, minimum in TRIM_ORDER:
+            items = list(compacted.get(section) or [])
+            while tokens > budget and len(items) > minimum:
+                tokens -= _estimate_item_tokens(items.pop(_drop_index(items)))
+            compacted[section] = items
+
+        tokens = estimate_tokens(_compile(template).render(**compacted))
+        if tokens <= budget:
+            break
+
+    dropped = {
+        section: len(inputs.get(section) or []) - len(compacted[section])
+        for section, _ in TRIM_ORDER if section in compacted
+    }
+    logger.info(f"Compacted prompt from ~{original_tokens} to ~{tokens} tokens (budget {budget}), dropped {dropped}")
+    if tokens > budget:
+        logger.warning(f"Prompt still exceeds its budget of {budget} tokens after compaction")
+
+    return compacted
@@ -1,12 +1,23 @@
 import yaml
 import os
-from typing import Dict, Any, Optional
+import re
+import threading
+import time
+import jinja2
+import jinja2.meta
+from typing import Dict, Any, Optional, Set, Tuple
 from pathlib import Path
+from app.config.settings import get_settings
 from app.utils.file_locator import ROOT_DIR
 import logging
 
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
+# A str.format placeholder such as {patient_name}, which Jinja renders as literal text
+_FORMAT_PLACEHOLDER = re.compile(r"(?<!\{)\{\s*([A-Za-z_]\w*)\s*\}(?!\})")
+
 
 def load_prompts():
     """Simplified mechanism to load prompts into memory."""
@@ -26,60 +37,174 @@ def load_prompts():
     return prompts
 
 class PromptManager:
-    """Manages prompt templates loaded from YAML files"""
+    """
+    Manages prompt templates loaded from YAML files.
+
+    Templates use Jinja syntax, like the Haystack PromptBuilder templates, and are compiled once
+    at load. Files are re-checked at most every PROMPT_RELOAD_INTERVAL_SECONDS and only files whose
+    mtime changed are reloaded, so prompts can be edited without a restart.
+
+    Prompts written for the former str.format rendering must be migrated: placeholders become
+    {{ name }}, and {{ / }} are no longer escapes for literal braces, which are written as is.
+    A template still using a {name} placeholder is rejected at load, since Jinja would render it
+    as literal text. Write {{ '{name}' }} where that literal text is intended.
+    """
     
     _prompts: Dict[str, Any] = {}
+    _templates: Dict[Tuple[str, str], jinja2.Template] = {}
+    _variables: Dict[Tuple[str, str], Set[str]] = {}
+    _mtimes: Dict[Path, int] = {}
+    _environment = jinja2.Environment(undefined=jinja2.StrictUndefined)
+    _lock = threading.Lock()
+    _last_checked: float = 0.0
     _initialized: bool = False
 
     @classmethod
-    async def initialize(cls):
-        """Load all prompt templates from YAML files into memory"""
-        if cls._initialized:
-            return
-            
+    def _compile_file(cls, yaml_file: Path) -> Tuple[int, Dict[str, Any], Dict[Tuple[str, str], jinja2.Template], Dict[Tuple[str, str], Set[str]]]:
+        """
+        Parse and compile every prompt of a YAML file.
+
+        Returns:
+            The mtime of the content read, with the prompts, compiled templates and their variables
+
+        Raises:
+            ValueError: A prompt is malformed, fails to compile, uses variables it does not declare
+                or still uses a str.format placeholder
+        """
+        with open(yaml_file, 'r', encoding='utf-8') as f:
+            # Taken from the open file before reading, so an edit made during the read changes
+            # the mtime again and the file is reloaded on the next check
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+            content = yaml.safe_load(f) or {}
+
+        category = yaml_file.stem
+        templates = {}
+        variables = {}
+        for prompt_name, prompt_config in content.items():
+            template = prompt_config
+            declared = None
+            # Handle nested prompt structure
+            if isinstance(prompt_config, dict):
+                if 'template' not in prompt_config:
+                    raise ValueError(f"Invalid prompt structure for '{prompt_name}'")
+                template = prompt_config['template']
+                declared = prompt_config.get('variables')
+
+            try:
+                ast = cls._environment.parse(template)
+            except jinja2.TemplateSyntaxError as e:
+                raise ValueError(f"Template syntax error in '{prompt_name}' line {e.lineno}: {e.message}")
+
+            # Literal text of the template, without Jinja expressions, statements and comments
+            literal_text = "".join(
+                node.data for node in ast.find_all(jinja2.nodes.TemplateData)
+            )
+            placeholders = _FORMAT_PLACEHOLDER.findall(literal_text)
+            if placeholders:
+                raise ValueError(
+                    f"Prompt '{prompt_name}' uses str.format placeholders {sorted(set(placeholders))}, "
+                    f"write them as {{{{ name }}}}"
+                )
+
+            used = jinja2.meta.find_undeclared_variables(ast)
+            if declared is not None and not used <= set(declared):
+                raise ValueError(f"Prompt '{prompt_name}' uses undeclared variables: {sorted(used - set(declared))}")
+
+            templates[(category, prompt_name)] = cls._environment.from_string(template)
+            variables[(category, prompt_name)] = used
+
+        return mtime, content, templates, variables
+
+    @classmethod
+    def reload(cls) -> None:
+        """Reload YAML files added or modified since they were last loaded, and drop deleted ones"""
         prompts_dir = ROOT_DIR / "prompts"
         if not prompts_dir.exists():
             logger.warning("Prompts directory not found!")
             return
-            
-        for yaml_file in prompts_dir.glob("*.yaml"):
-            try:
-                with open(yaml_file, 'r', encoding='utf-8') as f:
-                    content = yaml.safe_load(f)
-                    category = yaml_file.stem
-                    cls._prompts[category] = content
-                    logger.info(f"Loaded prompts from {yaml_file.name}")
-            except Exception as e:
-                logger.error(f"Error loading {yaml_file.name}: {e}")
-        
+
+        with cls._lock:
+            yaml_files = {yaml_file: yaml_file.stat().st_mtime_ns for yaml_file in prompts_dir.glob("*.yaml")}
+
+            # Update copies and swap them in, so readers never see a half-reloaded category
+            prompts, templates, variables = dict(cls._prompts), dict(cls._templates), dict(cls._variables)
+
+            for yaml_file, mtime in yaml_files.items():
+                if cls._mtimes.get(yaml_file) == mtime:
+                    continue
+                # Recorded even on failure so a broken file is not re-parsed until it changes again
+                cls._mtimes[yaml_file] = mtime
+
+                try:
+                    file_mtime, file_content, file_templates, file_variables = cls._compile_file(yaml_file)
+                except Exception as e:
+                    # Keep serving the previously loaded version of the file
+                    logger.error(f"Error loading {yaml_file.name}: {e}")
+                    continue
+
+                # The mtime of the content actually read, which an edit since the listing makes stale
+                cls._mtimes[yaml_file] = file_mtime
+
+                cls._drop_category(yaml_file.stem, prompts, templates, variables)
+                prompts[yaml_file.stem] = file_content
+                templates.update(file_templates)
+                variables.update(file_variables)
+                logger.info(f"Loaded prompts from {yaml_file.name}")
+
+            for yaml_file in set(cls._mtimes) - set(yaml_files):
+                del cls._mtimes[yaml_file]
+                cls._drop_category(yaml_file.stem, prompts, templates, variables)
+                logger.info(f"Unloaded prompts from {yaml_file.name}")
+
+            cls._prompts, cls._templates, cls._variables = prompts, templates, variables
+            cls._last_checked = time.monotonic()
+
+    @staticmethod
+    def _drop_category(category: str, prompts: Dict, templates: Dict, variables: Dict) -> None:
+        prompts.pop(category, None)
+        for key in [key for key in templates if key[0] == category]:
+            del templates[key]
+            del variables[key]
+
+    @classmethod
+    def _reload_if_due(cls) -> None:
+        interval = settings.PROMPT_RELOAD_INTERVAL_SECONDS
+        if interval > 0 and time.monotonic() - cls._last_checked >= interval:
+            cls.reload()
+
+    @classmethod
+    async def initialize(cls):
+        """Load all prompt templates from YAML files into memory"""
+        if cls._initialized:
+            return
+
+        cls.reload()
         cls._initialized = True
         logger.info(f"Prompt Manager initialized with {len(cls._prompts)} categories")
     
     @classmethod
     def get_prompt(cls, category: str, prompt_name: str, **kwargs) -> str:
-        """Get a formatted prompt template"""
+        """Get a rendered prompt template"""
         if not cls._initialized:
             raise RuntimeError("PromptManager not initialized. Call initialize() first.")
-            
-        if category not in cls._prompts:
+
+        cls._reload_if_due()
+        prompts, templates, variables = cls._prompts, cls._templates, cls._variables
+
+        if category not in prompts:
             raise ValueError(f"Prompt category '{category}' not found")
             
-        if prompt_name not in cls._prompts[category]:
+        if prompt_name not in prompts[category]:
             raise ValueError(f"Prompt '{prompt_name}' not found in category '{category}'")
-        
-        template = cls._prompts[category][prompt_name]
-        
-        # Handle nested prompt structure
-        if isinstance(template, dict):
-            if 'template' in template:
-                template = template['template']
-            else:
-                raise ValueError(f"Invalid prompt structure for '{prompt_name}'")
-        
-        # Format template with provided kwargs
+
+        missing = variables[(category, prompt_name)] - kwargs.keys()
+        if missing:
+            raise ValueError(f"Missing template variable: {sorted(missing)}")
+
+        # Render template with provided kwargs
         try:
-            return template.format(**kwargs)
-        except KeyError as e:
+            return templates[(category, prompt_name)].render(**kwargs)
+        except jinja2.UndefinedError as e:
             raise ValueError(f"Missing template variable: {e}")
     
     @classmethod
@@ -0,0 +1,323 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
+from typing import Any, Callable, Dict, List, Optional
+from haystack import component
+from haystack.dataclasses import StreamingChunk
+from app.config.settings import get_settings
+from app.config.logging_setup import get_logger
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.metrics import Gauge, Histogram
+
+
+logger = get_logger(__name__)
+
+settings = get_settings()
+
+# Runs hedged calls so the calling thread can wait on a deadline. A hedge leaves the slower
+# call running until it finishes, so the pool is sized for two calls per concurrent summary
+# plus headroom for stragglers.
+_hedge_executor = ThreadPoolExecutor(
+    max_workers=4 * settings.SUMMARY_MAX_CONCURRENCY,
+    thread_name_prefix="llm-router"
+)
+
+# Quantiles are only trusted once a backend has this many successful calls
+MIN_LATENCY_SAMPLES = 5
+
+llm_requests_in_flight = Gauge(
+    "llm_requests_in_flight",
+    "LLM calls currently running",
+    labelnames=("backend",)
+)
+llm_request_duration_seconds = Histogram(
+    "llm_request_duration_seconds",
+    "Time of LLM calls from request until the last token",
+    labelnames=("backend", "outcome")
+)
+llm_time_to_first_token_seconds = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time of streamed LLM calls until the first token",
+    labelnames=("backend",)
+)
+llm_tokens_per_second = Histogram(
+    "llm_tokens_per_second",
+    "Completion tokens generated per second after the first token",
+    labelnames=("backend",),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+)
+
+
+def completion_tokens(meta: List[Dict[str, Any]]) -> Optional[int]:
+    """Completion token count from generator meta, which OpenAI and Ollama generators both report as usage"""
+    usage = meta[0].get("usage") if meta else None
+    return usage.get("completion_tokens") if usage else None
+
+
+class LLMBackend:
+    """
+    A Haystack generator with rolling latency and error statistics over its last `window` calls,
+    optionally guarded by a circuit breaker
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        generator: Any,
+        window: int = 50,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
+        self.name = name
+        self.model = model
+        self.generator = generator
+        self.circuit_breaker = circuit_breaker
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self._last_attempt = 0.0
+        self._lock = threading.Lock()
+
+    def record_attempt(self) -> None:
+        with self._lock:
+            self._last_attempt = time.monotonic()
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+            self._outcomes.append(True)
+
+    def record_error(self) -> None:
+        with self._lock:
+            self._outcomes.append(False)
+
+    def clear_errors(self) -> None:
+        with self._lock:
+            self._outcomes.clear()
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        """Latency quantile of recent successful calls, or None without enough samples"""
+        with self._lock:
+            if len(self._latencies) < MIN_LATENCY_SAMPLES:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[min(int(q * len(latencies)), len(latencies) - 1)]
+
+    def seconds_since_attempt(self) -> float:
+        with self._lock:
+            return time.monotonic() - self._last_attempt
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "error_rate": round(self.error_rate, 3),
+            "latency_p50_second": self.latency_quantile(0.5),
+            "latency_p95_second": self.latency_quantile(0.95),
+            "calls": len(self._outcomes),
+            "circuit": self.circuit_breaker.state if self.circuit_breaker else None
+        }
+
+
+@component
+class LLMRouter:
+    """
+    Route generation across LLM backends listed in order of preference.
+
+    Backends whose recent error rate or p95 latency is too high are demoted behind healthy ones,
+    and still receive one probe call every `probe_interval` seconds so they can recover. A failed
+    call fails over to the next backend, and a backend with an open circuit fails over without
+    being called. With hedging enabled, a call still running after the
+    primary's p95 latency is raced against the next backend and the first answer wins.
+    """
+
+    def __init__(
+        self,
+        backends: List[LLMBackend],
+        hedge: bool = False,
+        hedge_min_delay: float = 2.0,
+        max_error_rate: float = 0.5,
+        slow_threshold: float = 30.0,
+        probe_interval: float = 30.0
+    ):
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+
+        self.backends = backends
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.max_error_rate = max_error_rate
+        self.slow_threshold = slow_threshold
+        self.probe_interval = probe_interval
+
+    def _is_degraded(self, backend: LLMBackend) -> bool:
+        if backend.circuit_breaker is not None and backend.circuit_breaker.state == CircuitBreaker.OPEN:
+            return True
+        if backend.seconds_since_attempt() >= self.probe_interval:
+            return False
+
+        p95 = backend.latency_quantile(0.95)
+        return backend.error_rate > self.max_error_rate or (p95 is not None and p95 > self.slow_threshold)
+
+    def _ranked_backends(self) -> List[LLMBackend]:
+        # Stable sort keeps the configured preference among healthy and among degraded backends
+        return sorted(self.backends, key=self._is_degraded)
+
+    def _hedge_delay(self, backend: LLMBackend) -> float:
+        p95 = backend.latency_quantile(0.95)
+        return max(p95 or 0.0, self.hedge_min_delay)
+
+    def _call(
+        self,
+        backend: LLMBackend,
+        prompts: Dict[str, str],
+        streaming_callback: Optional[Callable[[StreamingChunk], None]],
+        generation_kwargs: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        # Raises CircuitOpenError without waiting on a backend known to be down
+        if backend.circuit_breaker is not None:
+            backend.circuit_breaker.check()
+
+        first_token_at = None
+
+        def timed_callback(chunk: StreamingChunk):
+            nonlocal first_token_at
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            streaming_callback(chunk)
+
+        backend.record_attempt()
+        start_time = time.perf_counter()
+        try:
+            with llm_requests_in_flight.track_inprogress(backend=backend.name):
+                result = backend.generator.run(
+                    prompt=prompts[backend.model],
+                    streaming_callback=timed_callback if streaming_callback else None,
+                    generation_kwargs=generation_kwargs
+                )
+        except Exception:
+            llm_request_duration_seconds.observe(time.perf_counter() - start_time, backend=backend.name, outcome="error")
+            backend.record_error()
+            if backend.circuit_breaker is not None:
+                backend.circuit_breaker.record_failure()
+            raise
+
+        end_time = time.perf_counter()
+        llm_request_duration_seconds.observe(end_time - start_time, backend=backend.name, outcome="success")
+        if first_token_at is not None:
+            llm_time_to_first_token_seconds.observe(first_token_at - start_time, backend=backend.name)
+        tokens = completion_tokens(result.get("meta", []))
+        generation_seconds = end_time - (first_token_at or start_time)
+        if tokens and generation_seconds > 0:
+            llm_tokens_per_second.observe(tokens / generation_seconds, backend=backend.name)
+
+        backend.record_success(end_time - start_time)
+        if backend.circuit_breaker is not None:
+            backend.circuit_breaker.record_success()
+        # A failing backend answering again is back, rather than waiting for its errors to age out
+        if backend.error_rate > self.max_error_rate:
+            backend.clear_errors()
+
+        return {
+            "replies": result["replies"],
+            "meta": result.get("meta", []),
+            "model": backend.model,
+            "backend": backend.name
+        }
+
+    def _run_failover(
+        self,
+        backends: List[LLMBackend],
+        prompts: Dict[str, str],
+        streaming_callback: Optional[Callable[[StreamingChunk], None]],
+        generation_kwargs: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        first_error = None
+        for backend in backends:
+            streamed = False
+
+            def forward(chunk: StreamingChunk):
+                nonlocal streamed
+                streamed = True
+                streaming_callback(chunk)
+
+            try:
+                return self._call(backend, prompts, forward if streaming_callback else None, generation_kwargs)
+            except Exception as e:
+                # Chunks already forwarded cannot be taken back, so a broken stream is not retried
+                if streamed:
+                    raise
+                first_error = first_error or e
+                logger.warning(f"LLM backend '{backend.name}' failed, failing over: {e}")
+
+        # The preferred backend's error is the one worth reporting, e.g. a Groq rate limit
+        raise first_error
+
+    def _run_hedged(
+        self,
+        backends: List[LLMBackend],
+        prompts: Dict[str, str],
+        generation_kwargs: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        primary, secondary = backends[0], backends[1]
+
+        future = _hedge_executor.submit(self._call, primary, prompts, None, generation_kwargs)
+        try:
+            return future.result(timeout=self._hedge_delay(primary))
+        except FuturesTimeoutError:
+            pass
+        except Exception as e:
+            logger.warning(f"LLM backend '{primary.name}' failed, failing over: {e}")
+            try:
+                return self._run_failover(backends[1:], prompts, None, generation_kwargs)
+            except Exception:
+                raise e
+
+        logger.info(f"LLM backend '{primary.name}' exceeded hedge deadline, hedging with '{secondary.name}'")
+        hedge = _hedge_executor.submit(self._call, secondary, prompts, None, generation_kwargs)
+
+        pending = {future, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for finished in done:
+                if finished.exception() is None:
+                    return finished.result()
+
+        raise future.exception()
+
+    @component.output_types(replies=List[str], meta=List[Dict[str, Any]], model=str, backend=str)
+    def run(
+        self,
+        prompt: str,
+        streaming_callback: Optional[Callable[[StreamingChunk], None]] = None,
+        generation_kwargs: Optional[Dict[str, Any]] = None,
+        prompts: Optional[Dict[str, str]] = None
+    ):
+        """
+        Generate a completion from the best available backend
+
+        Args:
+            prompt: Rendered prompt
+            streaming_callback: Called with each chunk; streamed calls fail over but are never hedged
+            generation_kwargs: Overrides of the serving backend's generation kwargs
+            prompts: Prompts rendered for specific models, keyed by backend model, e.g. compacted
+                to a smaller context window; backends without one receive `prompt`
+
+        Returns:
+            Replies and meta of the serving backend, with its model and backend name
+        """
+        prompts = {backend.model: (prompts or {}).get(backend.model, prompt) for backend in self.backends}
+        backends = self._ranked_backends()
+        if self.hedge and streaming_callback is None and len(backends) > 1:
+            return self._run_hedged(backends, prompts, generation_kwargs)
+        return self._run_failover(backends, prompts, streaming_callback, generation_kwargs)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Rolling statistics of each backend, keyed by backend name"""
+        return {backend.name: backend.get_stats() for backend in self.backends}
@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import traceback
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Optional
+from cachetools import LRUCache
+from app.models.services import PatientSummaryResponse
+from app.config.logging_setup import get_logger
+from app.config.settings import get_settings
+from app.utils.file_locator import ROOT_DIR
+from app.utils.metrics import Counter
+
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+SUMMARY_CACHE_PATH = ROOT_DIR / "data" / "cache" / "summary_cache.sqlite"
+
+# Bump whenever the summaries table layout changes, older cache files are recreated
+SUMMARY_CACHE_SCHEMA_VERSION = 2
+
+# SQLite calls can wait on the file lock for up to its busy timeout, so they run in a small pool
+# instead of on the event loop. SQLite serializes writers anyway, so a few threads are enough.
+_sqlite_cache_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="summary-cache")
+
+summary_cache_requests = Counter(
+    "summary_cache_requests",
+    "Summary cache lookups by result",
+    labelnames=("backend", "result")
+)
+summary_cache_evictions = Counter(
+    "summary_cache_evictions",
+    "Summaries evicted from the cache to stay within its size bound",
+    labelnames=("backend",)
+)
+
+
+def summary_cache_key(
+    template: str,
+    inputs: Dict[str, Any],
+    model: str,
+    generation_kwargs: Dict[str, Any]
+) -> str:
+    """
+    Content address of an LLM completion.
+
+    Hashes the prompt template together with the inputs it is rendered with, which determine
+    the rendered prompt, so the key changes exactly when the patient data behind it changes
+    without having to render the prompt.
+    """
+    payload = json.dumps(
+        {"template": template, "inputs": inputs, "model": model, "generation_kwargs": generation_kwargs},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache(ABC):
+    """
+    Cache of generated summaries keyed by summary_cache_key.
+
+    Entries never expire by age, since a key can only be reused while its inputs are unchanged.
+    Backends are bounded by entry count and evict least recently used summaries.
+    """
+
+    backend_name = "base"
+
+    def _record_lookup(self, hit: bool) -> None:
+        summary_cache_requests.inc(backend=self.backend_name, result="hit" if hit else "miss")
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[PatientSummaryResponse]:
+        """Get a cached summary, or None on a miss"""
+
+    @abstractmethod
+    async def set(self, key: str, value: PatientSummaryResponse) -> None:
+        """Store a generated summary"""
+
+
+class _EvictionCountingLRUCache(LRUCache):
+    def popitem(self):
+        item = super().popitem()
+        summary_cache_evictions.inc(backend=MemorySummaryCache.backend_name)
+        return item
+
+
+class MemorySummaryCache(SummaryCache):
+    """In-process cache, local to one worker and lost on restart"""
+
+    backend_name = "memory"
+
+    def __init__(self, maxsize: int = 1000):
+        self._cache = _EvictionCountingLRUCache(maxsize=maxsize)
+
+    async def get(self, key: str) -> Optional[PatientSummaryResponse]:
+        value = self._cache.get(key)
+        self._record_lookup(value is not None)
+        return value
+
+    async def set(self, key: str, value: PatientSummaryResponse) -> None:
+        self._cache[key] = value
+
+
+class SQLiteSummaryCache(SummaryCache):
+    """
+    Disk-backed cache shared by every worker on the host and kept across restarts.
+
+    A hit only rewrites the entry's last access time once it is older than `touch_interval`
+    seconds, so repeated hits on hot summaries stay reads. Eviction order is accurate to
+    within that interval.
+    """
+
+    backend_name = "sqlite"
+
+    def __init__(self, path: Path = SUMMARY_CACHE_PATH, max_entries: int = 10000, touch_interval: float = 60.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self._initialize()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _initialize(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            # WAL lets workers read concurrently while another worker writes
+            conn.execute("PRAGMA journal_mode=WAL")
+
+            # Entries are only derived data, so an outdated layout is simply dropped
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SUMMARY_CACHE_SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS summaries")
+                conn.execute(f"PRAGMA user_version = {SUMMARY_CACHE_SCHEMA_VERSION}")
+
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS summaries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_accessed_at ON summaries (last_accessed_at)")
+
+    async def get(self, key: str) -> Optional[PatientSummaryResponse]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_sqlite_cache_executor, self._get, key)
+
+    async def set(self, key: str, value: PatientSummaryResponse) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_sqlite_cache_executor, self._set, key, value)
+
+    def _get(self, key: str) -> Optional[PatientSummaryResponse]:
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute("SELECT value, last_accessed_at FROM summaries WHERE key = ?", (key,)).fetchone()
+                now = time.time()
+                if row and now - row[1] >= self.touch_interval:
+                    conn.execute("UPDATE summaries SET last_accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.error(f"An error occurred while reading summary cache: {e}.\n{traceback.format_exc()}")
+            self._record_lookup(False)
+            return None
+
+        self._record_lookup(row is not None)
+        return PatientSummaryResponse.model_validate_json(row[0]) if row else None
+
+    def _set(self, key: str, value: PatientSummaryResponse) -> None:
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO summaries (key, value, created_at, last_accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value.model_dump_json(), now, now)
+                )
+                # Evict least recently used entries beyond the size bound
+                evicted = conn.execute(
+                    """
+                    DELETE FROM summaries WHERE key IN (
+                        SELECT key FROM summaries ORDER BY last_accessed_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,)
+                ).rowcount
+            if evicted > 0:
+                summary_cache_evictions.inc(evicted, backend=self.backend_name)
+        except sqlite3.Error as e:
+            logger.error(f"An error occurred while writing summary cache: {e}.\n{traceback.format_exc()}")
+
+
+# Singleton instance
+_summary_cache: Optional[SummaryCache] = None
+_summary_cache_lock = threading.Lock()
+
+def get_summary_cache() -> SummaryCache:
+    """Dependency injection for the summary cache backend selected by SUMMARY_CACHE_BACKEND"""
+    global _summary_cache
+    if _summary_cache is None:
+        with _summary_cache_lock:
+            if _summary_cache is None:
+                if settings.SUMMARY_CACHE_BACKEND == "memory":
+                    _summary_cache = MemorySummaryCache(maxsize=settings.SUMMARY_CACHE_MAX_ENTRIES)
+                elif settings.SUMMARY_CACHE_BACKEND == "sqlite":
+                    _summary_cache = SQLiteSummaryCache(
+                        path=Path(settings.SUMMARY_CACHE_PATH) if settings.SUMMARY_CACHE_PATH else SUMMARY_CACHE_PATH,
+                        max_entries=settings.SUMMARY_CACHE_MAX_ENTRIES,
+                        touch_interval=settings.SUMMARY_CACHE_TOUCH_INTERVAL_SECONDS
+                    )
+                else:
+                    raise ValueError(f"Unknown summary cache backend '{settings.SUMMARY_CACHE_BACKEND}'")
+    return _summary_cache
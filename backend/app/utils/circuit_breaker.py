@@ -0,0 +1,130 @@
+import threading
+import time
+from typing import Any, Dict
+from app.config.logging_setup import get_logger
+from app.config.settings import get_settings
+
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit is open"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Per-backend circuit breaker.
+
+    Closed: calls pass through, and `failure_threshold` consecutive failures open the circuit.
+    Open: calls are refused without touching the backend for `recovery_timeout` seconds.
+    Half-open: up to `half_open_max_calls` trial calls pass through. A success closes the
+    circuit and a failure opens it again, while a call ending without an outcome must be
+    released so its trial slot is not held forever.
+
+    Thread-safe, so one breaker can guard both async calls and pipelines running in worker threads.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def _update_state(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a trial call through"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(self.recovery_timeout - (time.monotonic() - self._opened_at), 0.0)
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the backend now, counting it as a trial call when half-open"""
+        with self._lock:
+            self._update_state()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            return False
+
+    def check(self) -> None:
+        """
+        Raises:
+            CircuitOpenError: If the call is not allowed
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit for {self.name} is open, retry in {self.retry_after():.1f}s")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+
+    def release(self) -> None:
+        """End a call that produced no outcome, e.g. one cancelled by its caller, freeing its half-open trial slot"""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                logger.warning(f"Circuit for {self.name} opened after {self._consecutive_failures} consecutive failures")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "retry_after_seconds": round(self.retry_after(), 1)
+        }
+
+
+# Breakers shared by every client of the same backend
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the circuit breaker of a backend, creating it from settings on first use"""
+    with _circuit_breakers_lock:
+        if name not in _circuit_breakers:
+            _circuit_breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                recovery_timeout=settings.CIRCUIT_BREAKER_RECOVERY_SECONDS
+            )
+        return _circuit_breakers[name]
+
+def get_circuit_breakers() -> Dict[str, CircuitBreaker]:
+    with _circuit_breakers_lock:
+        return dict(_circuit_breakers)
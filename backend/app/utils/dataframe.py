@@ -0,0 +1,35 @@
+import pandas as pd
+from itertools import repeat
+from typing import Any, Dict, List
+
+
+def format_dates(series: pd.Series, date_format: str = '%Y-%m-%d') -> List[Any]:
+    """Format a datetime column as strings in one pass, with None for missing dates"""
+    formatted = series.dt.strftime(date_format).tolist()
+    return [value if isinstance(value, str) else None for value in formatted]
+
+
+def column_or_default(df: pd.DataFrame, column: str, default: Any) -> Any:
+    """Column-wise equivalent of row.get(column, default)"""
+    return df[column] if column in df.columns else default
+
+
+def to_records(columns: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Build a list of records from output keys mapped to columns.
+
+    Columns may be Series or lists of equal length; scalars are repeated for every record.
+    """
+    lengths = {len(values) for values in columns.values() if isinstance(values, (pd.Series, list))}
+    if len(lengths) != 1:
+        raise ValueError("Columns must contain at least one Series or list, all of the same length")
+
+    length = lengths.pop()
+    values = [
+        values.tolist() if isinstance(values, pd.Series)
+        else values if isinstance(values, list)
+        else repeat(values, length)
+        for values in columns.values()
+    ]
+    keys = list(columns.keys())
+    return [dict(zip(keys, row)) for row in zip(*values)]
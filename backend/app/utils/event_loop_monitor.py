@@ -0,0 +1,67 @@
+import asyncio
+from typing import Optional
+from app.config.settings import get_settings
+from app.utils.metrics import Histogram
+
+
+settings = get_settings()
+
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds",
+    "How late a periodic timer on the event loop fired, i.e. how long the loop was blocked",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+
+class EventLoopMonitor:
+    """
+    Measures event loop blocking by how late a periodic sleep wakes up.
+
+    Every `interval` seconds a timer is scheduled; any delay past its deadline is time the
+    loop spent running something else without yielding, such as a synchronous pandas call
+    inside an async endpoint. Delays are observed in the event_loop_lag_seconds histogram.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            deadline = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            event_loop_lag_seconds.observe(max(0.0, loop.time() - deadline))
+
+    def start(self) -> None:
+        """Start measuring in the background"""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop measuring"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Singleton instance
+_event_loop_monitor: Optional[EventLoopMonitor] = None
+
+def get_event_loop_monitor() -> EventLoopMonitor:
+    """Dependency injection for the event loop lag monitor"""
+    global _event_loop_monitor
+    if _event_loop_monitor is None:
+        _event_loop_monitor = EventLoopMonitor(interval=settings.EVENT_LOOP_LAG_INTERVAL_SECONDS)
+    return _event_loop_monitor
+
+async def cleanup_event_loop_monitor():
+    """Stop the event loop lag monitor"""
+    global _event_loop_monitor
+    if _event_loop_monitor:
+        await _event_loop_monitor.stop()
+        _event_loop_monitor = None
@@ -0,0 +1,56 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Dict, Iterator, List, Optional, Tuple
+from app.config.settings import get_settings
+
+
+settings = get_settings()
+
+
+class ServerTiming:
+    """
+    Durations of the named phases of one request, rendered as a Server-Timing header.
+
+    Created per request when SERVER_TIMING_ENABLED is set and passed down explicitly to the
+    code being measured. Phases may nest, e.g. chart.vital_trends inside chart, and are
+    reported in the order they finished.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, duration_ms: float) -> None:
+        with self._lock:
+            self._entries.append((name, duration_ms))
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Record the duration of the enclosed block under name"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start_time) * 1000)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Milliseconds per phase, summing phases measured more than once"""
+        durations: Dict[str, float] = {}
+        with self._lock:
+            for name, duration_ms in self._entries:
+                durations[name] = durations.get(name, 0.0) + duration_ms
+        return {name: round(duration_ms, 2) for name, duration_ms in durations.items()}
+
+    def header_value(self) -> str:
+        return ", ".join(f"{name};dur={duration_ms}" for name, duration_ms in self.as_dict().items())
+
+
+def get_server_timing() -> Optional[ServerTiming]:
+    """Dependency injection for a per-request ServerTiming, None unless SERVER_TIMING_ENABLED"""
+    return ServerTiming() if settings.SERVER_TIMING_ENABLED else None
+
+
+def measure(timing: Optional[ServerTiming], name: str) -> ContextManager:
+    """timing.measure(name), or a no-op when the request is not being timed"""
+    return timing.measure(name) if timing is not None else nullcontext()
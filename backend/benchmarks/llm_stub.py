@@ -0,0 +1,251 @@
+"""
+Local stand-in for the Groq and Ollama APIs, for load testing the app without network or GPU.
+
+Serves Groq's OpenAI-compatible chat completions and model list under /openai/v1, and Ollama's
+/api/generate, /api/tags and /api/ps, from one process. Replies are canned clinical text
+generated at a configurable time to first token and token rate, and a configurable share of
+requests fails with an injected HTTP error. /_stub/config changes these settings while the
+stub runs, and /_stub/stats counts the calls each backend received.
+
+Usage (from the backend directory):
+    python -m benchmarks.llm_stub [--port 9100] [--first-token-ms 300] [--tokens-per-second 50]
+        [--completion-tokens 200] [--groq-error-rate 0.05] [--ollama-error-rate 0]
+
+Point the app at it with:
+    GROQ_API_URL=http://127.0.0.1:9100/openai/v1 OLLAMA_HOST=127.0.0.1 OLLAMA_LOCALHOST=127.0.0.1 OLLAMA_PORT=9100
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+
+# Cycled through to build replies of the requested length
+SUMMARY_WORDS = (
+    "Patient is a middle-aged adult with a history of essential hypertension and type 2 diabetes "
+    "mellitus, managed with metformin and lisinopril. Recent vitals show blood pressure trending "
+    "down towards target with stable body weight. Latest HbA1c remains above goal, suggesting "
+    "medication adherence review and dietary counselling. No known drug allergies. Immunizations "
+    "are up to date. Recommend follow-up in three months with repeat laboratory panel."
+).split()
+
+
+class StubConfig(BaseModel):
+    first_token_ms: float = 300.0
+    jitter_ms: float = 50.0
+    tokens_per_second: float = 50.0
+    completion_tokens: int = 200
+    groq_error_rate: float = 0.0
+    ollama_error_rate: float = 0.0
+    error_statuses: List[int] = [429, 500, 503]
+    groq_models: List[str] = ["llama-3.3-70b-versatile"]
+    ollama_models: List[str] = ["llama3.2:3b"]
+
+
+class StubStats:
+    """Calls, injected errors and generated tokens per backend"""
+
+    def __init__(self):
+        self.counts: Dict[str, Dict[str, int]] = {}
+
+    def add(self, backend: str, key: str, amount: int = 1) -> None:
+        backend_counts = self.counts.setdefault(backend, {"requests": 0, "errors": 0, "tokens": 0})
+        backend_counts[key] += amount
+
+
+def _digest(name: str) -> str:
+    return hashlib.sha256(name.encode()).hexdigest()
+
+
+def create_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="LLM stub")
+    stats = StubStats()
+
+    async def first_token_delay() -> None:
+        jitter = random.uniform(-config.jitter_ms, config.jitter_ms)
+        await asyncio.sleep(max(0.0, config.first_token_ms + jitter) / 1000)
+
+    async def generate_tokens(backend: str) -> AsyncIterator[str]:
+        """Canned reply, one word per token, paced at the configured token rate"""
+        await first_token_delay()
+        for i in range(config.completion_tokens):
+            if i:
+                await asyncio.sleep(1 / config.tokens_per_second)
+            stats.add(backend, "tokens")
+            word = SUMMARY_WORDS[i % len(SUMMARY_WORDS)]
+            yield word if i == 0 else f" {word}"
+
+    def injected_error(backend: str, error_rate: float) -> Any:
+        """Error response for a share of requests, None for the rest"""
+        stats.add(backend, "requests")
+        if random.random() >= error_rate:
+            return None
+
+        stats.add(backend, "errors")
+        status_code = random.choice(config.error_statuses)
+        headers = {"Retry-After": "1"} if status_code == 429 else None
+        message = f"Injected error {status_code}"
+        # OpenAI nests the error object, Ollama returns a plain message
+        content = {"error": {"message": message, "type": "stub_error"}} if backend == "groq" else {"error": message}
+        return JSONResponse(content, status_code=status_code, headers=headers)
+
+    # Groq, OpenAI-compatible
+    @app.get("/openai/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": model, "object": "model", "owned_by": "stub"} for model in config.groq_models]}
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        error = injected_error("groq", config.groq_error_rate)
+        if error is not None:
+            await first_token_delay()
+            return error
+
+        completion_id = f"chatcmpl-{random.getrandbits(64):016x}"
+        created = int(time.time())
+        prompt_tokens = sum(len(str(message.get("content", "")).split()) for message in body.get("messages", []))
+
+        def chunk(delta: Dict[str, Any], finish_reason: Any = None) -> str:
+            data = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": body["model"],
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": config.completion_tokens, "total_tokens": prompt_tokens + config.completion_tokens}
+
+        if body.get("stream"):
+            async def event_stream():
+                async for token in generate_tokens("groq"):
+                    yield chunk({"role": "assistant", "content": token})
+                yield chunk({}, "stop")
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    data = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": body["model"], "choices": [], "usage": usage}
+                    yield f"data: {json.dumps(data)}\n\n"
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+        content = "".join([token async for token in generate_tokens("groq")])
+        return {
+            "id": completion_id, "object": "chat.completion", "created": created, "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage
+        }
+
+    # Ollama
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [
+            {
+                "name": model, "model": model, "modified_at": "2025-01-01T00:00:00Z", "size": 2019393189, "digest": _digest(model),
+                "details": {"format": "gguf", "family": "llama", "parameter_size": "3.2B", "quantization_level": "Q4_K_M"}
+            }
+            for model in config.ollama_models
+        ]}
+
+    @app.get("/api/ps")
+    async def ps():
+        expires_at = (datetime.now(timezone.utc) + timedelta(minutes=10)).isoformat()
+        return {"models": [
+            {"name": model, "model": model, "size": 2019393189, "digest": _digest(model), "size_vram": 2019393189, "expires_at": expires_at}
+            for model in config.ollama_models
+        ]}
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        if body["model"] not in config.ollama_models:
+            return JSONResponse({"error": f"model '{body['model']}' not found"}, status_code=404)
+
+        # An empty prompt only loads the model
+        if not body.get("prompt"):
+            return {"model": body["model"], "created_at": datetime.now(timezone.utc).isoformat(), "response": "", "done": True, "done_reason": "load"}
+
+        error = injected_error("ollama", config.ollama_error_rate)
+        if error is not None:
+            await first_token_delay()
+            return error
+
+        start_time = time.perf_counter()
+
+        def message(response: str, done: bool) -> Dict[str, Any]:
+            data = {"model": body["model"], "created_at": datetime.now(timezone.utc).isoformat(), "response": response, "done": done}
+            if done:
+                elapsed_ns = int((time.perf_counter() - start_time) * 1e9)
+                data.update({
+                    "done_reason": "stop",
+                    "total_duration": elapsed_ns,
+                    "prompt_eval_count": len(body["prompt"].split()),
+                    "eval_count": config.completion_tokens,
+                    "eval_duration": elapsed_ns
+                })
+            return data
+
+        # Ollama streams unless told not to
+        if body.get("stream", True):
+            async def ndjson_stream():
+                async for token in generate_tokens("ollama"):
+                    yield json.dumps(message(token, False)) + "\n"
+                yield json.dumps(message("", True)) + "\n"
+            return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+        content = "".join([token async for token in generate_tokens("ollama")])
+        return message(content, True)
+
+    # Stub control
+    @app.get("/_stub/config")
+    async def get_config():
+        return config
+
+    @app.post("/_stub/config")
+    async def update_config(request: Request):
+        """Change settings while running, e.g. to fail Groq mid-test"""
+        updates = await request.json()
+        for name, value in StubConfig(**{**config.model_dump(), **updates}).model_dump().items():
+            setattr(config, name, value)
+        return config
+
+    @app.get("/_stub/stats")
+    async def get_stats():
+        return stats.counts
+
+    @app.post("/_stub/stats/reset")
+    async def reset_stats():
+        stats.counts.clear()
+        return stats.counts
+
+    return app
+
+
+def main():
+    defaults = StubConfig()
+    parser = argparse.ArgumentParser(description="Serve stand-ins for the Groq and Ollama APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--first-token-ms", type=float, default=defaults.first_token_ms, help="Delay before the first token")
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms, help="Random +/- variation of the first token delay")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second, help="Rate tokens are generated at after the first")
+    parser.add_argument("--completion-tokens", type=int, default=defaults.completion_tokens, help="Tokens in every reply")
+    parser.add_argument("--groq-error-rate", type=float, default=defaults.groq_error_rate, help="Share of Groq completions failing with an injected error")
+    parser.add_argument("--ollama-error-rate", type=float, default=defaults.ollama_error_rate, help="Share of Ollama generations failing with an injected error")
+    parser.add_argument("--error-statuses", type=int, nargs="+", default=defaults.error_statuses, help="HTTP statuses injected errors are picked from")
+    parser.add_argument("--groq-models", nargs="+", default=defaults.groq_models)
+    parser.add_argument("--ollama-models", nargs="+", default=defaults.ollama_models)
+    args = parser.parse_args()
+
+    config = StubConfig(**{name: getattr(args, name) for name in StubConfig.model_fields})
+    print(f"LLM stub on http://{args.host}:{args.port} with {config.model_dump()}")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
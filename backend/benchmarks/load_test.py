@@ -0,0 +1,360 @@
+"""
+Drive a running app with a weighted mix of patient, profile and summary requests and report
+throughput, latency, event loop blocking and summary cache behaviour.
+
+Virtual users send requests back to back for the given duration. Summaries are requested for a
+small pool of "hot" patients, so repeated calls exercise the summary cache and in-flight
+de-duplication, and a share of them use the streaming endpoint. Alongside the load a probe hits
+the trivial root endpoint, whose latency rises when handlers block the event loop. The app's
+/api/v1/metrics is scraped before and after the run for cache hits, LLM calls and the
+event_loop_lag_seconds histogram, and the LLM stub's /_stub/stats for upstream calls.
+
+Usage (from the backend directory), with the app configured against benchmarks.llm_stub:
+    python -m benchmarks.llm_stub --port 9100 &
+    GROQ_API_URL=http://127.0.0.1:9100/openai/v1 OLLAMA_HOST=127.0.0.1 OLLAMA_LOCALHOST=127.0.0.1 OLLAMA_PORT=9100 \\
+        uvicorn app.main:app --port 8000 &
+    python -m benchmarks.load_test [--users 20] [--duration 60] [--mix patients=3 by_conditions=2 profile=3 summary=2]
+        [--hot-patients 20] [--stream-share 0.5] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import httpx
+import numpy as np
+
+
+DEFAULT_MIX = {"patients": 3, "by_conditions": 2, "profile": 3, "summary": 2}
+
+# Metric name and sorted label pairs of one Prometheus sample
+SampleKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_SAMPLE_PATTERN = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+_LABEL_PATTERN = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text: str) -> Dict[SampleKey, float]:
+    """Samples of a Prometheus text exposition"""
+    samples = {}
+    for line in text.splitlines():
+        match = _SAMPLE_PATTERN.match(line)
+        if match is None:
+            continue
+        name, labels, value = match.groups()
+        key = (name, tuple(sorted(_LABEL_PATTERN.findall(labels or ""))))
+        samples[key] = float(value)
+    return samples
+
+
+def metric_delta(before: Dict[SampleKey, float], after: Dict[SampleKey, float], name: str, **labels: str) -> float:
+    """Increase of a counter between two scrapes, summed over samples matching the labels"""
+    total = 0.0
+    for key, value in after.items():
+        sample_name, sample_labels = key
+        if sample_name == name and set(labels.items()) <= set(sample_labels):
+            total += value - before.get(key, 0.0)
+    return total
+
+
+def histogram_quantile(before: Dict[SampleKey, float], after: Dict[SampleKey, float], name: str, q: float) -> Optional[float]:
+    """Upper bound of the bucket holding quantile q of the observations made between two scrapes"""
+    buckets = defaultdict(float)
+    for key, value in after.items():
+        sample_name, labels = key
+        if sample_name == f"{name}_bucket":
+            bound = float(dict(labels)["le"])
+            buckets[bound] += value - before.get(key, 0.0)
+
+    if not buckets or not buckets[float("inf")]:
+        return None
+    target = q * buckets[float("inf")]
+    return next(bound for bound in sorted(buckets) if buckets[bound] >= target)
+
+
+class LoadTest:
+    """Shared state of one run: the client, request targets and recorded results"""
+
+    def __init__(self, client: httpx.AsyncClient, api_prefix: str, hot_patients: int, stream_share: float, seed: int):
+        self.client = client
+        self.api_prefix = api_prefix
+        self.hot_patients = hot_patients
+        self.stream_share = stream_share
+        self.rng = random.Random(seed)
+        self.patient_ids: List[str] = []
+        self.condition_codes: List[int] = []
+        # Latency in ms and error of every request, by endpoint
+        self.results: Dict[str, List[Tuple[float, Optional[str]]]] = defaultdict(list)
+
+    async def setup(self) -> None:
+        """Fetch the patients and conditions requests are built from"""
+        response = await self.client.get(f"{self.api_prefix}/patients/", params={"limit": 2000})
+        response.raise_for_status()
+        self.patient_ids = [patient["id"] for patient in response.json()]
+
+        response = await self.client.get(f"{self.api_prefix}/patients/conditions")
+        response.raise_for_status()
+        self.condition_codes = [condition["code"] for condition in response.json()]
+
+        if not self.patient_ids or not self.condition_codes:
+            raise RuntimeError("The app returned no patients or conditions to build requests from")
+
+    async def _timed(self, endpoint: str, request: Callable[[], Awaitable[Optional[str]]]) -> None:
+        """Run a request, recording its latency and the error it returned, if any"""
+        start_time = time.perf_counter()
+        try:
+            error = await request()
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        self.results[endpoint].append(((time.perf_counter() - start_time) * 1000, error))
+
+    @staticmethod
+    def _check(response: httpx.Response) -> Optional[str]:
+        if response.is_error:
+            return f"HTTP {response.status_code}"
+        # Endpoints log unexpected exceptions and return an empty body
+        if response.json() is None:
+            return "empty body"
+        return None
+
+    async def patients(self) -> None:
+        async def request():
+            return self._check(await self.client.get(f"{self.api_prefix}/patients/", params={"limit": 50}))
+        await self._timed("patients", request)
+
+    async def by_conditions(self) -> None:
+        condition_ids = self.rng.sample(self.condition_codes, k=min(2, len(self.condition_codes)))
+        async def request():
+            return self._check(await self.client.post(f"{self.api_prefix}/patients/by-conditions", json={"condition_ids": condition_ids}))
+        await self._timed("by_conditions", request)
+
+    async def profile(self) -> None:
+        patient_id = self.rng.choice(self.patient_ids)
+        async def request():
+            return self._check(await self.client.post(f"{self.api_prefix}/services/patients/generated-summary/{patient_id}"))
+        await self._timed("profile", request)
+
+    async def summary(self) -> None:
+        patient_id = self.rng.choice(self.patient_ids[:self.hot_patients])
+        if self.rng.random() < self.stream_share:
+            await self._timed("summary_stream", lambda: self._stream_summary(patient_id))
+            return
+
+        async def request():
+            return self._check(await self.client.post(f"{self.api_prefix}/services/{patient_id}"))
+        await self._timed("summary", request)
+
+    async def _stream_summary(self, patient_id: str) -> Optional[str]:
+        """Read the summary event stream to its end, recording the time to its first token"""
+        start_time = time.perf_counter()
+        async with self.client.stream("POST", f"{self.api_prefix}/services/{patient_id}/stream") as response:
+            if response.is_error:
+                return f"HTTP {response.status_code}"
+            first_token = True
+            async for line in response.aiter_lines():
+                if line == "event: token" and first_token:
+                    self.results["summary_stream.ttft"].append(((time.perf_counter() - start_time) * 1000, None))
+                    first_token = False
+                elif line == "event: error":
+                    return "error event"
+                elif line == "event: done":
+                    return None
+        return "stream ended without done event"
+
+
+async def run_users(load_test: LoadTest, mix: Dict[str, float], users: int, duration: float) -> float:
+    """Send requests from concurrent virtual users until the duration is up, returning the elapsed seconds"""
+    actions = {name: getattr(load_test, name) for name in mix}
+    names, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + duration
+
+    async def user() -> None:
+        while time.perf_counter() < deadline:
+            name = load_test.rng.choices(names, weights)[0]
+            await actions[name]()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(users)))
+    return time.perf_counter() - start_time
+
+
+async def probe_loop(client: httpx.AsyncClient, stop: asyncio.Event, interval: float, latencies: List[float]) -> None:
+    """Time the root endpoint, which does no work, every interval until stopped"""
+    while not stop.is_set():
+        start_time = time.perf_counter()
+        try:
+            await client.get("/")
+            latencies.append((time.perf_counter() - start_time) * 1000)
+        except httpx.HTTPError:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def fetch_json(client: httpx.AsyncClient, url: Optional[str], method: str = "GET") -> Optional[Any]:
+    if not url:
+        return None
+    try:
+        response = await client.request(method, url)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        print(f"Could not reach {url}: {e}")
+        return None
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 1),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 1),
+        "max_ms": round(float(max(latencies)), 1)
+    }
+
+
+def report(
+    results: Dict[str, List[Tuple[float, Optional[str]]]],
+    elapsed: float,
+    probe_latencies: List[float],
+    metrics_before: Dict[SampleKey, float],
+    metrics_after: Dict[SampleKey, float],
+    stub_stats: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Print the results of a run and return them"""
+    summary: Dict[str, Any] = {"elapsed_s": round(elapsed, 1), "endpoints": {}}
+
+    print(f"\n{'endpoint':<22} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    total_requests = 0
+    for endpoint, records in sorted(results.items()):
+        latencies = [latency for latency, _ in records]
+        errors = defaultdict(int)
+        for _, error in records:
+            if error:
+                errors[error] += 1
+        stats = {"requests": len(records), "errors": dict(errors), "rps": round(len(records) / elapsed, 2), **summarize_latencies(latencies)}
+        summary["endpoints"][endpoint] = stats
+        if not endpoint.endswith(".ttft"):
+            total_requests += len(records)
+        print(
+            f"{endpoint:<22} {stats['requests']:>9} {sum(errors.values()):>7} {stats['rps']:>8.2f} "
+            f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}"
+        )
+        for error, count in errors.items():
+            print(f"{'':<22} {count:>9} x {error}")
+    summary["throughput_rps"] = round(total_requests / elapsed, 2)
+    print(f"\nThroughput: {summary['throughput_rps']} req/s over {elapsed:.1f}s")
+
+    # Event loop blocking, from the root probe and the app's own lag histogram
+    summary["root_probe"] = summarize_latencies(probe_latencies)
+    print(f"Root probe latency: {summary['root_probe']}")
+    if metrics_after:
+        lag_count = metric_delta(metrics_before, metrics_after, "event_loop_lag_seconds_count")
+        lag_sum = metric_delta(metrics_before, metrics_after, "event_loop_lag_seconds_sum")
+        summary["event_loop_lag"] = {
+            "samples": int(lag_count),
+            "mean_ms": round(lag_sum / lag_count * 1000, 1) if lag_count else None,
+            "p99_le_s": histogram_quantile(metrics_before, metrics_after, "event_loop_lag_seconds", 0.99)
+        }
+        print(f"Event loop lag: {summary['event_loop_lag']}")
+
+        # Summary cache and upstream LLM calls
+        hits = metric_delta(metrics_before, metrics_after, "summary_cache_requests_total", result="hit")
+        misses = metric_delta(metrics_before, metrics_after, "summary_cache_requests_total", result="miss")
+        summary["summary_cache"] = {
+            "hits": int(hits),
+            "misses": int(misses),
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+            "evictions": int(metric_delta(metrics_before, metrics_after, "summary_cache_evictions_total"))
+        }
+        print(f"Summary cache: {summary['summary_cache']}")
+
+        llm_calls = {}
+        for key in metrics_after:
+            name, labels = key
+            if name == "llm_request_duration_seconds_count":
+                label_dict = dict(labels)
+                llm_calls[f"{label_dict['backend']}/{label_dict['outcome']}"] = int(metric_delta(metrics_before, metrics_after, name, **label_dict))
+        summary["llm_calls"] = {name: count for name, count in llm_calls.items() if count}
+        print(f"LLM calls by backend/outcome: {summary['llm_calls']}")
+
+    if stub_stats is not None:
+        summary["stub"] = stub_stats
+        print(f"LLM stub: {stub_stats}")
+    return summary
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    headers = {"X-API-Key": args.api_key}
+    limits = httpx.Limits(max_connections=args.users + 2)
+    async with httpx.AsyncClient(base_url=args.base_url, headers=headers, timeout=args.timeout, limits=limits) as client:
+        load_test = LoadTest(client, args.api_prefix, args.hot_patients, args.stream_share, args.seed)
+        await load_test.setup()
+        print(f"Loaded {len(load_test.patient_ids)} patients and {len(load_test.condition_codes)} conditions from {args.base_url}")
+
+        stub_stats_url = f"{args.stub_url.rstrip('/')}/_stub/stats" if args.stub_url else None
+        await fetch_json(client, f"{stub_stats_url}/reset" if stub_stats_url else None, method="POST")
+
+        metrics_url = f"{args.api_prefix}/metrics"
+        metrics_before = parse_metrics((await client.get(metrics_url)).text)
+
+        stop = asyncio.Event()
+        probe_latencies: List[float] = []
+        probe = asyncio.create_task(probe_loop(client, stop, args.probe_interval, probe_latencies))
+        print(f"Running {args.users} users for {args.duration:.0f}s with mix {args.mix}")
+        elapsed = await run_users(load_test, args.mix, args.users, args.duration)
+        stop.set()
+        await probe
+
+        metrics_after = parse_metrics((await client.get(metrics_url)).text)
+        stub_stats = await fetch_json(client, stub_stats_url)
+        return report(load_test.results, elapsed, probe_latencies, metrics_before, metrics_after, stub_stats)
+
+
+def parse_mix(items: List[str]) -> Dict[str, float]:
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown request type {name}, expected one of {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a running app with a mix of patient, profile and summary requests")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="URL of the app")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--api-key", default=os.environ.get("API_KEY"), help="Defaults to the API_KEY environment variable")
+    parser.add_argument("--stub-url", default="http://127.0.0.1:9100", help="URL of benchmarks.llm_stub, empty to skip its stats")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to send requests for")
+    parser.add_argument("--mix", nargs="+", default=[f"{name}={weight}" for name, weight in DEFAULT_MIX.items()], help="Relative weights of request types, as name=weight")
+    parser.add_argument("--hot-patients", type=int, default=20, help="Number of patients summaries are requested for")
+    parser.add_argument("--stream-share", type=float, default=0.5, help="Share of summary requests using the streaming endpoint")
+    parser.add_argument("--probe-interval", type=float, default=0.1, help="Seconds between root endpoint probes")
+    parser.add_argument("--timeout", type=float, default=180.0, help="Seconds before a request is abandoned")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    if not args.api_key:
+        parser.error("--api-key or the API_KEY environment variable is required")
+    args.mix = parse_mix(args.mix)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, mode="w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Benchmark PatientService methods on synthetic datasets and compare them against a stored baseline.
+
+Every public lookup and every private profile section is timed on a sample of patients at each
+dataset size, reporting p50/p95 latency and the tracemalloc peak of one call. Results are
+compared with benchmarks/baseline.json, written by --save-baseline on the reference machine.
+
+Usage (from the backend directory):
+    python -m benchmarks.patient_service [--sizes 1000 10000 100000] [--samples 50]
+        [--save-baseline] [--fail-on-regression]
+    python -m benchmarks.patient_service --data-dir data/processed
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from app.models.patient import CohortQuery
+from app.services.data.patient_service import PatientService
+from benchmarks.synthetic_data import generate_dataset
+
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# p50 slower than the baseline by more than this factor, and by more than the minimum so
+# sub-millisecond jitter is ignored, is reported as a regression
+REGRESSION_FACTOR = 1.25
+REGRESSION_MIN_MS = 0.5
+
+# Profile sections, each called with a prebuilt PatientSlice
+SECTION_METHODS = [
+    "_get_patient_demographics",
+    "_get_patient_conditions",
+    "_get_current_medications",
+    "_get_recent_observations",
+    "_get_patient_allergies",
+    "_get_recent_encounters",
+    "_get_recent_procedures",
+    "_get_immunizations",
+    "_generate_chart_data",
+    "_get_vital_trends",
+    "_get_conditions_timeline",
+    "_get_cost_breakdown",
+    "_get_medication_timeline",
+    "_get_summary_stats"
+]
+
+Result = Dict[str, float]
+
+
+def measure(func: Callable[[int], Any], samples: int) -> Result:
+    """
+    Time `samples` calls of func(i), then trace the memory of one more call.
+
+    tracemalloc slows allocations down, so it only runs outside the timed calls.
+    """
+    durations = []
+    for i in range(samples):
+        start_time = time.perf_counter()
+        func(i)
+        durations.append((time.perf_counter() - start_time) * 1000)
+
+    tracemalloc.start()
+    try:
+        baseline_memory, _ = tracemalloc.get_traced_memory()
+        func(0)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "p50_ms": round(float(np.percentile(durations, 50)), 3),
+        "p95_ms": round(float(np.percentile(durations, 95)), 3),
+        "peak_kib": round((peak_memory - baseline_memory) / 1024, 1)
+    }
+
+
+def benchmark_service(patient_service: PatientService, samples: int, seed: int = 0) -> Dict[str, Result]:
+    """Time every benchmarked method of a loaded PatientService"""
+    rng = np.random.default_rng(seed)
+    patient_ids = rng.choice(patient_service.data.patients["Id"].to_numpy(), size=samples)
+    slices = [patient_service._get_patient_slice(patient_id) for patient_id in patient_ids]
+
+    # The most common pair of conditions makes for the largest cohort
+    code_counts = patient_service.data.conditions["CODE"].value_counts().index.tolist()
+    common_codes = code_counts[:2]
+    cohort_query = CohortQuery(any_codes=code_counts[:2], none_codes=code_counts[2:3], active_only=True)
+
+    cases: Dict[str, Callable[[int], Any]] = {
+        "get_comprehensive_patient_profile": lambda i: patient_service.get_comprehensive_patient_profile(patient_ids[i]),
+        "get_patients_by_condition_id": lambda i: patient_service.get_patients_by_condition_id(common_codes),
+        "get_cohort": lambda i: patient_service.get_cohort(cohort_query),
+        "get_condition_list": lambda i: patient_service.get_condition_list(),
+        "get_patient_list": lambda i: patient_service.get_patient_list(limit=50),
+        "_get_patient_slice": lambda i: patient_service._get_patient_slice(patient_ids[i])
+    }
+    for method_name in SECTION_METHODS:
+        method = getattr(patient_service, method_name)
+        cases[method_name] = lambda i, method=method: method(slices[i])
+
+    results = {}
+    for name, func in cases.items():
+        results[name] = measure(func, samples)
+    return results
+
+
+def benchmark_size(n_patients: int, samples: int, seed: int) -> Dict[str, Result]:
+    """Generate a synthetic dataset, time loading it into PatientService, then time its methods"""
+    start_time = time.time()
+    data = generate_dataset(n_patients, seed=seed)
+    print(f"Generated {n_patients} patients in {time.time() - start_time:.1f}s")
+
+    # Date conversion and indexing run once per process, so one sample is enough
+    start_time = time.perf_counter()
+    patient_service = PatientService(data=data)
+    load_ms = (time.perf_counter() - start_time) * 1000
+
+    results = {"__init__": {"p50_ms": round(load_ms, 3), "p95_ms": round(load_ms, 3), "peak_kib": None}}
+    results.update(benchmark_service(patient_service, samples, seed))
+    return results
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, Result]]:
+    if not path.exists():
+        return {}
+    with open(path, mode="r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, results: Dict[str, Dict[str, Result]]) -> None:
+    """Merge results into the baseline, keeping sizes that were not re-run"""
+    baseline = load_baseline(path)
+    baseline.update(results)
+    with open(path, mode="w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    print(f"Saved baseline for {', '.join(results)} to {path}")
+
+
+def report(label: str, results: Dict[str, Result], baseline: Optional[Dict[str, Result]]) -> List[str]:
+    """
+    Print the results of one dataset next to its baseline
+
+    Returns:
+        Methods whose p50 regressed beyond REGRESSION_FACTOR
+    """
+    regressions = []
+    print(f"\n{label}")
+    print(f"{'method':<36} {'p50 ms':>10} {'p95 ms':>10} {'peak KiB':>10} {'vs baseline':>14}")
+    for name, result in results.items():
+        comparison = ""
+        previous = (baseline or {}).get(name)
+        if previous and previous["p50_ms"]:
+            ratio = result["p50_ms"] / previous["p50_ms"]
+            comparison = f"{ratio:.2f}x"
+            if ratio > REGRESSION_FACTOR and result["p50_ms"] - previous["p50_ms"] > REGRESSION_MIN_MS:
+                comparison += " SLOWER"
+                regressions.append(name)
+
+        peak = f"{result['peak_kib']:.1f}" if result["peak_kib"] is not None else "-"
+        print(f"{name:<36} {result['p50_ms']:>10.3f} {result['p95_ms']:>10.3f} {peak:>10} {comparison:>14}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PatientService methods on synthetic datasets")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Numbers of synthetic patients")
+    parser.add_argument("--samples", type=int, default=50, help="Timed calls per method")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic data and the patient sample")
+    parser.add_argument("--data-dir", type=Path, help="Benchmark the Parquet tables in this directory instead of synthetic data")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--fail-on-regression", action="store_true", help=f"Exit with status 1 if any p50 is over {REGRESSION_FACTOR}x its baseline")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"No baseline at {args.baseline}, run with --save-baseline to store one")
+
+    all_results = {}
+    regressions = []
+    if args.data_dir:
+        patient_service = PatientService(data_dir=args.data_dir)
+        label = f"dir:{args.data_dir.name}"
+        all_results[label] = benchmark_service(patient_service, args.samples, args.seed)
+        regressions += report(f"{args.data_dir} ({len(patient_service.data.patients)} patients)", all_results[label], baseline.get(label))
+    else:
+        for n_patients in args.sizes:
+            label = str(n_patients)
+            all_results[label] = benchmark_size(n_patients, args.samples, args.seed)
+            regressions += report(f"{n_patients} patients", all_results[label], baseline.get(label))
+
+    if args.save_baseline:
+        save_baseline(args.baseline, all_results)
+
+    if regressions:
+        print(f"\n{len(regressions)} methods slower than {REGRESSION_FACTOR}x baseline: {', '.join(sorted(set(regressions)))}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""
+Generate synthetic Synthea-style tables matching PatientServiceLoadedData, for benchmarking
+PatientService at patient counts far beyond the bundled processed slice.
+
+Rows per patient follow the averages of a Synthea export, every patient-keyed table is grouped
+by patient like Synthea writes it, and date and code columns use the same string formats and
+dtypes as the processed Parquet files, so loading, date conversion and indexing do the same work.
+Repeated values (codes, descriptions, dates) reference shared string objects to keep memory
+close to what the same tables take after a Parquet load.
+
+Usage (from the backend directory):
+    python -m benchmarks.synthetic_data --patients 10000 --output-dir /tmp/synthea_10k [--seed 0]
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from app.models.patient import PatientServiceLoadedData
+
+
+# Average rows per patient in a Synthea export
+ROWS_PER_PATIENT = {
+    "allergies": 0.8,
+    "careplans": 4.6,
+    "conditions": 61.0,
+    "encounters": 30.0,
+    "immunizations": 14.0,
+    "medications": 20.0,
+    "observations": 150.0,
+    "procedures": 30.0
+}
+
+# Share of rows without a STOP date, i.e. still active
+ACTIVE_SHARE = {
+    "allergies": 0.9,
+    "careplans": 0.3,
+    "conditions": 0.35,
+    "medications": 0.25
+}
+
+HISTORY_YEARS = 20
+
+# (code, description) pairs, earlier entries are drawn more often
+CONDITIONS = [
+    (314529007, "Medication review due (situation)"),
+    (160903007, "Full-time employment (finding)"),
+    (73595000, "Stress (finding)"),
+    (66383009, "Gingivitis (disorder)"),
+    (444814009, "Viral sinusitis (disorder)"),
+    (59621000, "Essential hypertension (disorder)"),
+    (15777000, "Prediabetes (finding)"),
+    (162864005, "Body mass index 30+ - obesity (finding)"),
+    (44054006, "Diabetes mellitus type 2 (disorder)"),
+    (55822004, "Hyperlipidemia (disorder)"),
+    (195662009, "Acute viral pharyngitis (disorder)"),
+    (10509002, "Acute bronchitis (disorder)"),
+    (38341003, "Hypertensive disorder, systemic arterial (disorder)"),
+    (271737000, "Anemia (disorder)"),
+    (40055000, "Chronic sinusitis (disorder)"),
+    (431855005, "Chronic kidney disease stage 1 (disorder)"),
+    (127013003, "Disorder of kidney due to diabetes mellitus (disorder)"),
+    (49436004, "Atrial fibrillation (disorder)"),
+    (53741008, "Coronary arteriosclerosis (disorder)"),
+    (97331000119101, "Macular edema and retinopathy due to type 2 diabetes mellitus (disorder)")
+]
+
+MEDICATIONS = [
+    "Atorvastatin 20 MG", "Lisinopril 10 MG", "Metformin hydrochloride 500 MG", "Amlodipine 5 MG",
+    "Hydrochlorothiazide 25 MG", "Simvastatin 10 MG", "Acetaminophen 325 MG", "Insulin Lispro 100 UNT/ML",
+    "Clopidogrel 75 MG", "Amoxicillin 250 MG", "Ibuprofen 200 MG", "Nitroglycerin 0.4 MG/ACTUAT"
+]
+
+ENCOUNTERS = [
+    ("wellness", "General examination of patient (procedure)"),
+    ("ambulatory", "Encounter for check up (procedure)"),
+    ("outpatient", "Check up"),
+    ("ambulatory", "Encounter for symptom (procedure)"),
+    ("emergency", "Emergency room admission (procedure)"),
+    ("inpatient", "Hospital admission (procedure)"),
+    ("urgentcare", "Urgent care clinic (environment)")
+]
+
+PROCEDURES = [
+    "Assessment of health and social care needs (procedure)", "Medication reconciliation (procedure)",
+    "Depression screening (procedure)", "Assessment", "Hemoglobin A1c measurement (procedure)",
+    "Electrocardiographic procedure (procedure)", "Dental care (regime/therapy)", "Chest X-ray (procedure)"
+]
+
+IMMUNIZATIONS = [
+    "Influenza  seasonal  injectable  preservative free", "Td (adult) preservative free", "Hep B  adolescent or pediatric",
+    "Pneumococcal conjugate PCV 13", "COVID-19  mRNA  LNP-S  PF  30 mcg/0.3 mL dose", "zoster"
+]
+
+ALLERGIES = [
+    ("Allergic disposition (finding)", "allergy", "environment"),
+    ("Allergy to grass pollen (finding)", "allergy", "environment"),
+    ("Shellfish (substance)", "allergy", "food"),
+    ("Penicillin V (substance)", "allergy", "medication"),
+    ("House dust mite (organism)", "allergy", "environment")
+]
+
+REACTIONS = [("Wheal (finding)", "MILD"), ("Rhinoconjunctivitis (disorder)", "MODERATE"), ("Anaphylaxis (disorder)", "SEVERE")]
+
+# (code, description, units, category, low, high), vitals used by the chart first
+OBSERVATIONS = [
+    ("8480-6", "Systolic Blood Pressure", "mm[Hg]", "vital-signs", 100, 160),
+    ("8462-4", "Diastolic Blood Pressure", "mm[Hg]", "vital-signs", 60, 100),
+    ("8310-5", "Body temperature", "Cel", "vital-signs", 36, 38),
+    ("9279-1", "Respiratory rate", "/min", "vital-signs", 12, 20),
+    ("8867-4", "Heart rate", "/min", "vital-signs", 55, 100),
+    ("29463-7", "Body Weight", "kg", "vital-signs", 50, 120),
+    ("39156-5", "Body mass index (BMI) [Ratio]", "kg/m2", "vital-signs", 18, 40),
+    ("4548-4", "Hemoglobin A1c/Hemoglobin.total in Blood", "%", "laboratory", 4, 10),
+    ("2339-0", "Glucose [Mass/volume] in Blood", "mg/dL", "laboratory", 70, 200),
+    ("2093-3", "Cholesterol [Mass/volume] in Serum or Plasma", "mg/dL", "laboratory", 150, 280),
+    ("2571-8", "Triglycerides", "mg/dL", "laboratory", 80, 250),
+    ("38483-4", "Creatinine [Mass/volume] in Blood", "mg/dL", "laboratory", 0.6, 1.6)
+]
+
+FIRST_NAMES = ["Tanner", "Mickey", "Ana", "Luis", "Grace", "Omar", "Mei", "Sofia", "Jamal", "Ivan", "Priya", "Noah"]
+LAST_NAMES = ["Zieme", "Armstrong", "Garcia", "Nguyen", "Smith", "Okafor", "Kowalski", "Haddad", "Rossi", "Tanaka"]
+CITIES = ["Worcester", "Boston", "Springfield", "Lowell", "Cambridge", "Fitchburg", "Quincy", "Newton"]
+
+
+def _weights(n: int) -> np.ndarray:
+    """Zipf-like draw weights, so a few codes are common and most are rare as in real data"""
+    weights = 1.0 / np.arange(1, n + 1)
+    return weights / weights.sum()
+
+
+def _uuids(rng: np.random.Generator, n: int) -> np.ndarray:
+    return np.array([str(uuid.UUID(bytes=rng.bytes(16))) for _ in range(n)], dtype=object)
+
+
+def _date_pool(with_time: bool) -> np.ndarray:
+    """One formatted date per day of the history, as Synthea writes them"""
+    days = pd.date_range(end=datetime.now().date(), periods=HISTORY_YEARS * 365, freq="D")
+    if with_time:
+        return np.array((days + timedelta(hours=9, minutes=30)).strftime("%Y-%m-%dT%H:%M:%SZ"), dtype=object)
+    return np.array(days.strftime("%Y-%m-%d"), dtype=object)
+
+
+class _Generator:
+    def __init__(self, n_patients: int, seed: int, rows_scale: float):
+        self.rng = np.random.default_rng(seed)
+        self.rows_scale = rows_scale
+        self.patient_ids = _uuids(self.rng, n_patients)
+        self.dates = _date_pool(with_time=False)
+        self.timestamps = _date_pool(with_time=True)
+        self.encounter_ids: Optional[np.ndarray] = None
+
+    def _patient_rows(self, table: str) -> np.ndarray:
+        """PATIENT column, grouped by patient with a Poisson number of rows each"""
+        counts = self.rng.poisson(ROWS_PER_PATIENT[table] * self.rows_scale, len(self.patient_ids))
+        return np.repeat(self.patient_ids, counts)
+
+    def _choice(self, values: List, n: int) -> np.ndarray:
+        return self.rng.choice(len(values), size=n, p=_weights(len(values)))
+
+    def _dates(self, n: int, with_time: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """Formatted dates and their day offsets into the history"""
+        offsets = self.rng.integers(0, HISTORY_YEARS * 365, size=n)
+        return (self.timestamps if with_time else self.dates)[offsets], offsets
+
+    def _stops(self, table: str, offsets: np.ndarray, with_time: bool) -> np.ndarray:
+        """STOP dates some days after START, missing for the active share of rows"""
+        pool = self.timestamps if with_time else self.dates
+        stop_offsets = np.minimum(offsets + self.rng.integers(1, 365, size=len(offsets)), len(pool) - 1)
+        stops = pool[stop_offsets].copy()
+        stops[self.rng.random(len(offsets)) < ACTIVE_SHARE.get(table, 0.0)] = None
+        return stops
+
+    def _encounters_of(self, n: int) -> np.ndarray:
+        return self.encounter_ids[self.rng.integers(0, len(self.encounter_ids), size=n)]
+
+    def patients(self) -> pd.DataFrame:
+        n = len(self.patient_ids)
+        birth_offsets = self.rng.integers(0, 90 * 365, size=n)
+        birthdates = (pd.Timestamp(datetime.now().date()) - pd.to_timedelta(birth_offsets, unit="D")).strftime("%Y-%m-%d")
+        deathdates = np.full(n, np.nan, dtype=object)
+        deceased = self.rng.random(n) < 0.05
+        deathdates[deceased] = self.dates[self.rng.integers(0, len(self.dates), size=deceased.sum())]
+
+        first = np.array(FIRST_NAMES, dtype=object)
+        last = np.array(LAST_NAMES, dtype=object)
+        cities = np.array(CITIES, dtype=object)
+        return pd.DataFrame({
+            "Id": self.patient_ids,
+            "BIRTHDATE": np.array(birthdates, dtype=object),
+            "DEATHDATE": deathdates,
+            "FIRST": first[self.rng.integers(0, len(first), size=n)],
+            "LAST": last[self.rng.integers(0, len(last), size=n)],
+            "MARITAL": np.array(["M", "S", None], dtype=object)[self.rng.integers(0, 3, size=n)],
+            "RACE": np.array(["white", "black", "asian", "hispanic", "other"], dtype=object)[self._choice(range(5), n)],
+            "ETHNICITY": np.array(["nonhispanic", "hispanic"], dtype=object)[self._choice(range(2), n)],
+            "GENDER": np.array(["M", "F"], dtype=object)[self.rng.integers(0, 2, size=n)],
+            "ADDRESS": np.array([f"{i} Main Street" for i in range(1, 101)], dtype=object)[self.rng.integers(0, 100, size=n)],
+            "CITY": cities[self.rng.integers(0, len(cities), size=n)],
+            "STATE": "Massachusetts",
+            "ZIP": self.rng.integers(1000, 2800, size=n),
+            "HEALTHCARE_EXPENSES": self.rng.gamma(2.0, 20000.0, size=n).round(2),
+            "HEALTHCARE_COVERAGE": self.rng.gamma(2.0, 50000.0, size=n).round(2),
+            "INCOME": self.rng.integers(10000, 200000, size=n)
+        })
+
+    def encounters(self) -> pd.DataFrame:
+        patients = self._patient_rows("encounters")
+        n = len(patients)
+        self.encounter_ids = _uuids(self.rng, n)
+        starts, offsets = self._dates(n, with_time=True)
+        kinds = self._choice(ENCOUNTERS, n)
+        total_cost = self.rng.gamma(2.0, 500.0, size=n)
+        return pd.DataFrame({
+            "Id": self.encounter_ids,
+            "START": starts,
+            "STOP": self._stops("encounters", offsets, with_time=True),
+            "PATIENT": patients,
+            "ENCOUNTERCLASS": np.array([kind for kind, _ in ENCOUNTERS], dtype=object)[kinds],
+            "CODE": 185345009 + kinds,
+            "DESCRIPTION": np.array([description for _, description in ENCOUNTERS], dtype=object)[kinds],
+            "BASE_ENCOUNTER_COST": (total_cost * 0.1).round(2),
+            "TOTAL_CLAIM_COST": total_cost.round(2),
+            "PAYER_COVERAGE": (total_cost * self.rng.random(n)).round(2),
+            "REASONCODE": np.nan,
+            "REASONDESCRIPTION": None
+        })
+
+    def conditions(self) -> pd.DataFrame:
+        patients = self._patient_rows("conditions")
+        n = len(patients)
+        starts, offsets = self._dates(n, with_time=False)
+        codes = self._choice(CONDITIONS, n)
+        return pd.DataFrame({
+            "START": starts,
+            "STOP": self._stops("conditions", offsets, with_time=False),
+            "PATIENT": patients,
+            "ENCOUNTER": self._encounters_of(n),
+            "SYSTEM": "SNOMED-CT",
+            "CODE": np.array([code for code, _ in CONDITIONS], dtype=np.int64)[codes],
+            "DESCRIPTION": np.array([description for _, description in CONDITIONS], dtype=object)[codes]
+        })
+
+    def medications(self) -> pd.DataFrame:
+        patients = self._patient_rows("medications")
+        n = len(patients)
+        starts, offsets = self._dates(n, with_time=True)
+        drugs = self._choice(MEDICATIONS, n)
+        base_cost = self.rng.gamma(2.0, 5.0, size=n)
+        dispenses = self.rng.integers(1, 24, size=n)
+        reasons = np.array([description for _, description in CONDITIONS] + [None] * 5, dtype=object)
+        return pd.DataFrame({
+            "START": starts,
+            "STOP": self._stops("medications", offsets, with_time=True),
+            "PATIENT": patients,
+            "CODE": 197361 + drugs,
+            "DESCRIPTION": np.array(MEDICATIONS, dtype=object)[drugs],
+            "BASE_COST": base_cost.round(2),
+            "DISPENSES": dispenses,
+            "TOTALCOST": (base_cost * dispenses).round(2),
+            "REASONCODE": np.nan,
+            "REASONDESCRIPTION": reasons[self.rng.integers(0, len(reasons), size=n)]
+        })
+
+    def observations(self) -> pd.DataFrame:
+        patients = self._patient_rows("observations")
+        n = len(patients)
+        dates, _ = self._dates(n, with_time=True)
+        kinds = self._choice(OBSERVATIONS, n)
+        # Values are drawn from a pool of formatted readings per observation so they share strings
+        values = np.empty(n, dtype=object)
+        for i, (_, _, _, _, low, high) in enumerate(OBSERVATIONS):
+            rows = kinds == i
+            pool = np.array([f"{value:.1f}" for value in np.linspace(low, high, 200)], dtype=object)
+            values[rows] = pool[self.rng.integers(0, len(pool), size=rows.sum())]
+
+        columns = list(zip(*OBSERVATIONS))
+        return pd.DataFrame({
+            "DATE": dates,
+            "PATIENT": patients,
+            "ENCOUNTER": self._encounters_of(n),
+            "CATEGORY": np.array(columns[3], dtype=object)[kinds],
+            "CODE": np.array(columns[0], dtype=object)[kinds],
+            "DESCRIPTION": np.array(columns[1], dtype=object)[kinds],
+            "VALUE": values,
+            "UNITS": np.array(columns[2], dtype=object)[kinds],
+            "TYPE": "numeric"
+        })
+
+    def procedures(self) -> pd.DataFrame:
+        patients = self._patient_rows("procedures")
+        n = len(patients)
+        starts, offsets = self._dates(n, with_time=True)
+        kinds = self._choice(PROCEDURES, n)
+        reasons = np.array(["Diabetes", "Hypertension"] + [None] * 6, dtype=object)
+        return pd.DataFrame({
+            "START": starts,
+            "STOP": self._stops("procedures", offsets, with_time=True),
+            "PATIENT": patients,
+            "SYSTEM": "SNOMED-CT",
+            "CODE": 710824005 + kinds,
+            "DESCRIPTION": np.array(PROCEDURES, dtype=object)[kinds],
+            "BASE_COST": self.rng.gamma(2.0, 200.0, size=n).round(2),
+            "REASONCODE": np.nan,
+            "REASONDESCRIPTION": reasons[self.rng.integers(0, len(reasons), size=n)]
+        })
+
+    def immunizations(self) -> pd.DataFrame:
+        patients = self._patient_rows("immunizations")
+        n = len(patients)
+        dates, _ = self._dates(n, with_time=True)
+        kinds = self._choice(IMMUNIZATIONS, n)
+        return pd.DataFrame({
+            "DATE": dates,
+            "PATIENT": patients,
+            "ENCOUNTER": self._encounters_of(n),
+            "CODE": 140 + kinds,
+            "DESCRIPTION": np.array(IMMUNIZATIONS, dtype=object)[kinds],
+            "BASE_COST": 136.0
+        })
+
+    def allergies(self) -> pd.DataFrame:
+        patients = self._patient_rows("allergies")
+        n = len(patients)
+        starts, offsets = self._dates(n, with_time=False)
+        kinds = self._choice(ALLERGIES, n)
+        reactions = self.rng.integers(0, len(REACTIONS) + 1, size=n)
+        reaction_descriptions = np.array([description for description, _ in REACTIONS] + [None], dtype=object)
+        severities = np.array([severity for _, severity in REACTIONS] + [None], dtype=object)
+        columns = list(zip(*ALLERGIES))
+        return pd.DataFrame({
+            "START": starts,
+            "STOP": self._stops("allergies", offsets, with_time=False),
+            "PATIENT": patients,
+            "ENCOUNTER": self._encounters_of(n),
+            "CODE": 609328004 + kinds,
+            "SYSTEM": "Unknown",
+            "DESCRIPTION": np.array(columns[0], dtype=object)[kinds],
+            "TYPE": np.array(columns[1], dtype=object)[kinds],
+            "CATEGORY": np.array(columns[2], dtype=object)[kinds],
+            "REACTION1": np.nan,
+            "DESCRIPTION1": reaction_descriptions[reactions],
+            "SEVERITY1": severities[reactions]
+        })
+
+    def careplans(self) -> pd.DataFrame:
+        patients = self._patient_rows("careplans")
+        n = len(patients)
+        starts, offsets = self._dates(n, with_time=False)
+        return pd.DataFrame({
+            "Id": _uuids(self.rng, n),
+            "START": starts,
+            "STOP": self._stops("careplans", offsets, with_time=False),
+            "PATIENT": patients,
+            "ENCOUNTER": self._encounters_of(n),
+            "CODE": 384758001,
+            "DESCRIPTION": "Self-care interventions (procedure)",
+            "REASONCODE": np.nan,
+            "REASONDESCRIPTION": None
+        })
+
+    def organizations(self) -> pd.DataFrame:
+        n = max(len(self.patient_ids) // 50, 1)
+        return pd.DataFrame({
+            "Id": _uuids(self.rng, n),
+            "NAME": [f"Clinic {i}" for i in range(n)],
+            "CITY": np.array(CITIES, dtype=object)[self.rng.integers(0, len(CITIES), size=n)],
+            "STATE": "MA"
+        })
+
+    def providers(self, organizations: pd.DataFrame) -> pd.DataFrame:
+        n = len(organizations)
+        return pd.DataFrame({
+            "Id": _uuids(self.rng, n),
+            "ORGANIZATION": organizations["Id"].to_numpy(),
+            "NAME": [f"Provider {i}" for i in range(n)],
+            "SPECIALITY": "GENERAL PRACTICE"
+        })
+
+    def payers(self) -> pd.DataFrame:
+        names = ["Medicare", "Medicaid", "Blue Cross Blue Shield", "Aetna", "NO_INSURANCE"]
+        return pd.DataFrame({
+            "Id": _uuids(self.rng, len(names)),
+            "NAME": names,
+            "OWNERSHIP": ["GOVERNMENT", "GOVERNMENT", "PRIVATE", "PRIVATE", "NO_INSURANCE"]
+        })
+
+
+def generate_dataset(n_patients: int, seed: int = 0, rows_scale: float = 1.0) -> PatientServiceLoadedData:
+    """
+    Generate every table of PatientServiceLoadedData for n_patients synthetic patients.
+
+    Args:
+        n_patients: Number of patients
+        seed: Random seed, the same seed and size always give the same tables
+        rows_scale: Multiplier on ROWS_PER_PATIENT, e.g. 0.5 for a lighter dataset
+    """
+    generator = _Generator(n_patients, seed, rows_scale)
+    # Encounters first, other tables reference their ids
+    tables: Dict[str, pd.DataFrame] = {"patients": generator.patients(), "encounters": generator.encounters()}
+    for table in ["allergies", "careplans", "conditions", "immunizations", "medications", "observations", "procedures", "payers"]:
+        tables[table] = getattr(generator, table)()
+    tables["organizations"] = generator.organizations()
+    tables["providers"] = generator.providers(tables["organizations"])
+
+    return PatientServiceLoadedData(**tables)
+
+
+def write_dataset(data: PatientServiceLoadedData, output_dir: Path) -> None:
+    """Write every table to output_dir as <table>.parquet, the layout PatientService loads"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for table in PatientServiceLoadedData.model_fields:
+        getattr(data, table).to_parquet(output_dir / f"{table}.parquet", index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Synthea-style Parquet tables")
+    parser.add_argument("--patients", type=int, required=True, help="Number of patients")
+    parser.add_argument("--output-dir", type=Path, required=True, help="Directory to write the Parquet tables to")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--rows-scale", type=float, default=1.0, help="Multiplier on the average rows per patient")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    data = generate_dataset(args.patients, seed=args.seed, rows_scale=args.rows_scale)
+    write_dataset(data, args.output_dir)
+
+    rows = {table: len(getattr(data, table)) for table in PatientServiceLoadedData.model_fields}
+    print(f"Wrote {args.patients} patients to {args.output_dir} in {time.time() - start_time:.1f}s: {rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Pre-generate clinical summaries for a patient cohort with the summary pipeline.
+
+Each finished summary is appended to a JSONL checkpoint and stored in the summary cache, so an
+interrupted run resumes where it stopped. The checkpoint is compacted into the generated
+summaries file loaded by load_generated_summary() once every patient is done. Summaries that
+only the fallback model produced are retried, then left out so a later run regenerates them.
+
+Usage (from the backend directory):
+    python -m scripts.generate_summaries [--condition-ids 44054006 38341003] [--limit 100]
+        [--concurrency 4] [--max-retries 5] [--fresh]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import openai
+from haystack.core.errors import PipelineRuntimeError
+from app.config.settings import get_settings
+from app.models.services import PatientSummaryResponse
+from app.services.data.patient_service import PatientService, get_patient_service
+from app.services.llm.pipelines.clinical_summary import ClinicalSummaryPipeline
+from app.services.llm.summary_cache import SummaryCache, get_summary_cache
+from app.utils.file_locator import ROOT_DIR
+
+
+settings = get_settings()
+
+SUMMARIES_DIR = ROOT_DIR / "data" / "summaries"
+OUTPUT_PATH = SUMMARIES_DIR / "generated_summaries_optimized.json"
+CHECKPOINT_PATH = SUMMARIES_DIR / "generated_summaries.checkpoint.jsonl"
+
+
+
+class FallbackSummaryError(Exception):
+    """
+    A summary came from a fallback model rather than the preferred one.
+
+    The router fails over to Ollama when Groq rate-limits, so a rate limit usually surfaces as a
+    fallback summary instead of an error. It is retried like one rather than kept for good.
+    """
+
+
+# Errors worth retrying, anything else fails the patient immediately
+RETRYABLE_ERRORS = (
+    FallbackSummaryError,
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError
+)
+
+
+def select_cohort(patient_service: PatientService, condition_ids: Optional[List[int]], limit: Optional[int]) -> List[str]:
+    """Patients having all condition_ids, or every patient if none are given"""
+    if condition_ids:
+        patient_ids = patient_service.get_patients_by_condition_id(condition_ids)
+    else:
+        patient_ids = patient_service.data.patients["Id"].tolist()
+
+    return patient_ids[:limit] if limit else patient_ids
+
+
+def load_checkpoint(path: Path) -> Dict[str, dict]:
+    """Summaries already generated by a previous run, keyed by patient id"""
+    if not path.exists():
+        return {}
+
+    summaries = {}
+    with open(path, mode="r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Last line of a run killed mid-write
+                continue
+            summaries[record["patient_id"]] = record
+    return summaries
+
+
+def truncate_partial_line(path: Path, block_size: int = 4096) -> None:
+    """Drop a last line left without a newline by a run killed mid-write, so appends start on a fresh line"""
+    if not path.exists():
+        return
+
+    with open(path, mode="rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        # Scan back from the end for the last newline, the partial line is everything after it
+        position = end
+        while position > 0:
+            start = max(position - block_size, 0)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+
+        if position < end:
+            print(f"Dropping partial last line ({end - position} bytes) of {path}")
+            f.truncate(position)
+
+
+def retryable_cause(error: Exception) -> Optional[Exception]:
+    """
+    The retryable error behind a failed pipeline run, if any.
+
+    Pipeline.run wraps every component exception in PipelineRuntimeError, so the LLM client's
+    error is found by following the chain of causes.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, RETRYABLE_ERRORS):
+            return error
+        seen.add(id(error))
+        error = error.__cause__
+    return None
+
+
+def retry_delay(error: Exception, attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with jitter, honouring the Retry-After header of rate-limit responses"""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), max_delay)
+        except ValueError:
+            pass
+
+    return min(base_delay * 2 ** attempt, max_delay) * random.uniform(0.5, 1.0)
+
+
+async def generate_patient_summary(
+    pipeline: ClinicalSummaryPipeline,
+    summary_cache: SummaryCache,
+    patient_id: str,
+    max_retries: int,
+    base_delay: float,
+    max_delay: float
+) -> PatientSummaryResponse:
+    """
+    Generate one patient's summary, reusing the cached summary if the patient's data is unchanged.
+
+    Raises:
+        FallbackSummaryError: If only a fallback model answered, so the patient is left for the next run
+    """
+    summary_prompt = await pipeline.build_summary_prompt(patient_id)
+    cached = await summary_cache.get(summary_prompt.cache_key)
+    if cached is not None:
+        return cached.model_copy(update={"patient_id": patient_id})
+
+    for attempt in range(max_retries + 1):
+        try:
+            start_time = time.time()
+            summary_result = await pipeline.run_summary(summary_prompt)
+            elapsed = time.time() - start_time
+            if not pipeline.is_primary_result(summary_result):
+                raise FallbackSummaryError(f"Summary generated by fallback model {summary_result['llm']['model']}")
+            break
+        except (PipelineRuntimeError, *RETRYABLE_ERRORS) as e:
+            cause = retryable_cause(e)
+            if cause is None or attempt == max_retries:
+                raise
+            delay = retry_delay(cause, attempt, base_delay, max_delay)
+            print(f"{type(cause).__name__} for {patient_id}, retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+            await asyncio.sleep(delay)
+
+    response_data = PatientSummaryResponse(
+        patient_id=patient_id,
+        summary=summary_result["llm"]["replies"][0],
+        model_used=summary_result["llm"]["model"],
+        generated_at=datetime.now().isoformat(),
+        generation_elapsed_second=float(round(elapsed, 2))
+    )
+    await summary_cache.set(summary_prompt.cache_key, response_data)
+    return response_data
+
+
+async def generate_summaries(
+    patient_ids: List[str],
+    checkpoint_path: Path = CHECKPOINT_PATH,
+    concurrency: int = 4,
+    max_retries: int = 5,
+    base_delay: float = 2.0,
+    max_delay: float = 60.0
+) -> int:
+    """
+    Generate summaries for patients missing from the checkpoint, at most `concurrency` at a time,
+    capped by SUMMARY_MAX_CONCURRENCY.
+
+    Returns:
+        Number of patients that failed
+    """
+    pipeline = ClinicalSummaryPipeline(model=settings.OLLAMA_MODEL, ollama_url=settings.OLLAMA_API_URL)
+    summary_cache = get_summary_cache()
+
+    done = load_checkpoint(checkpoint_path)
+    pending = [patient_id for patient_id in patient_ids if patient_id not in done]
+    print(f"Patients: {len(patient_ids)} in cohort, {len(patient_ids) - len(pending)} already generated, {len(pending)} to generate")
+
+    # The pipeline runs on a thread pool of SUMMARY_MAX_CONCURRENCY workers, so more would only queue
+    if concurrency > settings.SUMMARY_MAX_CONCURRENCY:
+        print(f"Concurrency {concurrency} capped to SUMMARY_MAX_CONCURRENCY={settings.SUMMARY_MAX_CONCURRENCY}")
+        concurrency = settings.SUMMARY_MAX_CONCURRENCY
+    semaphore = asyncio.Semaphore(concurrency)
+    completed = 0
+    failed = 0
+    start_time = time.time()
+
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    truncate_partial_line(checkpoint_path)
+    with open(checkpoint_path, mode="a", encoding="utf-8") as checkpoint:
+
+        async def run(patient_id: str):
+            nonlocal completed, failed
+            async with semaphore:
+                try:
+                    response_data = await generate_patient_summary(
+                        pipeline, summary_cache, patient_id, max_retries, base_delay, max_delay
+                    )
+                except Exception as e:
+                    failed += 1
+                    print(f"An error occurred when generating summary for {patient_id}: {e}.\n{traceback.format_exc()}")
+                    return
+
+            # Append as soon as each summary lands so an interrupted run loses nothing
+            checkpoint.write(response_data.model_dump_json() + "\n")
+            checkpoint.flush()
+            completed += 1
+            print(f"Generated {completed}/{len(pending)} summaries ({time.time() - start_time:.1f}s)")
+
+        await asyncio.gather(*(run(patient_id) for patient_id in pending))
+
+    print(f"Finished generating summaries in {time.time() - start_time:.2f}s, {failed} failed")
+    return failed
+
+
+def compact_checkpoint(checkpoint_path: Path = CHECKPOINT_PATH, output_path: Path = OUTPUT_PATH) -> None:
+    """Merge the checkpoint into the generated summaries file, replacing it atomically"""
+    summaries = {}
+    if output_path.exists():
+        with open(output_path, mode="r", encoding="utf-8") as f:
+            summaries = json.load(f)
+    summaries.update(load_checkpoint(checkpoint_path))
+
+    tmp_path = output_path.with_suffix(".json.tmp")
+    with open(tmp_path, mode="w", encoding="utf-8") as f:
+        json.dump(summaries, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
+
+    checkpoint_path.unlink(missing_ok=True)
+    print(f"Wrote {len(summaries)} summaries to {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate clinical summaries for a patient cohort")
+    parser.add_argument("--condition-ids", type=int, nargs="+", help="Only patients having all of these condition codes")
+    parser.add_argument("--limit", type=int, help="Maximum number of patients in the cohort")
+    parser.add_argument("--concurrency", type=int, default=settings.SUMMARY_MAX_CONCURRENCY, help="Concurrent LLM calls, capped by SUMMARY_MAX_CONCURRENCY")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per patient on rate-limit and transient errors")
+    parser.add_argument("--fresh", action="store_true", help="Discard the checkpoint of a previous run")
+    args = parser.parse_args()
+
+    if args.fresh:
+        CHECKPOINT_PATH.unlink(missing_ok=True)
+
+    # Select the cohort from the processed Parquet data
+    patient_ids = select_cohort(get_patient_service(), args.condition_ids, args.limit)
+
+    # Generate missing summaries, keeping the checkpoint for a re-run if any patient failed
+    failed = asyncio.run(generate_summaries(patient_ids, concurrency=args.concurrency, max_retries=args.max_retries))
+    if failed:
+        print(f"Re-run to retry {failed} failed patients, the checkpoint at {CHECKPOINT_PATH} is kept")
+        return
+
+    compact_checkpoint()
+
+
+if __name__ == "__main__":
+    main()
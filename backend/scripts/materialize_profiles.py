@@ -0,0 +1,64 @@
+"""
+Precompute every patient's comprehensive profile and chart data into the on-disk profile store.
+
+Only patients whose source rows changed since the last run are rebuilt.
+
+Usage (from the backend directory):
+    python -m scripts.materialize_profiles [--force] [--batch-size 500]
+"""
+import argparse
+import time
+import traceback
+from app.services.data.patient_service import PatientService
+from app.services.data.profile_store import ProfileStore, compute_patient_fingerprints
+
+
+def materialize_profiles(patient_service: PatientService, store: ProfileStore, force: bool = False, batch_size: int = 500) -> None:
+    """
+    Rebuild the profiles of new or changed patients and drop profiles of removed patients.
+    """
+    try:
+        fingerprints = compute_patient_fingerprints(patient_service.data)
+        stored_fingerprints = store.get_fingerprints()
+
+        stale_ids = [
+            patient_id for patient_id, fingerprint in fingerprints.items()
+            if force or stored_fingerprints.get(patient_id) != fingerprint
+        ]
+        removed_ids = [patient_id for patient_id in stored_fingerprints if patient_id not in fingerprints]
+        print(f"Patients: {len(fingerprints)} total, {len(stale_ids)} to rebuild, {len(removed_ids)} to remove")
+
+        start_time = time.time()
+        for offset in range(0, len(stale_ids), batch_size):
+            batch = stale_ids[offset:offset + batch_size]
+            store.put_many(
+                (patient_id, fingerprints[patient_id], patient_service.get_comprehensive_patient_profile(patient_id))
+                for patient_id in batch
+            )
+            print(f"Materialized {offset + len(batch)}/{len(stale_ids)} profiles")
+
+        if removed_ids:
+            store.delete_many(removed_ids)
+
+        print(f"Finished materializing profiles in {time.time() - start_time:.2f}s")
+
+    except Exception as e:
+        msg = f"An error occurred when materializing patient profiles: {e}.\n{traceback.format_exc()}"
+        print(msg)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize patient profiles into the profile store")
+    parser.add_argument("--force", action="store_true", help="Rebuild every profile regardless of fingerprint")
+    parser.add_argument("--batch-size", type=int, default=500, help="Profiles written per transaction")
+    args = parser.parse_args()
+
+    # Load processed Parquet data and compute profiles from it
+    patient_service = PatientService()
+
+    # Persist profiles of new or changed patients
+    materialize_profiles(patient_service, ProfileStore(), force=args.force, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
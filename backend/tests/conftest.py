@@ -0,0 +1,17 @@
+import os
+
+
+# Settings are read at import time, so required values must exist before app modules load
+os.environ.setdefault("PROJECT_NAME", "MedAssist AI")
+os.environ.setdefault("PROJECT_DESC", "Test run")
+os.environ.setdefault("API_KEY", "test-api-key-0123456789")
+os.environ.setdefault("ALLOWED_ORIGINS", '["http://localhost:3000"]')
+os.environ.setdefault("GROQ_API_KEY", "test-groq-key")
+os.environ.setdefault("GROQ_API_URL", "http://groq.test/openai/v1")
+os.environ.setdefault("GROQ_MODEL_REASONING", "llama-3.3-70b-versatile")
+os.environ.setdefault("GROQ_MODEL_CHAT", "llama-3.1-8b-instant")
+os.environ.setdefault("OLLAMA_MODEL", "llama3.2:3b")
+os.environ.setdefault("OLLAMA_LOCALHOST", "localhost")
+os.environ.setdefault("OLLAMA_HOST", "ollama")
+os.environ.setdefault("OLLAMA_PORT", "11434")
+os.environ.setdefault("HAYSTACK_TELEMETRY_ENABLED", "False")
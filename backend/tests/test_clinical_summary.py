@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from app.config.settings import get_settings
+from app.models.services import SummaryPrompt
+from app.services.llm.pipelines import clinical_summary
+from app.services.llm.pipelines.clinical_summary import ClinicalSummaryPipeline
+from app.services.llm.prompt_compaction import estimate_tokens, get_token_budget
+
+
+settings = get_settings()
+
+
+class FakeGenerator:
+    """Records the prompts it receives, optionally failing every call"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.prompts = []
+
+    def run(self, prompt, streaming_callback=None, generation_kwargs=None):
+        self.prompts.append(prompt)
+        if self.error:
+            raise self.error
+        return {"replies": ["Summary"], "meta": []}
+
+
+def _profile_inputs(n_items: int) -> dict:
+    return {
+        "patient_info": {
+            "name": "Aisha Rahman", "age": 54, "gender": "F", "race": "asian", "ethnicity": "nonhispanic",
+            "address": "12 Jalan Ampang, Kuala Lumpur", "healthcare_expenses": 1200.0
+        },
+        "conditions": [
+            {"description": f"Chronic condition {i}", "is_active": i % 2 == 0, "start_date": f"2020-01-{i % 28 + 1:02d}", "stop_date": "2021-01-01"}
+            for i in range(n_items)
+        ],
+        "medications": [
+            {"description": f"Medication {i} 10 MG Oral Tablet", "is_active": True, "start_date": "2022-03-01", "reason": "Hypertension"}
+            for i in range(n_items)
+        ],
+        "observations": [
+            {"description": f"Laboratory observation {i}", "value": 5.4, "units": "mmol/L", "date": f"2023-02-{i % 28 + 1:02d}"}
+            for i in range(n_items)
+        ],
+        "allergies": [],
+        "encounters": [
+            {"date": f"2023-04-{i % 28 + 1:02d}", "description": "General examination", "class": "ambulatory", "cost": 85.5}
+            for i in range(n_items)
+        ],
+        "procedures": [
+            {"date": f"2023-05-{i % 28 + 1:02d}", "description": "Medication reconciliation", "cost": 40.0}
+            for i in range(n_items)
+        ],
+        "summary_stats": {
+            "active_conditions": n_items, "active_medications": n_items, "encounters_last_year": n_items,
+            "last_encounter_date": "2023-04-28", "total_healthcare_costs": 5000.0
+        }
+    }
+
+
+def test_fallback_prompt_is_compacted_to_its_own_budget():
+    pipeline = ClinicalSummaryPipeline(model="llama3.2:3b")
+    groq, ollama = pipeline.router.backends
+    groq.generator = FakeGenerator(error=RuntimeError("Groq unavailable"))
+    ollama.generator = FakeGenerator()
+
+    profile_inputs = _profile_inputs(n_items=150)
+    summary_prompt = SummaryPrompt(
+        patient_id="patient-1",
+        inputs=profile_inputs,
+        profile_inputs=profile_inputs,
+        cache_key="key"
+    )
+    result = pipeline._run_pipeline(summary_prompt)
+
+    assert result["llm"]["backend"] == "ollama"
+    [groq_prompt] = groq.generator.prompts
+    [ollama_prompt] = ollama.generator.prompts
+    assert estimate_tokens(ollama_prompt) <= get_token_budget("llama3.2:3b")
+    assert estimate_tokens(ollama_prompt) < estimate_tokens(groq_prompt)
+
+
+def test_prompt_build_does_not_queue_behind_llm_calls():
+    pipeline = ClinicalSummaryPipeline(model="llama3.2:3b")
+    profile_inputs = _profile_inputs(n_items=1)
+    pipeline._get_prompt_inputs = lambda patient_id, timing=None: profile_inputs
+
+    async def run():
+        # Occupy every pipeline worker as LLM calls in progress would
+        release = threading.Event()
+        busy = [clinical_summary._pipeline_executor.submit(release.wait) for _ in range(settings.SUMMARY_MAX_CONCURRENCY)]
+        try:
+            return await asyncio.wait_for(pipeline.build_summary_prompt("patient-1"), timeout=5)
+        finally:
+            release.set()
+            for future in busy:
+                future.result()
+
+    summary_prompt = asyncio.run(run())
+
+    assert summary_prompt.patient_id == "patient-1"
+    assert summary_prompt.profile_inputs == profile_inputs
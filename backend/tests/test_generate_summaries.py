@@ -0,0 +1,131 @@
+import asyncio
+import httpx
+import openai
+import pytest
+from haystack.core.errors import PipelineRuntimeError
+from scripts.generate_summaries import (
+    FallbackSummaryError,
+    generate_patient_summary,
+    load_checkpoint,
+    retry_delay,
+    retryable_cause,
+    truncate_partial_line
+)
+
+
+def _rate_limit_error(retry_after: str) -> openai.RateLimitError:
+    request = httpx.Request("POST", "http://groq.test/openai/v1/chat/completions")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def _pipeline_error(cause: Exception) -> PipelineRuntimeError:
+    """PipelineRuntimeError as raised by Pipeline.run for a failing component"""
+    try:
+        raise PipelineRuntimeError.from_exception("llm", object, cause) from cause
+    except PipelineRuntimeError as e:
+        return e
+
+
+class FakeSummaryPrompt:
+    cache_key = "key"
+
+
+class FakePipeline:
+    """Fails with the given errors before returning a summary, from the fallback model for the first `fallbacks` calls"""
+
+    def __init__(self, errors=(), fallbacks=0):
+        self.errors = list(errors)
+        self.fallbacks = fallbacks
+        self.calls = 0
+
+    async def build_summary_prompt(self, patient_id):
+        return FakeSummaryPrompt()
+
+    async def run_summary(self, summary_prompt):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        if self.fallbacks:
+            self.fallbacks -= 1
+            return {"llm": {"replies": ["Fallback summary"], "model": "llama3.2:3b"}}
+        return {"llm": {"replies": ["Summary"], "model": "llama-3.3-70b-versatile"}}
+
+    def is_primary_result(self, summary_result):
+        return summary_result["llm"]["model"] == "llama-3.3-70b-versatile"
+
+
+class FakeSummaryCache:
+    def __init__(self):
+        self.stored = []
+
+    async def get(self, key):
+        return None
+
+    async def set(self, key, value):
+        self.stored.append(value)
+
+
+def test_retryable_cause_unwraps_pipeline_errors():
+    rate_limit_error = _rate_limit_error("3")
+    assert retryable_cause(_pipeline_error(rate_limit_error)) is rate_limit_error
+    assert retryable_cause(_pipeline_error(ValueError("bad prompt"))) is None
+
+
+def test_retry_delay_reads_retry_after_of_the_cause():
+    assert retry_delay(retryable_cause(_pipeline_error(_rate_limit_error("3"))), 0, 2.0, 60.0) == 3.0
+
+
+def test_rate_limited_pipeline_run_is_retried():
+    pipeline = FakePipeline([_pipeline_error(_rate_limit_error("0")), _pipeline_error(_rate_limit_error("0"))])
+    response_data = asyncio.run(generate_patient_summary(pipeline, FakeSummaryCache(), "patient-1", 5, 0.0, 0.0))
+    assert pipeline.calls == 3
+    assert response_data.summary == "Summary"
+
+
+def test_non_retryable_pipeline_error_fails_immediately():
+    pipeline = FakePipeline([_pipeline_error(ValueError("bad prompt"))])
+    with pytest.raises(PipelineRuntimeError):
+        asyncio.run(generate_patient_summary(pipeline, FakeSummaryCache(), "patient-1", 5, 0.0, 0.0))
+    assert pipeline.calls == 1
+
+
+def test_fallback_summary_is_retried_with_the_primary_model():
+    pipeline = FakePipeline(fallbacks=2)
+    summary_cache = FakeSummaryCache()
+    response_data = asyncio.run(generate_patient_summary(pipeline, summary_cache, "patient-1", 5, 0.0, 0.0))
+    assert pipeline.calls == 3
+    assert response_data.model_used == "llama-3.3-70b-versatile"
+    assert [stored.summary for stored in summary_cache.stored] == ["Summary"]
+
+
+def test_fallback_summary_is_not_kept_once_retries_run_out():
+    pipeline = FakePipeline(fallbacks=10)
+    summary_cache = FakeSummaryCache()
+    with pytest.raises(FallbackSummaryError):
+        asyncio.run(generate_patient_summary(pipeline, summary_cache, "patient-1", 2, 0.0, 0.0))
+    assert pipeline.calls == 3
+    assert summary_cache.stored == []
+
+
+def test_append_after_killed_write_starts_on_a_fresh_line(tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+    checkpoint_path.write_text('{"patient_id": "patient-1"}\n{"patient_id": "patient-2", "summ', encoding="utf-8")
+
+    # A small block size makes the scan for the last newline cross block boundaries
+    truncate_partial_line(checkpoint_path, block_size=8)
+    with open(checkpoint_path, mode="a", encoding="utf-8") as checkpoint:
+        checkpoint.write('{"patient_id": "patient-3"}\n')
+
+    assert list(load_checkpoint(checkpoint_path)) == ["patient-1", "patient-3"]
+
+
+def test_truncate_partial_line_keeps_complete_checkpoints(tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+    checkpoint_path.write_text('{"patient_id": "patient-1"}\n', encoding="utf-8")
+    truncate_partial_line(checkpoint_path)
+    assert checkpoint_path.read_text(encoding="utf-8") == '{"patient_id": "patient-1"}\n'
+
+    checkpoint_path.write_text('{"patient_id": "patie', encoding="utf-8")
+    truncate_partial_line(checkpoint_path)
+    assert checkpoint_path.read_text(encoding="utf-8") == ""
@@ -0,0 +1,36 @@
+import asyncio
+import httpx
+from app.config.settings import get_settings
+from app.services.health_monitor import probe_ollama
+from app.services.llm.model_catalog import get_model_catalog
+from app.services.llm.ollama_warmup import cleanup_ollama_warmup_manager, get_ollama_warmup_manager
+
+
+settings = get_settings()
+
+
+def _tags_handler(request: httpx.Request) -> httpx.Response:
+    """Ollama /api/tags listing one model, served only by the host summaries use"""
+    if request.url.host != settings.OLLAMA_HOST:
+        return httpx.Response(404)
+    return httpx.Response(200, json={"models": [{
+        "name": "llama3.2:3b",
+        "size": 2019393189,
+        "digest": "a80c4f17acd5",
+        "modified_at": "2025-08-01T10:00:00Z"
+    }]})
+
+
+def test_probe_ollama_refreshes_the_summary_server_catalog():
+    async def run():
+        ollama_service = get_ollama_warmup_manager().ollama_service
+        ollama_service.client = httpx.AsyncClient(transport=httpx.MockTransport(_tags_handler))
+        try:
+            return await probe_ollama()
+        finally:
+            await cleanup_ollama_warmup_manager()
+
+    details = asyncio.run(run())
+
+    assert details["available_models"] == ["llama3.2:3b"]
+    assert get_model_catalog(settings.OLLAMA_API_URL).has_model("llama3.2:3b")
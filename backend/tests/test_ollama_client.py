@@ -0,0 +1,117 @@
+import asyncio
+import json
+import httpx
+from app.services.llm.ollama_client import OllamaConnectionError, OllamaService
+from app.services.llm.router import llm_requests_in_flight
+
+
+def _generate_handler(request: httpx.Request) -> httpx.Response:
+    """Ollama /api/generate streaming two tokens and a final stats line"""
+    body = json.loads(request.content)
+    lines = [
+        {"model": body["model"], "response": "Stable", "done": False},
+        {"model": body["model"], "response": " vitals.", "done": False},
+        {
+            "model": body["model"], "response": "", "done": True, "done_reason": "stop",
+            "prompt_eval_count": 12, "eval_count": 2, "eval_duration": 100_000_000, "total_duration": 250_000_000
+        }
+    ]
+    content = "".join(json.dumps(line) + "\n" for line in lines)
+    return httpx.Response(200, content=content.encode(), headers={"Content-Type": "application/x-ndjson"})
+
+
+def _in_flight() -> float:
+    return dict(llm_requests_in_flight._values).get(("ollama",), 0.0)
+
+
+def test_stream_completion_yields_chunks():
+    async def run():
+        ollama_service = OllamaService(base_url="http://ollama-stream.test:11434")
+        ollama_service.client = httpx.AsyncClient(transport=httpx.MockTransport(_generate_handler))
+        in_flight = []
+        chunks = []
+        async for chunk in ollama_service.stream_completion("llama3.2:3b", "Summarize"):
+            in_flight.append(_in_flight())
+            chunks.append(chunk)
+        await ollama_service.client.aclose()
+        return ollama_service, in_flight, chunks
+
+    ollama_service, in_flight, chunks = asyncio.run(run())
+
+    assert "".join(chunk.content for chunk in chunks) == "Stable vitals."
+    assert chunks[-1].done and chunks[-1].eval_count == 2
+    assert chunks[-1].tokens_per_second == 20.0
+    assert chunks[0].time_to_first_token_ms is not None
+    # Counted as in flight while streaming, and released once the stream ends
+    assert all(count == 1.0 for count in in_flight)
+    assert _in_flight() == 0.0
+    assert ollama_service.circuit_breaker.get_stats()["consecutive_failures"] == 0
+
+
+def _half_open_service(base_url: str, handler) -> OllamaService:
+    """Service whose circuit has just turned half-open, so its next call is the trial call"""
+    ollama_service = OllamaService(base_url=base_url)
+    ollama_service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    circuit_breaker = ollama_service.circuit_breaker
+    circuit_breaker.recovery_timeout = 0.0
+    for _ in range(circuit_breaker.failure_threshold):
+        circuit_breaker.record_failure()
+    assert circuit_breaker.state == circuit_breaker.HALF_OPEN
+    return ollama_service
+
+
+def test_cancelled_trial_call_frees_the_half_open_slot():
+    async def hang(request: httpx.Request) -> httpx.Response:
+        await asyncio.Event().wait()
+
+    async def run():
+        ollama_service = _half_open_service("http://ollama-cancel.test:11434", hang)
+        task = asyncio.create_task(ollama_service.refresh_model_catalog())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await ollama_service.client.aclose()
+        return ollama_service
+
+    ollama_service = asyncio.run(run())
+
+    assert ollama_service.circuit_breaker.allow_request()
+
+
+def test_abandoned_trial_stream_frees_the_half_open_slot():
+    async def run():
+        ollama_service = _half_open_service("http://ollama-abandon.test:11434", _generate_handler)
+        stream = ollama_service.stream_completion("llama3.2:3b", "Summarize")
+        await anext(stream)
+        await stream.aclose()
+        await ollama_service.client.aclose()
+        return ollama_service
+
+    ollama_service = asyncio.run(run())
+
+    assert ollama_service.circuit_breaker.allow_request()
+    assert _in_flight() == 0.0
+
+
+def test_client_errors_do_not_open_the_circuit():
+    def model_not_found(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(404, json={"error": "model 'missing' not found"})
+
+    async def run():
+        ollama_service = OllamaService(base_url="http://ollama-404.test:11434")
+        ollama_service.client = httpx.AsyncClient(transport=httpx.MockTransport(model_not_found))
+        for _ in range(ollama_service.circuit_breaker.failure_threshold):
+            try:
+                await ollama_service.generate_completion("missing", "Summarize")
+            except OllamaConnectionError as e:
+                assert e.status_code == 404
+        await ollama_service.client.aclose()
+        return ollama_service
+
+    ollama_service = asyncio.run(run())
+
+    assert ollama_service.circuit_breaker.state == "closed"
+    assert ollama_service.circuit_breaker.get_stats()["consecutive_failures"] == 0
@@ -0,0 +1,34 @@
+import asyncio
+from app.services.llm.ollama_warmup import OllamaWarmupManager
+
+
+class FlakyOllamaService:
+    """Fails the first availability check with an unexpected error, then reports the model missing"""
+
+    base_url = "http://ollama-warmup.test:11434"
+
+    def __init__(self):
+        self.checks = 0
+
+    async def is_model_available(self, model_name):
+        self.checks += 1
+        if self.checks == 1:
+            raise RuntimeError("Unexpected response from Ollama")
+        return False
+
+
+def test_failed_first_warm_up_is_retried():
+    async def run():
+        ollama_service = FlakyOllamaService()
+        warmup_manager = OllamaWarmupManager(ollama_service, model="llama3.2:3b", refresh_interval=0.01)
+        warmup_manager.start()
+        await asyncio.sleep(0.1)
+        running = not warmup_manager._task.done()
+        await warmup_manager.stop()
+        return ollama_service, running, warmup_manager.get_state()
+
+    ollama_service, running, state = asyncio.run(run())
+
+    assert running
+    assert ollama_service.checks >= 2
+    assert "not available" in state.error_message
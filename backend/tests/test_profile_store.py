@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+from app.services.data.profile_store import combine_table_hashes
+
+
+def _hashes(values: dict) -> pd.Series:
+    return pd.Series(np.array(list(values.values()), dtype='uint64'), index=list(values.keys()))
+
+
+def test_small_hash_change_survives_patients_missing_from_the_table():
+    patient_ids = pd.Series(["patient-1", "patient-2"])
+    base_hash = np.uint64(0xFEDCBA9876543210)
+
+    def fingerprints(condition_hash):
+        return combine_table_hashes(patient_ids, {
+            "patients": _hashes({"patient-1": 11, "patient-2": 22}),
+            # patient-2 has no conditions, which used to turn the whole column into float64
+            "conditions": _hashes({"patient-1": condition_hash}),
+            "allergies": _hashes({"patient-1": 44, "patient-2": 55})
+        })
+
+    before = fingerprints(base_hash)
+    after = fingerprints(base_hash + np.uint64(1))
+
+    assert before["patient-1"] != after["patient-1"]
+    assert before["patient-2"] == after["patient-2"]
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import pytest
+from app.services.llm import prompt_manager
+from app.services.llm.prompt_manager import PromptManager
+from app.utils.file_locator import ROOT_DIR
+
+
+@pytest.fixture
+def prompts_dir(tmp_path, monkeypatch):
+    """Empty prompts directory, with PromptManager reset to load from it"""
+    monkeypatch.setattr(prompt_manager, "ROOT_DIR", tmp_path)
+    monkeypatch.setattr(PromptManager, "_prompts", {})
+    monkeypatch.setattr(PromptManager, "_templates", {})
+    monkeypatch.setattr(PromptManager, "_variables", {})
+    monkeypatch.setattr(PromptManager, "_mtimes", {})
+    monkeypatch.setattr(PromptManager, "_last_checked", 0.0)
+    monkeypatch.setattr(PromptManager, "_initialized", False)
+    (tmp_path / "prompts").mkdir()
+    return tmp_path / "prompts"
+
+
+def _write(path, text, mtime_ns):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.mark.parametrize("yaml_file", sorted((ROOT_DIR / "prompts").glob("*.yaml")), ids=lambda path: path.name)
+def test_shipped_prompts_compile(yaml_file):
+    PromptManager._compile_file(yaml_file)
+
+
+def test_literal_braces_render_as_written(prompts_dir):
+    _write(prompts_dir / "chat.yaml", 'answer:\n  template: \'Reply as {"patient": "{{ patient_name }}"}\'\n', 1_000_000_000)
+    asyncio.run(PromptManager.initialize())
+
+    assert PromptManager.get_prompt("chat", "answer", patient_name="Aisha") == 'Reply as {"patient": "Aisha"}'
+
+
+def test_format_placeholders_are_rejected_at_load(prompts_dir):
+    yaml_file = prompts_dir / "chat.yaml"
+    _write(yaml_file, "answer:\n  template: 'Summarize {{ patient_name }}'\n", 1_000_000_000)
+    asyncio.run(PromptManager.initialize())
+
+    # A file still written for str.format keeps the previous version loaded
+    _write(yaml_file, "answer:\n  template: 'Summarize {patient_name}'\n", 2_000_000_000)
+    PromptManager.reload()
+
+    assert PromptManager.get_prompt("chat", "answer", patient_name="Aisha") == "Summarize Aisha"
+
+
+def test_changed_files_are_reloaded(prompts_dir):
+    yaml_file = prompts_dir / "chat.yaml"
+    _write(yaml_file, "answer:\n  template: 'Summarize {{ patient_name }}'\n", 1_000_000_000)
+    asyncio.run(PromptManager.initialize())
+
+    _write(yaml_file, "answer:\n  template: 'Briefly summarize {{ patient_name }}'\n", 2_000_000_000)
+    PromptManager.reload()
+
+    assert PromptManager.get_prompt("chat", "answer", patient_name="Aisha") == "Briefly summarize Aisha"
+    assert PromptManager._mtimes[yaml_file] == 2_000_000_000
@@ -0,0 +1,73 @@
+import asyncio
+import sqlite3
+from contextlib import closing
+from app.models.services import PatientSummaryResponse
+from app.services.llm.summary_cache import SQLiteSummaryCache
+
+
+def _summary(patient_id: str) -> PatientSummaryResponse:
+    return PatientSummaryResponse(
+        patient_id=patient_id,
+        summary="Stable vitals.",
+        model_used="llama-3.3-70b-versatile",
+        generated_at="2025-08-01T10:00:00",
+        generation_elapsed_second=1.5
+    )
+
+
+def _last_accessed_at(cache: SQLiteSummaryCache, key: str) -> float:
+    with closing(sqlite3.connect(cache.path)) as conn:
+        return conn.execute("SELECT last_accessed_at FROM summaries WHERE key = ?", (key,)).fetchone()[0]
+
+
+def _set_last_accessed_at(cache: SQLiteSummaryCache, key: str, last_accessed_at: float) -> None:
+    with closing(sqlite3.connect(cache.path)) as conn, conn:
+        conn.execute("UPDATE summaries SET last_accessed_at = ? WHERE key = ?", (last_accessed_at, key))
+
+
+def test_hits_only_touch_entries_older_than_the_touch_interval(tmp_path):
+    cache = SQLiteSummaryCache(path=tmp_path / "summary_cache.sqlite", touch_interval=60.0)
+    asyncio.run(cache.set("key", _summary("patient-1")))
+    stored_at = _last_accessed_at(cache, "key")
+
+    assert asyncio.run(cache.get("key")).patient_id == "patient-1"
+    assert _last_accessed_at(cache, "key") == stored_at
+
+    _set_last_accessed_at(cache, "key", stored_at - 120.0)
+    assert asyncio.run(cache.get("key")).patient_id == "patient-1"
+    assert _last_accessed_at(cache, "key") > stored_at - 120.0
+
+
+def test_eviction_keeps_recently_touched_entries(tmp_path):
+    cache = SQLiteSummaryCache(path=tmp_path / "summary_cache.sqlite", max_entries=2, touch_interval=60.0)
+    asyncio.run(cache.set("old", _summary("patient-1")))
+    asyncio.run(cache.set("new", _summary("patient-2")))
+    _set_last_accessed_at(cache, "old", _last_accessed_at(cache, "old") - 120.0)
+    _set_last_accessed_at(cache, "new", _last_accessed_at(cache, "new") - 100.0)
+
+    # The hit on "old" is beyond the touch interval, so it becomes the most recently used
+    asyncio.run(cache.get("old"))
+    asyncio.run(cache.set("newest", _summary("patient-3")))
+
+    assert asyncio.run(cache.get("old")) is not None
+    assert asyncio.run(cache.get("new")) is None
+
+
+def test_writes_wait_on_a_locked_database_off_the_event_loop(tmp_path):
+    cache = SQLiteSummaryCache(path=tmp_path / "summary_cache.sqlite")
+
+    async def run():
+        # Another worker holds the write lock, so the write waits for it without stalling the loop
+        with closing(sqlite3.connect(cache.path, isolation_level=None)) as conn:
+            conn.execute("BEGIN EXCLUSIVE")
+            write = asyncio.create_task(cache.set("key", _summary("patient-1")))
+            await asyncio.sleep(0.2)
+            waiting = not write.done()
+            conn.execute("COMMIT")
+        await asyncio.wait_for(write, timeout=5)
+        return waiting, await cache.get("key")
+
+    waiting, cached = asyncio.run(run())
+
+    assert waiting
+    assert cached.patient_id == "patient-1"